@@ -1,3 +1,28 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from .models import BiometricDevice, BiometricLoad
+from .sync import sync_all_devices
 
-# Register your models here.
+
+@admin.register(BiometricDevice)
+class BiometricDeviceAdmin(admin.ModelAdmin):
+    list_display = ['name', 'ip_address', 'port', 'location', 'serial_number', 'last_punch_synced', 'is_active']
+    search_fields = ['name', 'ip_address', 'serial_number']
+    list_filter = ['is_active']
+    actions = ['sync_selected_devices']
+
+    @admin.action(description="Sincronizar marcaciones de los dispositivos seleccionados")
+    def sync_selected_devices(self, request, queryset):
+        loads = sync_all_devices(queryset.filter(is_active=True), user=request.user)
+        failed = [load for load in loads if load.error_message]
+        total = sum(load.num_records for load in loads)
+        self.message_user(request, f"{len(loads)} dispositivos sincronizados, {total} registros nuevos.")
+        for load in failed:
+            self.message_user(request, f"{load.biometric.name}: {load.error_message}", level=messages.ERROR)
+
+
+@admin.register(BiometricLoad)
+class BiometricLoadAdmin(admin.ModelAdmin):
+    list_display = ['biometric', 'load_type', 'records_seen', 'records_skipped', 'num_records', 'duration_seconds',
+                    'error_message', 'created_at']
+    list_filter = ['load_type', 'biometric']
+    list_select_related = ['biometric']
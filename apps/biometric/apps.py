@@ -3,4 +3,7 @@ from django.apps import AppConfig
 class BiometricConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'biometric'
-    verbose_name = 'Biométricos'
\ No newline at end of file
+    verbose_name = 'Biométricos'
+
+    def ready(self):
+        import biometric.signals
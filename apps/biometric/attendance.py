@@ -0,0 +1,327 @@
+"""
+Motor de cálculo de asistencia diaria.
+
+Cruza las marcaciones (AttendanceRegistry) con el horario vigente de cada
+empleado (EmployeeScheduleHistory/Schedule) y los feriados (ScheduleObservation)
+para producir una fila por empleado y día con la entrada/salida esperada y real,
+minutos de atraso, minutos trabajados y ausencia.
+
+Todo se carga en bloque (una consulta por tabla) y se procesa en memoria, de
+modo que el costo no depende del número de empleados en consultas.
+
+El resultado se materializa en DailyAttendanceSummary: cada carga de
+marcaciones recalcula solo los pares (empleado, día) que tocó, y los cambios de
+horarios o feriados marcan como pendientes (is_stale) los rangos afectados, que
+se recalculan la próxima vez que un reporte los lee con get_summaries().
+"""
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from django.db.models import Count, Q
+
+from employee.models import Employee
+from schedule.models import EmployeeScheduleHistory, ScheduleObservation
+from .models import AttendanceRegistry, DailyAttendanceSummary
+
+# Margen alrededor de la jornada dentro del cual una marcación se asigna al día
+PUNCH_WINDOW = timedelta(hours=4)
+
+WEEKDAY_FIELDS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+STATUS_PRESENT = 'PRESENT'
+STATUS_LATE = 'LATE'
+STATUS_INCOMPLETE = 'INCOMPLETE'
+STATUS_ABSENT = 'ABSENT'
+STATUS_HOLIDAY = 'HOLIDAY'
+STATUS_REST = 'REST'
+STATUS_NO_SCHEDULE = 'NO_SCHEDULE'
+
+
+def _daterange(start_date, end_date):
+    day = start_date
+    while day <= end_date:
+        yield day
+        day += timedelta(days=1)
+
+
+def _minutes(delta):
+    return max(0, int(delta.total_seconds() // 60))
+
+
+def schedule_segments(schedule, day):
+    """Jornadas (inicio, fin) del horario para un día, considerando el cruce de medianoche."""
+    segments = []
+    jornadas = [(schedule.morning_start, schedule.morning_end, schedule.morning_crosses_midnight)]
+    if schedule.afternoon_start and schedule.afternoon_end:
+        jornadas.append((schedule.afternoon_start, schedule.afternoon_end, schedule.afternoon_crosses_midnight))
+    for start_time, end_time, crosses_midnight in jornadas:
+        start = datetime.combine(day, start_time)
+        end = datetime.combine(day, end_time)
+        if crosses_midnight or end <= start:
+            end += timedelta(days=1)
+        segments.append((start, end))
+    return segments
+
+
+def load_assignments(employee_ids, start_date, end_date):
+    """Asignaciones de horario que se solapan con el rango, agrupadas por empleado."""
+    assignments = defaultdict(list)
+    qs = EmployeeScheduleHistory.objects.filter(
+        employee_id__in=employee_ids, is_active=True, start_date__lte=end_date
+    ).filter(
+        Q(end_date__isnull=True) | Q(end_date__gte=start_date)
+    ).select_related('schedule').order_by('employee_id', 'start_date', 'pk')
+    for assignment in qs:
+        assignments[assignment.employee_id].append(assignment)
+    return assignments
+
+
+def load_holidays(start_date, end_date):
+    """Conjunto de fechas feriado dentro del rango."""
+    holidays = set()
+    observations = ScheduleObservation.objects.filter(
+        is_holiday=True, is_active=True, start_date__lte=end_date, end_date__gte=start_date
+    ).values_list('start_date', 'end_date')
+    for obs_start, obs_end in observations:
+        holidays.update(_daterange(max(obs_start, start_date), min(obs_end, end_date)))
+    return holidays
+
+
+def load_punches(employee_ids, start_date, end_date):
+    """Marcaciones ordenadas por empleado, incluyendo el margen para jornadas nocturnas."""
+    punches = defaultdict(list)
+    range_start = datetime.combine(start_date, datetime.min.time()) - PUNCH_WINDOW
+    range_end = datetime.combine(end_date + timedelta(days=2), datetime.min.time())
+    qs = AttendanceRegistry.objects.filter(
+        employee_id__in=employee_ids, registry_date__gte=range_start, registry_date__lt=range_end
+    ).order_by('employee_id', 'registry_date').values_list('employee_id', 'registry_date')
+    for employee_id, registry_date in qs.iterator(chunk_size=10000):
+        punches[employee_id].append(registry_date)
+    return punches
+
+
+def _assignment_for(assignments, day):
+    """La asignación más reciente que cubre el día (None si no hay horario)."""
+    for assignment in reversed(assignments):
+        if assignment.start_date <= day and (assignment.end_date is None or assignment.end_date >= day):
+            return assignment
+    return None
+
+
+def _punches_between(punches, start, end):
+    return punches[bisect_left(punches, start):bisect_right(punches, end)]
+
+
+def compute_day(employee_id, day, schedule, punches, is_holiday):
+    """Calcula la fila de asistencia de un empleado para un día."""
+    row = {
+        'employee_id': employee_id,
+        'date': day,
+        'expected_entry': None,
+        'expected_exit': None,
+        'first_in': None,
+        'last_out': None,
+        'late_minutes': 0,
+        'worked_minutes': 0,
+        'absent': False,
+        'status': STATUS_NO_SCHEDULE,
+    }
+
+    if schedule is None:
+        day_punches = _punches_between(punches, datetime.combine(day, datetime.min.time()),
+                                       datetime.combine(day, datetime.max.time()))
+        if day_punches:
+            row['first_in'] = day_punches[0]
+            row['last_out'] = day_punches[-1] if len(day_punches) > 1 else None
+        return row
+
+    segments = schedule_segments(schedule, day)
+    row['expected_entry'] = segments[0][0]
+    row['expected_exit'] = segments[-1][1]
+    day_punches = _punches_between(punches, row['expected_entry'] - PUNCH_WINDOW, row['expected_exit'] + PUNCH_WINDOW)
+    if day_punches:
+        row['first_in'] = day_punches[0]
+        row['last_out'] = day_punches[-1] if len(day_punches) > 1 else None
+
+    is_workday = getattr(schedule, WEEKDAY_FIELDS[day.weekday()])
+    if is_holiday or not is_workday:
+        row['status'] = STATUS_HOLIDAY if is_holiday else STATUS_REST
+        return row
+
+    if not day_punches:
+        row['absent'] = True
+        row['status'] = STATUS_ABSENT
+        return row
+
+    # Cada marcación se asigna a la jornada cuyo rango está más cerca:
+    # el límite entre jornadas es el punto medio del receso.
+    boundaries = [row['expected_entry'] - PUNCH_WINDOW]
+    for (_, previous_end), (next_start, _) in zip(segments, segments[1:]):
+        boundaries.append(previous_end + (next_start - previous_end) / 2)
+    boundaries.append(row['expected_exit'] + PUNCH_WINDOW)
+
+    tolerance = timedelta(minutes=schedule.late_tolerance_minutes)
+    incomplete = False
+    for index, (segment_start, _) in enumerate(segments):
+        segment_punches = _punches_between(day_punches, boundaries[index], boundaries[index + 1])
+        if not segment_punches:
+            incomplete = True
+            continue
+        delay = segment_punches[0] - segment_start
+        if delay > tolerance:
+            row['late_minutes'] += _minutes(delay)
+        if len(segment_punches) > 1:
+            row['worked_minutes'] += _minutes(segment_punches[-1] - segment_punches[0])
+        else:
+            incomplete = True
+
+    if row['late_minutes']:
+        row['status'] = STATUS_LATE
+    elif incomplete:
+        row['status'] = STATUS_INCOMPLETE
+    else:
+        row['status'] = STATUS_PRESENT
+    return row
+
+
+def compute_attendance(start_date, end_date, employee_ids=None):
+    """
+    Calcula la asistencia diaria de los empleados en el rango [start_date, end_date].
+
+    Retorna una lista de diccionarios (una fila por empleado y día) ordenada por
+    empleado y fecha. Los días anteriores al ingreso o posteriores a la salida
+    del empleado se omiten.
+    """
+    employees = Employee.objects.all()
+    if employee_ids is not None:
+        employees = employees.filter(pk__in=employee_ids)
+    employees = list(employees.order_by('pk').values_list('pk', 'date_joined', 'date_left'))
+    ids = [pk for pk, _, _ in employees]
+
+    assignments = load_assignments(ids, start_date, end_date)
+    holidays = load_holidays(start_date, end_date)
+    punches = load_punches(ids, start_date, end_date)
+
+    rows = []
+    for employee_id, date_joined, date_left in employees:
+        employee_assignments = assignments.get(employee_id, [])
+        employee_punches = punches.get(employee_id, [])
+        first_day = max(start_date, date_joined) if date_joined else start_date
+        last_day = min(end_date, date_left) if date_left else end_date
+        for day in _daterange(first_day, last_day):
+            assignment = _assignment_for(employee_assignments, day)
+            rows.append(compute_day(
+                employee_id, day,
+                assignment.schedule if assignment else None,
+                employee_punches,
+                day in holidays,
+            ))
+    return rows
+
+
+# ------------------------------------------------------------------------------
+# Resumen materializado (DailyAttendanceSummary)
+# ------------------------------------------------------------------------------
+
+SUMMARY_FIELDS = ['first_in', 'last_out', 'late_minutes', 'worked_minutes', 'status']
+
+
+def _store_rows(rows, only_pairs=None):
+    """Inserta o actualiza (upsert) las filas calculadas en la tabla de resumen."""
+    summaries = [
+        DailyAttendanceSummary(
+            employee_id=row['employee_id'], date=row['date'], is_stale=False,
+            **{field: row[field] for field in SUMMARY_FIELDS}
+        )
+        for row in rows
+        if only_pairs is None or (row['employee_id'], row['date']) in only_pairs
+    ]
+    DailyAttendanceSummary.objects.bulk_create(
+        summaries, batch_size=2000,
+        update_conflicts=True, unique_fields=['employee', 'date'],
+        update_fields=SUMMARY_FIELDS + ['is_stale', 'updated_at'],
+    )
+    return len(summaries)
+
+
+def refresh_summaries(pairs):
+    """
+    Recalcula únicamente los pares (empleado, fecha) indicados.
+    Los días futuros no se materializan.
+    """
+    today = date.today()
+    pairs = {(employee_id, day) for employee_id, day in pairs if day <= today}
+    if not pairs:
+        return 0
+    days = [day for _, day in pairs]
+    rows = compute_attendance(min(days), max(days), {employee_id for employee_id, _ in pairs})
+    return _store_rows(rows, only_pairs=pairs)
+
+
+def refresh_range(start_date, end_date, employee_ids=None):
+    """Recalcula todo el rango (hasta hoy) para los empleados indicados."""
+    end_date = min(end_date, date.today())
+    if start_date > end_date:
+        return 0
+    return _store_rows(compute_attendance(start_date, end_date, employee_ids))
+
+
+def refresh_for_load(load):
+    """
+    Recalcula los días tocados por una BiometricLoad. Una marcación puede
+    pertenecer a la jornada nocturna del día anterior, por eso se incluye también.
+    """
+    touched = (
+        AttendanceRegistry.objects.filter(biometric_load=load)
+        .values_list('employee_id', 'registry_date__date').distinct()
+    )
+    pairs = set()
+    for employee_id, day in touched:
+        pairs.add((employee_id, day))
+        pairs.add((employee_id, day - timedelta(days=1)))
+    return refresh_summaries(pairs)
+
+
+def invalidate_summaries(start_date, end_date=None, employee_ids=None):
+    """Marca como pendientes de recálculo los resúmenes del rango indicado."""
+    qs = DailyAttendanceSummary.objects.filter(date__gte=start_date)
+    if end_date is not None:
+        qs = qs.filter(date__lte=end_date)
+    if employee_ids is not None:
+        qs = qs.filter(employee_id__in=employee_ids)
+    return qs.filter(is_stale=False).update(is_stale=True)
+
+
+def get_summaries(start_date, end_date, employee_ids=None):
+    """
+    Retorna el queryset de resúmenes vigentes del rango, recalculando antes solo
+    los empleados con días pendientes (is_stale) o aún no materializados.
+    """
+    materialize_end = min(end_date, date.today())
+    if start_date <= materialize_end:
+        employees = Employee.objects.all()
+        if employee_ids is not None:
+            employees = employees.filter(pk__in=employee_ids)
+        employees = list(employees.values_list('pk', 'date_joined', 'date_left'))
+
+        fresh = dict(
+            DailyAttendanceSummary.objects.filter(
+                date__gte=start_date, date__lte=materialize_end, is_stale=False,
+                employee_id__in=[pk for pk, _, _ in employees],
+            ).values('employee_id').annotate(total=Count('id')).values_list('employee_id', 'total')
+        )
+        pending = []
+        for employee_id, date_joined, date_left in employees:
+            first_day = max(start_date, date_joined) if date_joined else start_date
+            last_day = min(materialize_end, date_left) if date_left else materialize_end
+            expected = max(0, (last_day - first_day).days + 1)
+            if fresh.get(employee_id, 0) < expected:
+                pending.append(employee_id)
+        if pending:
+            refresh_range(start_date, materialize_end, pending)
+
+    qs = DailyAttendanceSummary.objects.filter(date__gte=start_date, date__lte=end_date, is_stale=False)
+    if employee_ids is not None:
+        qs = qs.filter(employee_id__in=employee_ids)
+    return qs
@@ -0,0 +1,58 @@
+import time
+from datetime import datetime, timedelta
+
+from pyzk2.attendance import Attendance
+
+
+class FakeZK:
+    """
+    Sustituto del cliente pyzk2.ZK para pruebas y benchmarks sin hardware.
+    Se inyecta en BiometricConnection(zk_class=FakeZK.factory(...)).
+    """
+
+    def __init__(self, ip, port=4370, timeout=60, pins=None, records=1000, latency=0.0,
+                 start=None, fail=False, **kwargs):
+        self.ip = ip
+        self.port = port
+        self.timeout = timeout
+        self.pins = list(pins or ['1'])
+        self.records = records
+        self.latency = latency
+        self.start = start or datetime(2000, 1, 1, 7, 0, 0)
+        self.fail = fail
+
+    @classmethod
+    def factory(cls, **options):
+        """Retorna un callable con la firma de ZK(ip, port=..., timeout=...)."""
+        def build(ip, port=4370, timeout=60):
+            return cls(ip, port=port, timeout=timeout, **options)
+        return build
+
+    def connect(self):
+        if self.fail:
+            raise ConnectionError(f"Dispositivo simulado {self.ip} no responde")
+        return self
+
+    def disconnect(self):
+        return True
+
+    def get_attendance(self):
+        # Simula el tiempo de descarga por red del dispositivo real
+        if self.latency:
+            time.sleep(min(self.latency, self.timeout))
+        return [
+            Attendance(self.pins[i % len(self.pins)], self.start + timedelta(seconds=i), status=1)
+            for i in range(self.records)
+        ]
+
+    def get_time(self):
+        return datetime.now()
+
+    def set_time(self, new_datetime):
+        return True
+
+    def test_voice(self):
+        return True
+
+    def clear_attendance(self):
+        self.records = 0
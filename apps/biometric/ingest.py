@@ -0,0 +1,205 @@
+import logging
+from datetime import datetime
+
+from django.db import transaction
+
+from employee.models import InstitutionalData
+from .models import AttendanceRegistry
+
+logger = logging.getLogger(__name__)
+
+ATTLOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+INSERT_BATCH_SIZE = 2000
+
+
+def normalize_pin(raw_pin):
+    """Normaliza el ID del biométrico tal como se guarda en InstitutionalData.biometric_id."""
+    return str(raw_pin).strip().lstrip('0')
+
+
+def clean_datetime(value):
+    """El hardware entrega hora local; cualquier tzinfo se descarta (USE_TZ=False)."""
+    if getattr(value, 'tzinfo', None) is not None:
+        return value.replace(tzinfo=None)
+    return value
+
+
+def parse_attlog_line(line):
+    """
+    Convierte una línea ATTLOG (campos separados por tabulador) en (pin, fecha).
+    Retorna None si la línea no tiene el formato esperado.
+    """
+    fields = line.strip().split('\t')
+    if len(fields) < 2:
+        return None
+    try:
+        registry_date = datetime.strptime(fields[1].strip(), ATTLOG_DATE_FORMAT)
+    except ValueError:
+        return None
+    return normalize_pin(fields[0]), registry_date
+
+
+def parse_attlog(raw_body):
+    """
+    Parsea el cuerpo completo de un push ATTLOG antes de tocar la base de datos.
+    Retorna (marcaciones, líneas_rechazadas).
+    """
+    punches = []
+    rejected = 0
+    for line in raw_body.splitlines():
+        if not line.strip():
+            continue
+        parsed = parse_attlog_line(line)
+        if parsed is None:
+            rejected += 1
+            continue
+        punches.append(parsed)
+    return punches, rejected
+
+
+def resolve_pins(pins):
+    """Resuelve en una sola consulta los PIN del biométrico a IDs de empleado."""
+    return dict(
+        InstitutionalData.objects.filter(biometric_id__in=set(pins))
+        .values_list('biometric_id', 'employee_id')
+    )
+
+
+def existing_punches(employee_ids, registry_dates):
+    """Pares (empleado, fecha) ya almacenados dentro del rango de fechas del lote."""
+    if not employee_ids or not registry_dates:
+        return set()
+    return set(
+        AttendanceRegistry.objects.filter(
+            employee_id__in=employee_ids,
+            registry_date__gte=min(registry_dates),
+            registry_date__lte=max(registry_dates),
+        ).values_list('employee_id', 'registry_date')
+    )
+
+
+def save_punches(load, punches, pin_map=None, batch_size=INSERT_BATCH_SIZE):
+    """
+    Inserta por lotes las marcaciones (pin, fecha) asociadas a una BiometricLoad.
+
+    Los PIN se resuelven con una consulta, los duplicados se descartan contra lo
+    ya almacenado con otra, y el resto se inserta con bulk_create. El
+    UniqueConstraint (employee, registry_date) cubre las carreras entre cargas
+    concurrentes mediante ignore_conflicts. Como bulk_create no informa cuántas
+    filas descartó, las insertadas se cuentan en la base antes y después.
+
+    Retorna un diccionario con los contadores de la carga.
+    """
+    punches = [(pin, clean_datetime(registry_date)) for pin, registry_date in punches]
+    if pin_map is None:
+        pin_map = resolve_pins(pin for pin, _ in punches)
+
+    unknown = 0
+    candidates = {}
+    for pin, registry_date in punches:
+        employee_id = pin_map.get(pin)
+        if employee_id is None:
+            unknown += 1
+            continue
+        candidates.setdefault((employee_id, registry_date), pin)
+
+    already_stored = existing_punches(
+        {employee_id for employee_id, _ in candidates},
+        [registry_date for _, registry_date in candidates],
+    )
+
+    to_create = [
+        AttendanceRegistry(
+            employee_id=employee_id,
+            biometric_load=load,
+            employee_id_bio=pin,
+            registry_date=registry_date,
+        )
+        for (employee_id, registry_date), pin in candidates.items()
+        if (employee_id, registry_date) not in already_stored
+    ]
+    inserted = 0
+    if to_create:
+        load_rows = AttendanceRegistry.objects.filter(biometric_load=load)
+        before = load_rows.count()
+        AttendanceRegistry.objects.bulk_create(to_create, batch_size=batch_size, ignore_conflicts=True)
+        inserted = load_rows.count() - before
+
+    return {
+        'seen': len(punches),
+        'unknown': unknown,
+        'duplicates': len(punches) - unknown - inserted,
+        'inserted': inserted,
+    }
+
+
+def resolve_all_pins():
+    """Mapa completo PIN -> empleado, precargado una sola vez para importaciones grandes."""
+    return dict(
+        InstitutionalData.objects.exclude(biometric_id__isnull=True).exclude(biometric_id='')
+        .values_list('biometric_id', 'employee_id')
+    )
+
+
+def import_attendance_lines(load, lines, chunk_size=5000, progress=None, max_samples=20):
+    """
+    Importa un archivo de marcaciones (descarga USB) recorriéndolo línea por línea.
+
+    Cada bloque de `chunk_size` marcaciones se confirma en su propia transacción,
+    de modo que un archivo de decenas de MB no mantiene una transacción abierta
+    ni se carga completo en memoria. `progress(lineas_leidas, insertadas)` se
+    invoca tras cada bloque.
+
+    Retorna un resumen con los contadores y ejemplos de las líneas rechazadas.
+    """
+    pin_map = resolve_all_pins()
+    summary = {
+        'lines': 0, 'inserted': 0, 'duplicates': 0,
+        'malformed': 0, 'bad_dates': 0, 'unknown_pins': 0,
+        'unknown_pin_samples': [], 'bad_date_samples': [],
+    }
+    unknown_samples = set()
+    chunk = []
+
+    def flush():
+        with transaction.atomic():
+            result = save_punches(load, chunk, pin_map=pin_map)
+        summary['inserted'] += result['inserted']
+        summary['duplicates'] += result['duplicates']
+        chunk.clear()
+        if progress:
+            progress(summary['lines'], summary['inserted'])
+
+    for raw_line in lines:
+        if isinstance(raw_line, bytes):
+            raw_line = raw_line.decode('utf-8', errors='ignore')
+        if not raw_line.strip():
+            continue
+        summary['lines'] += 1
+
+        if len(raw_line.strip().split('\t')) < 2:
+            summary['malformed'] += 1
+            continue
+        parsed = parse_attlog_line(raw_line)
+        if parsed is None:
+            summary['bad_dates'] += 1
+            if len(summary['bad_date_samples']) < max_samples:
+                summary['bad_date_samples'].append(summary['lines'])
+            continue
+
+        pin = parsed[0]
+        if pin not in pin_map:
+            summary['unknown_pins'] += 1
+            if len(unknown_samples) < max_samples:
+                unknown_samples.add(pin)
+            continue
+
+        chunk.append(parsed)
+        if len(chunk) >= chunk_size:
+            flush()
+
+    if chunk:
+        flush()
+
+    summary['unknown_pin_samples'] = sorted(unknown_samples)
+    return summary
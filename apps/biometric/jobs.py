@@ -0,0 +1,46 @@
+"""Trabajos en segundo plano de biometría (ver core.jobs)."""
+from core.jobs import job_user, register_job, save_job_file
+from institution.models import AdministrativeUnit
+from .models import BiometricDevice
+from .reports import build_zip, render_monthly_batch, unit_employee_ids
+from .sync import sync_all_devices
+
+
+@register_job('biometric.monthly_batch', permission='biometric.view_attendanceregistry')
+def monthly_batch(job, unit_id, year, month, descendants=False):
+    """Calendarios mensuales en PDF de los empleados de una unidad, empaquetados en un ZIP."""
+    unit = AdministrativeUnit.objects.get(pk=unit_id)
+    job.set_progress(5, f'Generando calendarios de {unit.name}')
+    files = render_monthly_batch(unit_employee_ids(unit, descendants), int(year), int(month))
+    if not files:
+        raise ValueError('La unidad no tiene empleados con ID biométrico.')
+    job.set_progress(90, f'Empaquetando {len(files)} PDF')
+    save_job_file(job, f'Asistencia_{unit.pk}_{int(year)}_{int(month):02d}.zip', build_zip(files))
+    return {'files': len(files)}
+
+
+@register_job('biometric.sync_devices', permission='biometric.change_biometricdevice')
+def sync_devices(job, device_ids=None, full=False):
+    """Descarga las marcaciones de los dispositivos indicados (por defecto todos los activos)."""
+    devices = BiometricDevice.objects.filter(is_active=True)
+    if device_ids:
+        devices = devices.filter(pk__in=device_ids)
+    user = job_user(job)
+    loads = sync_all_devices(devices, user=user if user.is_authenticated else None, full=full)
+    summary = [{
+        'device': load.biometric.name,
+        'seen': load.records_seen,
+        'skipped': load.records_skipped,
+        'inserted': load.num_records,
+        'error': load.error_message,
+    } for load in loads]
+    errors = [item for item in summary if item['error']]
+    if errors and len(errors) == len(summary):
+        raise RuntimeError('; '.join(f"{item['device']}: {item['error']}" for item in errors))
+    inserted = sum(item['inserted'] for item in summary)
+    seen = sum(item['seen'] for item in summary)
+    skipped = sum(item['skipped'] for item in summary)
+    return {
+        'devices': summary,
+        'message': f'Sincronizados {inserted} registros ({seen} leídos, {skipped} ya sincronizados).',
+    }
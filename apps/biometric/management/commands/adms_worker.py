@@ -0,0 +1,49 @@
+# apps/biometric/management/commands/adms_worker.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from biometric.spool import process_pending, spool_metrics
+
+
+class Command(BaseCommand):
+    help = 'Procesa la cola de lotes ADMS recibidos hacia BiometricLoad/AttendanceRegistry'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='Lotes a procesar por iteración')
+        parser.add_argument('--sleep', type=float, default=2.0,
+                            help='Segundos de espera cuando la cola está vacía')
+        parser.add_argument('--once', action='store_true',
+                            help='Drena la cola una vez y termina')
+        parser.add_argument('--stats', action='store_true',
+                            help='Muestra las métricas de retraso de la cola y termina')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self._print_metrics()
+            return
+
+        self.stdout.write(self.style.SUCCESS('--- Worker ADMS iniciado ---'))
+        try:
+            while True:
+                processed, inserted = process_pending(limit=options['batch_size'])
+                if processed:
+                    self.stdout.write(f'Lotes procesados: {processed} - Marcaciones insertadas: {inserted}')
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Worker detenido.'))
+
+        self._print_metrics()
+
+    def _print_metrics(self):
+        metrics = spool_metrics()
+        self.stdout.write(
+            f"Pendientes: {metrics['pending']} (sin equipo: {metrics['waiting_device']}) | "
+            f"Fallidos: {metrics['failed']} | "
+            f"Más antiguo: {metrics['oldest_pending'] or '-'} ({metrics['lag_seconds']}s) | "
+            f"Lotes/min: {metrics['batches_per_minute']}"
+        )
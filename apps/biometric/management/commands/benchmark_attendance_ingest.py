@@ -0,0 +1,96 @@
+# apps/biometric/management/commands/benchmark_attendance_ingest.py
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from biometric.ingest import import_attendance_lines, parse_attlog, save_punches
+from biometric.models import BiometricDevice, BiometricLoad
+from employee.models import InstitutionalData
+from person.models import Person
+
+
+class _Rollback(Exception):
+    """Fuerza el rollback de los datos sintéticos del benchmark."""
+
+
+class Command(BaseCommand):
+    help = 'Mide marcaciones/segundo de la ingesta por lotes ATTLOG (los datos se revierten al finalizar)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 100000],
+                            help='Número de líneas de cada payload a medir')
+        parser.add_argument('--employees', type=int, default=500,
+                            help='Número de empleados sintéticos que marcan')
+        parser.add_argument('--file-lines', type=int, default=0,
+                            help='Genera un archivo .dat de N líneas (p. ej. 500000) y mide la importación USB')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('--- Benchmark de ingesta ATTLOG ---'))
+        try:
+            with transaction.atomic():
+                pins = self._create_employees(options['employees'])
+                device = BiometricDevice.objects.create(
+                    name='BENCHMARK', ip_address='127.0.0.1', location='Benchmark', serial_number='BENCH'
+                )
+                start = datetime(2000, 1, 1, 7, 0, 0)
+                for size in options['sizes']:
+                    body = self._build_payload(pins, size, start)
+                    start += timedelta(seconds=size + 1)
+                    self._run(device, body, size)
+                if options['file_lines']:
+                    self._run_file(device, pins, options['file_lines'], start)
+                raise _Rollback()
+        except _Rollback:
+            pass
+        self.stdout.write(self.style.SUCCESS('Benchmark finalizado. No se guardaron datos.'))
+
+    def _create_employees(self, count):
+        pins = []
+        for i in range(count):
+            person = Person.objects.create(first_name='Bench', last_name=f'{i:06d}')
+            pin = str(900000 + i)
+            InstitutionalData.objects.create(employee=person.employee_profile, biometric_id=pin)
+            pins.append(pin)
+        return pins
+
+    def _build_payload(self, pins, size, start):
+        lines = []
+        for i in range(size):
+            stamp = start + timedelta(seconds=i)
+            lines.append(f"{pins[i % len(pins)]}\t{stamp:%Y-%m-%d %H:%M:%S}\t0\t1\t0\t0")
+        return '\n'.join(lines)
+
+    def _run(self, device, body, size):
+        began = time.perf_counter()
+        punches, rejected = parse_attlog(body)
+        load = BiometricLoad.objects.create(biometric=device, load_type="BENCHMARK")
+        result = save_punches(load, punches)
+        elapsed = time.perf_counter() - began
+        self.stdout.write(
+            f"{size:>8} líneas: {elapsed:8.3f}s  {size / elapsed:10.0f} marcaciones/s  "
+            f"(insertadas {result['inserted']}, rechazadas {rejected})"
+        )
+
+    def _run_file(self, device, pins, size, start):
+        with tempfile.NamedTemporaryFile('w', suffix='.dat', delete=False, encoding='utf-8') as handle:
+            for i in range(size):
+                stamp = start + timedelta(seconds=i)
+                handle.write(f"{pins[i % len(pins)]}\t{stamp:%Y-%m-%d %H:%M:%S}\t0\t1\t0\t0\n")
+            path = handle.name
+        try:
+            megabytes = os.path.getsize(path) / (1024 * 1024)
+            load = BiometricLoad.objects.create(biometric=device, load_type="BENCHMARK")
+            began = time.perf_counter()
+            with open(path, 'rb') as dat_file:
+                summary = import_attendance_lines(load, dat_file)
+            elapsed = time.perf_counter() - began
+            self.stdout.write(
+                f"Archivo USB {size} líneas ({megabytes:.1f} MB): {elapsed:8.3f}s  "
+                f"{size / elapsed:10.0f} marcaciones/s  (insertadas {summary['inserted']})"
+            )
+        finally:
+            os.remove(path)
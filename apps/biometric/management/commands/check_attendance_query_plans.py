@@ -0,0 +1,80 @@
+# apps/biometric/management/commands/check_attendance_query_plans.py
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from biometric.models import AttendanceRegistry, BiometricDevice, BiometricLoad
+from employee.models import Employee
+from person.models import Person
+
+
+class _Rollback(Exception):
+    """Revierte los datos sintéticos al terminar la verificación."""
+
+
+class Command(BaseCommand):
+    help = ('Verifica con EXPLAIN que las consultas por rango de AttendanceRegistry usen índices. '
+            'Con --seed carga N marcaciones sintéticas (PostgreSQL) que se revierten al final')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='Marcaciones sintéticas a cargar (p. ej. 3000000)')
+        parser.add_argument('--employees', type=int, default=2000, help='Empleados sintéticos para el seed')
+
+    def handle(self, *args, **options):
+        failures = []
+        try:
+            with transaction.atomic():
+                if options['seed']:
+                    self._seed(options['seed'], options['employees'])
+                failures = self._check_plans()
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        if failures:
+            raise CommandError(f"Consultas sin índice: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS('Todas las consultas usan índices.'))
+
+    def _seed(self, rows, employees):
+        if connection.vendor != 'postgresql':
+            raise CommandError('El seed masivo solo está soportado en PostgreSQL.')
+        self.stdout.write(f'Cargando {rows} marcaciones sintéticas...')
+        people = Person.objects.bulk_create(
+            [Person(first_name='Plan', last_name=f'{i:06d}') for i in range(employees)], batch_size=2000)
+        employee_ids = [e.pk for e in Employee.objects.bulk_create([Employee(person=p) for p in people],
+                                                                   batch_size=2000)]
+        device = BiometricDevice.objects.create(name='QUERY_PLAN', ip_address='127.0.0.1', location='Seed')
+        load = BiometricLoad.objects.create(biometric=device, load_type='BENCHMARK')
+        table = AttendanceRegistry._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                INSERT INTO {table}
+                    (is_active, created_at, updated_at, employee_id, biometric_load_id, employee_id_bio, registry_date)
+                SELECT true, now(), now(), (%s::bigint[])[1 + g %% %s], %s, '0',
+                       timestamp '2015-01-01' + g * interval '1 minute'
+                FROM generate_series(0, %s - 1) AS g
+            """, [employee_ids, len(employee_ids), load.pk, rows])
+            cursor.execute(f"ANALYZE {table}")
+
+    def _check_plans(self):
+        table = AttendanceRegistry._meta.db_table
+        today = date.today()
+        employee_id = AttendanceRegistry.objects.order_by().values_list('employee_id', flat=True).first() or 0
+        queries = {
+            'for_day': AttendanceRegistry.objects.for_day(today).order_by(),
+            'for_month+employee': AttendanceRegistry.objects.for_month(today.year, today.month)
+            .filter(employee_id=employee_id),
+            'between+employee': AttendanceRegistry.objects.between(date(today.year, 1, 1), today)
+            .filter(employee_id=employee_id),
+        }
+        failures = []
+        for name, queryset in queries.items():
+            plan = queryset.explain()
+            uses_index = 'index' in plan.lower() and f'Seq Scan on {table}' not in plan
+            style = self.style.SUCCESS if uses_index else self.style.ERROR
+            self.stdout.write(style(f'[{name}]'))
+            self.stdout.write(plan)
+            if not uses_index:
+                failures.append(name)
+        return failures
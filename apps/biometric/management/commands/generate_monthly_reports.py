@@ -0,0 +1,54 @@
+# apps/biometric/management/commands/generate_monthly_reports.py
+import os
+import time
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from biometric.reports import build_zip, render_monthly_batch, unit_employee_ids
+from institution.models import AdministrativeUnit
+
+
+class Command(BaseCommand):
+    help = 'Genera los calendarios mensuales de asistencia de una o todas las unidades (ZIP por unidad)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--unit', type=int, nargs='+', help='IDs de unidades (por defecto las unidades raíz)')
+        parser.add_argument('--descendants', action='store_true', help='Incluye las dependencias de cada unidad')
+        parser.add_argument('--year', type=int, help='Año (por defecto el del mes anterior)')
+        parser.add_argument('--month', type=int, help='Mes (por defecto el mes anterior)')
+        parser.add_argument('--workers', type=int, default=None, help='Procesos de renderizado')
+        parser.add_argument('--output', default=os.path.join(settings.MEDIA_ROOT, 'reports', 'attendance'),
+                            help='Directorio de salida')
+
+    def handle(self, *args, **options):
+        today = date.today()
+        previous = date(today.year - 1, 12, 1) if today.month == 1 else date(today.year, today.month - 1, 1)
+        year = options['year'] or previous.year
+        month = options['month'] or previous.month
+
+        units = AdministrativeUnit.objects.filter(is_active=True)
+        if options['unit']:
+            units = units.filter(pk__in=options['unit'])
+        else:
+            units = units.filter(parent__isnull=True)
+        if not units.exists():
+            raise CommandError('No se encontraron unidades administrativas.')
+
+        output_dir = os.path.join(options['output'], f'{year}-{month:02d}')
+        os.makedirs(output_dir, exist_ok=True)
+
+        for unit in units:
+            began = time.perf_counter()
+            files = render_monthly_batch(unit_employee_ids(unit, options['descendants']), year, month,
+                                         max_workers=options['workers'])
+            if not files:
+                self.stdout.write(f'{unit.name}: sin empleados con ID biométrico.')
+                continue
+            path = os.path.join(output_dir, f'unidad_{unit.pk}.zip')
+            with open(path, 'wb') as handle:
+                handle.write(build_zip(files))
+            self.stdout.write(self.style.SUCCESS(
+                f'{unit.name}: {len(files)} reportes en {time.perf_counter() - began:.1f}s -> {path}'
+            ))
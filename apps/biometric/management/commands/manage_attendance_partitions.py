@@ -0,0 +1,51 @@
+# apps/biometric/management/commands/manage_attendance_partitions.py
+from datetime import date, datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from biometric.partitions import (
+    ARCHIVE_SCHEMA, archive_partitions, ensure_future_partitions, is_partitioned, list_partitions
+)
+
+
+class Command(BaseCommand):
+    help = ('Crea las particiones mensuales futuras de AttendanceRegistry y separa (archiva o elimina) '
+            'las anteriores a un mes dado. Pensado para ejecutarse mensualmente desde cron')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ahead', type=int, default=3, help='Meses futuros a crear (además del actual)')
+        parser.add_argument('--archive-before', help='Separar las particiones anteriores a este mes (AAAA-MM)')
+        parser.add_argument('--drop', action='store_true',
+                            help=f'Eliminar las particiones separadas en lugar de moverlas al esquema {ARCHIVE_SCHEMA}')
+        parser.add_argument('--list', action='store_true', help='Listar las particiones actuales')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('El particionamiento de marcaciones solo está disponible en PostgreSQL.')
+
+        archive_before = None
+        if options['archive_before']:
+            try:
+                archive_before = datetime.strptime(options['archive_before'], '%Y-%m').date()
+            except ValueError:
+                raise CommandError('--archive-before debe tener el formato AAAA-MM.')
+            if archive_before > date.today():
+                raise CommandError('No se pueden archivar particiones del mes actual o futuras.')
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            if not is_partitioned(cursor):
+                raise CommandError('La tabla de marcaciones no está particionada; ejecute las migraciones.')
+
+            created = ensure_future_partitions(cursor, months_ahead=options['ahead'])
+            for name in created:
+                self.stdout.write(self.style.SUCCESS(f'Creada {name}'))
+
+            if archive_before:
+                for name in archive_partitions(cursor, archive_before, drop=options['drop']):
+                    action = 'Eliminada' if options['drop'] else f'Movida a {ARCHIVE_SCHEMA}:'
+                    self.stdout.write(self.style.WARNING(f'{action} {name}'))
+
+            if options['list']:
+                for name, month_start, estimated_rows in list_partitions(cursor):
+                    self.stdout.write(f'{month_start:%Y-%m}  {name}  ~{estimated_rows} filas')
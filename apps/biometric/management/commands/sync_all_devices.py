@@ -0,0 +1,54 @@
+# apps/biometric/management/commands/sync_all_devices.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from biometric.fake_zk import FakeZK
+from biometric.models import BiometricDevice
+from biometric.sync import DEFAULT_TIMEOUT, DEFAULT_WORKERS, sync_all_devices
+from employee.models import InstitutionalData
+
+
+class Command(BaseCommand):
+    help = 'Descarga en paralelo las marcaciones de todos los biométricos activos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--device', type=int, nargs='+', help='IDs de dispositivos (por defecto todos los activos)')
+        parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Hilos simultáneos')
+        parser.add_argument('--timeout', type=int, default=DEFAULT_TIMEOUT, help='Tiempo máximo por dispositivo (s)')
+        parser.add_argument('--full', action='store_true',
+                            help='Ignora la última marcación sincronizada y revisa toda la memoria del equipo')
+        parser.add_argument('--fake', action='store_true',
+                            help='Usa dispositivos simulados (FakeZK). Solo sobre bases de datos de prueba')
+        parser.add_argument('--fake-records', type=int, default=10000, help='Marcaciones por dispositivo simulado')
+        parser.add_argument('--fake-latency', type=float, default=0.0, help='Latencia de descarga simulada (s)')
+
+    def handle(self, *args, **options):
+        devices = BiometricDevice.objects.filter(is_active=True)
+        if options['device']:
+            devices = devices.filter(pk__in=options['device'])
+
+        zk_class = None
+        if options['fake']:
+            pins = list(
+                InstitutionalData.objects.exclude(biometric_id__isnull=True).exclude(biometric_id='')
+                .values_list('biometric_id', flat=True)[:1000]
+            )
+            zk_class = FakeZK.factory(pins=pins, records=options['fake_records'], latency=options['fake_latency'])
+
+        self.stdout.write(self.style.SUCCESS(f'--- Sincronizando {devices.count()} dispositivos ---'))
+        began = time.perf_counter()
+        loads = sync_all_devices(devices, max_workers=options['workers'], timeout=options['timeout'],
+                                 zk_class=zk_class, full=options['full'])
+        elapsed = time.perf_counter() - began
+
+        for load in sorted(loads, key=lambda l: l.biometric.name):
+            line = (f"{load.biometric.name}: {load.records_seen} leídos / {load.records_skipped} omitidos / "
+                    f"{load.num_records} insertados en {load.duration_seconds}s")
+            if load.error_message:
+                self.stdout.write(self.style.ERROR(f"{line} - {load.error_message}"))
+            else:
+                self.stdout.write(line)
+
+        total = sum(load.num_records for load in loads)
+        self.stdout.write(self.style.SUCCESS(f'Total: {total} registros nuevos en {elapsed:.2f}s'))
@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-17 09:17
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_punches(apps, schema_editor):
+    """
+    Elimina marcaciones repetidas (mismo empleado y misma fecha/hora)
+    conservando la primera, para poder crear la restricción única.
+    """
+    AttendanceRegistry = apps.get_model('biometric', 'AttendanceRegistry')
+    duplicates = (
+        AttendanceRegistry.objects.values('employee_id', 'registry_date')
+        .annotate(total=Count('id'), keep_id=Min('id'))
+        .filter(total__gt=1)
+    )
+    for row in duplicates.iterator():
+        AttendanceRegistry.objects.filter(
+            employee_id=row['employee_id'],
+            registry_date=row['registry_date'],
+        ).exclude(id=row['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('biometric', '0002_fix_timezone_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_punches, reverse_code=migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='attendanceregistry',
+            constraint=models.UniqueConstraint(fields=('employee', 'registry_date'), name='unique_attendance_per_employee'),
+        ),
+    ]
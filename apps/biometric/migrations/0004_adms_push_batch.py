@@ -0,0 +1,42 @@
+# Generated by Django 6.0 on 2026-10-17 09:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('biometric', '0003_attendance_unique_employee_registry_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdmsPushBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Estado')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última Modificación')),
+                ('serial_number', models.CharField(max_length=100, verbose_name='Número de Serie')),
+                ('table', models.CharField(default='ATTLOG', max_length=20, verbose_name='Tabla ADMS')),
+                ('content_hash', models.CharField(max_length=64, verbose_name='Hash del Contenido')),
+                ('raw_body', models.TextField(verbose_name='Contenido Recibido')),
+                ('processed_at', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Procesamiento')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Intentos')),
+                ('error', models.TextField(blank=True, null=True, verbose_name='Error')),
+                ('biometric_load', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='push_batches', to='biometric.biometricload', verbose_name='Carga Generada')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(app_label)s_%(class)s_created', to=settings.AUTH_USER_MODEL, verbose_name='Creado por')),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(app_label)s_%(class)s_updated', to=settings.AUTH_USER_MODEL, verbose_name='Actualizado por')),
+            ],
+            options={
+                'verbose_name': 'Lote ADMS en Cola',
+                'verbose_name_plural': 'Lotes ADMS en Cola',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['processed_at', 'created_at'], name='adms_batch_pending_idx')],
+                'constraints': [models.UniqueConstraint(fields=('serial_number', 'content_hash'), name='unique_adms_push_batch')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-17 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('biometric', '0004_adms_push_batch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='biometricload',
+            name='duration_seconds',
+            field=models.FloatField(blank=True, null=True, verbose_name='Duración (s)'),
+        ),
+        migrations.AddField(
+            model_name='biometricload',
+            name='error_message',
+            field=models.TextField(blank=True, null=True, verbose_name='Error'),
+        ),
+    ]
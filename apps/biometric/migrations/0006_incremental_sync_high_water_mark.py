@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-17 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('biometric', '0005_biometricload_duration_error'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='biometricdevice',
+            name='last_punch_synced',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Última Marcación Sincronizada'),
+        ),
+        migrations.AddField(
+            model_name='biometricload',
+            name='records_seen',
+            field=models.IntegerField(default=0, verbose_name='Registros Leídos'),
+        ),
+        migrations.AddField(
+            model_name='biometricload',
+            name='records_skipped',
+            field=models.IntegerField(default=0, verbose_name='Registros Omitidos'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 6.0 on 2026-10-17 10:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('biometric', '0006_incremental_sync_high_water_mark'),
+        ('employee', '0005_payrollinfo_roles_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Estado')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última Modificación')),
+                ('date', models.DateField(verbose_name='Fecha')),
+                ('first_in', models.DateTimeField(blank=True, null=True, verbose_name='Primera Marcación')),
+                ('last_out', models.DateTimeField(blank=True, null=True, verbose_name='Última Marcación')),
+                ('late_minutes', models.PositiveIntegerField(default=0, verbose_name='Minutos de Atraso')),
+                ('worked_minutes', models.PositiveIntegerField(default=0, verbose_name='Minutos Trabajados')),
+                ('status', models.CharField(choices=[('PRESENT', 'Asistió'), ('LATE', 'Atraso'), ('INCOMPLETE', 'Marcaciones Incompletas'), ('ABSENT', 'Falta'), ('HOLIDAY', 'Feriado'), ('REST', 'Descanso'), ('NO_SCHEDULE', 'Sin Horario')], max_length=20, verbose_name='Estado')),
+                ('is_stale', models.BooleanField(default=False, verbose_name='Pendiente de Recalcular')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(app_label)s_%(class)s_created', to=settings.AUTH_USER_MODEL, verbose_name='Creado por')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='employee.employee', verbose_name='Empleado')),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(app_label)s_%(class)s_updated', to=settings.AUTH_USER_MODEL, verbose_name='Actualizado por')),
+            ],
+            options={
+                'verbose_name': 'Resumen Diario de Asistencia',
+                'verbose_name_plural': 'Resúmenes Diarios de Asistencia',
+                'ordering': ['employee', 'date'],
+                'indexes': [models.Index(fields=['date', 'status'], name='daily_summary_date_status_idx')],
+                'constraints': [models.UniqueConstraint(fields=('employee', 'date'), name='unique_daily_summary_per_employee')],
+            },
+        ),
+    ]
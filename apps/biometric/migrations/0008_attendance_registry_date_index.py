@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-17 10:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('biometric', '0007_daily_attendance_summary'),
+        ('employee', '0005_payrollinfo_roles_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendanceregistry',
+            index=models.Index(fields=['registry_date'], name='attendance_registry_date_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0 on 2026-10-17 11:05
+
+from django.db import migrations
+
+from biometric.partitions import is_partitioned, partition_existing_table
+
+
+def partition_attendance_registry(apps, schema_editor):
+    """
+    Convierte biometric_attendanceregistry en una tabla particionada por mes.
+    Solo aplica en PostgreSQL; otros motores conservan la tabla simple.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        if not is_partitioned(cursor):
+            partition_existing_table(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('biometric', '0008_attendance_registry_date_index'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='attendanceregistry',
+            options={'verbose_name': 'Registro de Asistencia', 'verbose_name_plural': 'Registros de Asistencia'},
+        ),
+        # La tabla particionada es compatible con los estados anteriores del modelo,
+        # por eso revertir no deshace el particionamiento.
+        migrations.RunPython(partition_attendance_registry, reverse_code=migrations.RunPython.noop),
+    ]
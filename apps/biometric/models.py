@@ -1,3 +1,5 @@
+from datetime import datetime, timedelta
+
 from django.db import models
 from core.models import BaseModel
 from employee.models import Employee
@@ -11,6 +13,8 @@ class BiometricDevice(BaseModel):
     location = models.CharField(max_length=250, verbose_name="Ubicación Física")
     serial_number = models.CharField(max_length=100, blank=True, null=True, verbose_name="Número de Serie")
     model_name = models.CharField(max_length=100, blank=True, null=True, verbose_name="Modelo")
+    last_punch_synced = models.DateTimeField(blank=True, null=True,
+                                             verbose_name="Última Marcación Sincronizada")
 
     class Meta:
         verbose_name = "Biométrico"
@@ -26,8 +30,12 @@ class BiometricLoad(BaseModel):
     biometric = models.ForeignKey(BiometricDevice, on_delete=models.PROTECT, related_name='loads',
                                   verbose_name="Biométrico")
     num_records = models.IntegerField(default=0, verbose_name="Registros Cargados")
+    records_seen = models.IntegerField(default=0, verbose_name="Registros Leídos")
+    records_skipped = models.IntegerField(default=0, verbose_name="Registros Omitidos")
     reason = models.TextField(blank=True, null=True, verbose_name="Motivo/Observación")
     load_type = models.CharField(max_length=50, default="AUTOMATIC", verbose_name="Tipo de Carga")
+    duration_seconds = models.FloatField(blank=True, null=True, verbose_name="Duración (s)")
+    error_message = models.TextField(blank=True, null=True, verbose_name="Error")
 
     class Meta:
         verbose_name = "Carga de Biométrico"
@@ -35,6 +43,28 @@ class BiometricLoad(BaseModel):
         ordering = ['-created_at']
 
 
+class AttendanceRegistryQuerySet(models.QuerySet):
+    """
+    Filtros por fecha como rangos semiabiertos [inicio, fin) sobre registry_date,
+    de modo que las consultas usen los índices en lugar de envolver la columna
+    en funciones (__date, __year, __month).
+    """
+
+    def between(self, start_date, end_date):
+        """Marcaciones entre dos fechas, ambas inclusive."""
+        start = datetime.combine(start_date, datetime.min.time())
+        end = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+        return self.filter(registry_date__gte=start, registry_date__lt=end)
+
+    def for_day(self, day):
+        return self.between(day, day)
+
+    def for_month(self, year, month):
+        start = datetime(year, month, 1)
+        end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+        return self.filter(registry_date__gte=start, registry_date__lt=end)
+
+
 class AttendanceRegistry(BaseModel):
     """Registro individual de cada marcación."""
     employee = models.ForeignKey(Employee, on_delete=models.PROTECT, related_name='attendance_records',
@@ -43,7 +73,80 @@ class AttendanceRegistry(BaseModel):
     employee_id_bio = models.CharField(max_length=20, verbose_name="ID en Biométrico")
     registry_date = models.DateTimeField(verbose_name="Fecha/Hora de Marcación")
 
+    objects = AttendanceRegistryQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Registro de Asistencia"
         verbose_name_plural = "Registros de Asistencia"
-        ordering = ['-registry_date']
\ No newline at end of file
+        # Sin ordering por defecto: cada consulta ordena explícitamente y así la
+        # tabla particionada por mes (ver partitions.py) no paga un ORDER BY global.
+        # La restricción única crea también el índice compuesto (employee, registry_date)
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'registry_date'], name='unique_attendance_per_employee'),
+        ]
+        indexes = [
+            models.Index(fields=['registry_date'], name='attendance_registry_date_idx'),
+        ]
+
+class AdmsPushBatch(BaseModel):
+    """Cuerpo ATTLOG recibido por ADMS, en cola hasta que el worker lo procese."""
+    serial_number = models.CharField(max_length=100, verbose_name="Número de Serie")
+    table = models.CharField(max_length=20, default="ATTLOG", verbose_name="Tabla ADMS")
+    content_hash = models.CharField(max_length=64, verbose_name="Hash del Contenido")
+    raw_body = models.TextField(verbose_name="Contenido Recibido")
+    processed_at = models.DateTimeField(blank=True, null=True, verbose_name="Fecha de Procesamiento")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Intentos")
+    error = models.TextField(blank=True, null=True, verbose_name="Error")
+    biometric_load = models.ForeignKey(BiometricLoad, on_delete=models.SET_NULL, blank=True, null=True,
+                                       related_name='push_batches', verbose_name="Carga Generada")
+
+    class Meta:
+        verbose_name = "Lote ADMS en Cola"
+        verbose_name_plural = "Lotes ADMS en Cola"
+        ordering = ['created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['serial_number', 'content_hash'], name='unique_adms_push_batch'),
+        ]
+        indexes = [
+            models.Index(fields=['processed_at', 'created_at'], name='adms_batch_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.serial_number} - {self.created_at}"
+
+
+class DailyAttendanceSummary(BaseModel):
+    """Resumen materializado de asistencia por empleado y día (ver attendance.py)."""
+    STATUS_CHOICES = [
+        ('PRESENT', 'Asistió'),
+        ('LATE', 'Atraso'),
+        ('INCOMPLETE', 'Marcaciones Incompletas'),
+        ('ABSENT', 'Falta'),
+        ('HOLIDAY', 'Feriado'),
+        ('REST', 'Descanso'),
+        ('NO_SCHEDULE', 'Sin Horario'),
+    ]
+
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='attendance_summaries',
+                                 verbose_name="Empleado")
+    date = models.DateField(verbose_name="Fecha")
+    first_in = models.DateTimeField(blank=True, null=True, verbose_name="Primera Marcación")
+    last_out = models.DateTimeField(blank=True, null=True, verbose_name="Última Marcación")
+    late_minutes = models.PositiveIntegerField(default=0, verbose_name="Minutos de Atraso")
+    worked_minutes = models.PositiveIntegerField(default=0, verbose_name="Minutos Trabajados")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, verbose_name="Estado")
+    is_stale = models.BooleanField(default=False, verbose_name="Pendiente de Recalcular")
+
+    class Meta:
+        verbose_name = "Resumen Diario de Asistencia"
+        verbose_name_plural = "Resúmenes Diarios de Asistencia"
+        ordering = ['employee', 'date']
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'date'], name='unique_daily_summary_per_employee'),
+        ]
+        indexes = [
+            models.Index(fields=['date', 'status'], name='daily_summary_date_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.employee_id} - {self.date} ({self.status})"
@@ -0,0 +1,183 @@
+"""
+Particionamiento mensual por rango de la tabla de marcaciones (PostgreSQL).
+
+La tabla biometric_attendanceregistry se particiona por registry_date con una
+partición por mes (biometric_attendanceregistry_AAAA_MM) y una partición DEFAULT
+que recibe marcaciones fuera de rango (p. ej. relojes con la fecha desfasada).
+Archivar un mes es un DETACH PARTITION: una operación de metadatos en lugar de
+un DELETE masivo.
+
+Las funciones reciben un cursor para poder usarse tanto desde la migración como
+desde el comando manage_attendance_partitions.
+"""
+import re
+from datetime import date
+
+TABLE = 'biometric_attendanceregistry'
+DEFAULT_PARTITION = f'{TABLE}_default'
+ARCHIVE_SCHEMA = 'attendance_archive'
+PARTITION_PATTERN = re.compile(rf'^{TABLE}_(\d{{4}})_(\d{{2}})$')
+
+
+def add_months(day, months):
+    month_index = day.month - 1 + months
+    return date(day.year + month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(month_start):
+    return f'{TABLE}_{month_start.year}_{month_start.month:02d}'
+
+
+def is_partitioned(cursor):
+    cursor.execute("""
+        SELECT EXISTS (
+            SELECT 1 FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            WHERE c.relname = %s AND pg_table_is_visible(c.oid)
+        )
+    """, [TABLE])
+    return cursor.fetchone()[0]
+
+
+def list_partitions(cursor):
+    """Particiones mensuales adjuntas: lista de (nombre, primer día del mes, filas estimadas)."""
+    cursor.execute("""
+        SELECT child.relname, child.reltuples::bigint
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)
+        ORDER BY child.relname
+    """, [TABLE])
+    partitions = []
+    for name, estimated_rows in cursor.fetchall():
+        match = PARTITION_PATTERN.match(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1), max(estimated_rows, 0)))
+    return partitions
+
+
+def create_partition(cursor, month_start):
+    """
+    Crea la partición del mes si no existe. Si la partición DEFAULT ya tiene filas
+    de ese mes, se mueven a la nueva partición.
+    """
+    name = partition_name(month_start)
+    lower, upper = month_start.isoformat(), add_months(month_start, 1).isoformat()
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+    if cursor.fetchone()[0]:
+        return False
+
+    cursor.execute(
+        f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE registry_date >= %s AND registry_date < %s)",
+        [lower, upper]
+    )
+    if not cursor.fetchone()[0]:
+        cursor.execute(f"CREATE TABLE {name} PARTITION OF {TABLE} FOR VALUES FROM ('{lower}') TO ('{upper}')")
+        return True
+
+    cursor.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {DEFAULT_PARTITION}")
+    cursor.execute(f"CREATE TABLE {name} PARTITION OF {TABLE} FOR VALUES FROM ('{lower}') TO ('{upper}')")
+    cursor.execute(
+        f"INSERT INTO {TABLE} SELECT * FROM {DEFAULT_PARTITION} WHERE registry_date >= %s AND registry_date < %s",
+        [lower, upper]
+    )
+    cursor.execute(
+        f"DELETE FROM {DEFAULT_PARTITION} WHERE registry_date >= %s AND registry_date < %s", [lower, upper]
+    )
+    cursor.execute(f"ALTER TABLE {TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT")
+    return True
+
+
+def ensure_future_partitions(cursor, months_ahead=3, today=None):
+    """Crea las particiones del mes actual y de los `months_ahead` meses siguientes."""
+    current = add_months(today or date.today(), 0)
+    return [
+        partition_name(add_months(current, offset))
+        for offset in range(months_ahead + 1)
+        if create_partition(cursor, add_months(current, offset))
+    ]
+
+
+def archive_partitions(cursor, before, drop=False):
+    """
+    Separa las particiones de meses anteriores a `before`. Por defecto se mueven
+    al esquema de archivo (consultables pero fuera de la tabla viva); con
+    drop=True se eliminan.
+    """
+    archived = []
+    if not drop:
+        cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}")
+    for name, month_start, _ in list_partitions(cursor):
+        if month_start >= add_months(before, 0):
+            continue
+        cursor.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {name}")
+        if drop:
+            cursor.execute(f"DROP TABLE {name}")
+        else:
+            cursor.execute(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}")
+        archived.append(name)
+    return archived
+
+
+def partition_existing_table(cursor, months_ahead=3):
+    """
+    Convierte la tabla actual en una tabla particionada por mes conservando los
+    datos, los índices y los nombres de las restricciones.
+
+    PostgreSQL exige que la clave de partición forme parte de toda clave única,
+    por lo que la clave primaria pasa a ser (id, registry_date); id sigue siendo
+    único porque proviene de una secuencia.
+    """
+    legacy = f'{TABLE}_legacy'
+    staging = f'{TABLE}_partitioned'
+
+    cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {legacy}")
+    cursor.execute(f"CREATE SEQUENCE {staging}_id_seq")
+    cursor.execute(f"""
+        CREATE TABLE {staging} (
+            id bigint NOT NULL DEFAULT nextval('{staging}_id_seq'),
+            is_active boolean NOT NULL,
+            created_at timestamp without time zone NOT NULL,
+            updated_at timestamp without time zone NOT NULL,
+            employee_id_bio varchar(20) NOT NULL,
+            registry_date timestamp without time zone NOT NULL,
+            created_by_id bigint NULL REFERENCES core_user (id) DEFERRABLE INITIALLY DEFERRED,
+            employee_id bigint NOT NULL REFERENCES employee_employee (id) DEFERRABLE INITIALLY DEFERRED,
+            updated_by_id bigint NULL REFERENCES core_user (id) DEFERRABLE INITIALLY DEFERRED,
+            biometric_load_id bigint NOT NULL
+                REFERENCES biometric_biometricload (id) DEFERRABLE INITIALLY DEFERRED,
+            CONSTRAINT {staging}_pkey PRIMARY KEY (id, registry_date),
+            CONSTRAINT {staging}_unique UNIQUE (employee_id, registry_date)
+        ) PARTITION BY RANGE (registry_date)
+    """)
+    cursor.execute(f"ALTER SEQUENCE {staging}_id_seq OWNED BY {staging}.id")
+    cursor.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {staging} DEFAULT")
+
+    # Una partición por cada mes con datos, más las de los próximos meses
+    cursor.execute(f"SELECT DISTINCT date_trunc('month', registry_date)::date FROM {legacy}")
+    months = {row[0] for row in cursor.fetchall()}
+    current = add_months(date.today(), 0)
+    months.update(add_months(current, offset) for offset in range(months_ahead + 1))
+    for month_start in sorted(months):
+        lower, upper = month_start.isoformat(), add_months(month_start, 1).isoformat()
+        cursor.execute(
+            f"CREATE TABLE {partition_name(month_start)} PARTITION OF {staging} "
+            f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        )
+
+    columns = ('id, is_active, created_at, updated_at, employee_id_bio, registry_date, '
+               'created_by_id, employee_id, updated_by_id, biometric_load_id')
+    cursor.execute(f"INSERT INTO {staging} ({columns}) SELECT {columns} FROM {legacy}")
+    cursor.execute(f"SELECT setval('{staging}_id_seq', COALESCE((SELECT MAX(id) FROM {staging}), 0) + 1, false)")
+    cursor.execute(f"DROP TABLE {legacy}")
+
+    # Nombres definitivos (los mismos que tenía la tabla original)
+    cursor.execute(f"ALTER TABLE {staging} RENAME TO {TABLE}")
+    cursor.execute(f"ALTER SEQUENCE {staging}_id_seq RENAME TO {TABLE}_id_seq")
+    cursor.execute(f"ALTER TABLE {TABLE} RENAME CONSTRAINT {staging}_pkey TO {TABLE}_pkey")
+    cursor.execute(f"ALTER TABLE {TABLE} RENAME CONSTRAINT {staging}_unique TO unique_attendance_per_employee")
+    cursor.execute(f"CREATE INDEX attendance_registry_date_idx ON {TABLE} (registry_date)")
+    for column in ('biometric_load_id', 'created_by_id', 'updated_by_id'):
+        cursor.execute(f"CREATE INDEX {TABLE}_{column}_part_idx ON {TABLE} ({column})")
+    cursor.execute(f"ANALYZE {TABLE}")
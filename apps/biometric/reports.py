@@ -0,0 +1,177 @@
+"""
+Generación de reportes PDF de asistencia, individual y por lotes.
+
+Los contextos se arman con datos planos (sin instancias de modelos) para que el
+renderizado con xhtml2pdf pueda repartirse en un pool de procesos sin volver a
+consultar la base de datos; la configuración institucional (membrete y logo) la
+resuelve cada proceso una sola vez con SystemConfiguration.get_current().
+"""
+import calendar
+import io
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+import django
+from django.db import connections
+from django.db.models import Count, Max
+from django.template.loader import get_template
+from xhtml2pdf import pisa
+
+from core.documents import document_fingerprint, document_last_modified
+from core.models import SystemConfiguration
+from employee.models import Employee
+from .attendance import get_summaries
+from .models import AttendanceRegistry, BiometricDevice, DailyAttendanceSummary
+
+MONTHS_ES = ["", "ENERO", "FEBRERO", "MARZO", "ABRIL", "MAYO", "JUNIO", "JULIO", "AGOSTO", "SEPTIEMBRE", "OCTUBRE",
+             "NOVIEMBRE", "DICIEMBRE"]
+MONTHLY_TEMPLATE = 'biometric/reports/pdf_attendance_calendar.html'
+SPECIFIC_TEMPLATE = 'biometric/reports/pdf_attendance_specific.html'
+STATUS_LABELS = dict(DailyAttendanceSummary.STATUS_CHOICES)
+
+
+def monthly_calendar_contexts(employee_ids, year, month):
+    """
+    Arma el contexto del calendario mensual de varios empleados con una consulta
+    para las marcaciones y otra para los resúmenes diarios.
+    """
+    employee_ids = list(employee_ids)
+
+    punches_map = defaultdict(lambda: defaultdict(list))
+    punches = AttendanceRegistry.objects.for_month(year, month).filter(
+        employee_id__in=employee_ids
+    ).select_related('biometric_load__biometric').order_by('employee_id', 'registry_date')
+    for p in punches.iterator(chunk_size=5000):
+        punches_map[p.employee_id][p.registry_date.day].append({
+            'time': p.registry_date.strftime('%H:%M'),
+            'device': p.biometric_load.biometric.name[:10]
+        })
+
+    summary_map = defaultdict(dict)
+    last_day = date(year, month, calendar.monthrange(year, month)[1])
+    for s in get_summaries(date(year, month, 1), last_day, employee_ids):
+        summary_map[s.employee_id][s.date.day] = {
+            'status': s.status,
+            'get_status_display': STATUS_LABELS.get(s.status, s.status),
+            'late_minutes': s.late_minutes,
+            'worked_minutes': s.worked_minutes,
+        }
+
+    weeks = calendar.Calendar(firstweekday=0).monthdayscalendar(year, month)
+    employees = Employee.objects.filter(pk__in=employee_ids).values_list(
+        'pk', 'person__first_name', 'person__last_name', 'person__document_number')
+
+    contexts = {}
+    for employee_id, first_name, last_name, document_number in employees:
+        days = summary_map.get(employee_id, {})
+        employee_punches = punches_map.get(employee_id, {})
+        calendar_data = [
+            [{'day': day if day != 0 else '', 'punches': employee_punches.get(day, []), 'summary': days.get(day)}
+             for day in week]
+            for week in weeks
+        ]
+        contexts[employee_id] = {
+            'emp': {'person': {'full_name': f"{first_name} {last_name}", 'document_number': document_number}},
+            'month_name': MONTHS_ES[month], 'year': year,
+            'calendar': calendar_data,
+            'totals': {
+                'late_minutes': sum(d['late_minutes'] for d in days.values()),
+                'worked_hours': round(sum(d['worked_minutes'] for d in days.values()) / 60, 2),
+                'absences': sum(1 for d in days.values() if d['status'] == 'ABSENT'),
+            },
+            'today': datetime.now(),  # Naive
+        }
+    return contexts
+
+
+def _employee_stamp(employee_id):
+    return Employee.objects.filter(pk=employee_id).values_list(
+        'updated_at', 'person__updated_at', 'institutional_data__updated_at').first() or ()
+
+
+def _punch_stamp(punches):
+    stamp = punches.aggregate(total=Count('id'), last=Max('updated_at'))
+    # Los nombres de equipo aparecen en el reporte
+    devices = BiometricDevice.objects.filter(
+        pk__in=punches.values('biometric_load__biometric_id')).aggregate(last=Max('updated_at'))
+    return stamp['total'], stamp['last'], devices['last']
+
+
+def monthly_report_fingerprint(employee_id, year, month):
+    """
+    Huella del calendario mensual de un empleado para core.documents: marcaciones,
+    resúmenes diarios (materializados antes de medirlos) y datos de la persona.
+    Retorna (huella, última modificación); la vista imprime esa última modificación
+    como fecha de emisión, así el documento guardado coincide con su huella.
+    """
+    first_day = date(year, month, 1)
+    last_day = date(year, month, calendar.monthrange(year, month)[1])
+    summaries = get_summaries(first_day, last_day, [employee_id]).aggregate(total=Count('id'), last=Max('updated_at'))
+    punches = _punch_stamp(AttendanceRegistry.objects.for_month(year, month).filter(employee_id=employee_id))
+    employee = _employee_stamp(employee_id)
+    fingerprint = document_fingerprint(MONTHLY_TEMPLATE, employee_id, year, month, punches,
+                                       summaries['total'], summaries['last'], employee)
+    return fingerprint, document_last_modified(MONTHLY_TEMPLATE, punches[1], punches[2], summaries['last'],
+                                              *employee)
+
+
+def specific_report_fingerprint(employee_id, start_date, end_date):
+    """Huella del reporte por rango de fechas (marcaciones y datos del empleado)."""
+    punches = _punch_stamp(AttendanceRegistry.objects.between(start_date, end_date).filter(employee_id=employee_id))
+    employee = _employee_stamp(employee_id)
+    fingerprint = document_fingerprint(SPECIFIC_TEMPLATE, employee_id, start_date, end_date, punches, employee)
+    return fingerprint, document_last_modified(SPECIFIC_TEMPLATE, punches[1], punches[2], *employee)
+
+
+def render_pdf(template_name, context):
+    """Renderiza una plantilla HTML a PDF y retorna los bytes."""
+    context = {'institution': SystemConfiguration.get_current(), **context}
+    html = get_template(template_name).render(context)
+    buffer = io.BytesIO()
+    pisa.CreatePDF(html, dest=buffer)
+    return buffer.getvalue()
+
+
+def _render_monthly(item):
+    filename, context = item
+    return filename, render_pdf(MONTHLY_TEMPLATE, context)
+
+
+def render_monthly_batch(employee_ids, year, month, max_workers=None):
+    """
+    Renderiza los calendarios mensuales de varios empleados en un pool de procesos.
+    Retorna una lista de (nombre_archivo, bytes_pdf).
+    """
+    contexts = monthly_calendar_contexts(employee_ids, year, month)
+    items = []
+    for context in contexts.values():
+        person = context['emp']['person']
+        identifier = person['document_number'] or person['full_name'].replace(' ', '_')
+        items.append((f"Asistencia_{year}_{month:02d}_{identifier}.pdf", context))
+    if not items:
+        return []
+
+    # Los procesos hijos no deben heredar conexiones abiertas a la base de datos
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=django.setup) as executor:
+        return list(executor.map(_render_monthly, items, chunksize=4))
+
+
+def build_zip(files):
+    """Empaqueta una lista de (nombre_archivo, bytes) en un ZIP en memoria."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for filename, content in files:
+            archive.writestr(filename, content)
+    return buffer.getvalue()
+
+
+def unit_employee_ids(unit, include_descendants=False):
+    """Empleados con ID biométrico de una unidad (opcionalmente con sus dependencias)."""
+    employees = unit.subtree_employees() if include_descendants else Employee.objects.filter(area=unit)
+    return list(
+        employees.filter(institutional_data__biometric_id__isnull=False)
+        .exclude(institutional_data__biometric_id='').values_list('pk', flat=True)
+    )
@@ -0,0 +1,56 @@
+from django.db.models import F, Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from schedule.models import EmployeeScheduleHistory, Schedule, ScheduleObservation
+from .attendance import invalidate_summaries
+from .models import DailyAttendanceSummary
+
+
+@receiver(pre_save, sender=EmployeeScheduleHistory)
+@receiver(pre_save, sender=ScheduleObservation)
+def remember_previous_range(sender, instance, **kwargs):
+    """Guarda el rango anterior para invalidarlo también si las fechas cambian."""
+    instance._previous_range = None
+    if instance.pk:
+        instance._previous_range = sender.objects.filter(pk=instance.pk).values_list(
+            'start_date', 'end_date').first()
+
+
+def _invalidate_ranges(instance, employee_ids=None):
+    ranges = [(instance.start_date, instance.end_date)]
+    if getattr(instance, '_previous_range', None):
+        ranges.append(instance._previous_range)
+    for start_date, end_date in ranges:
+        invalidate_summaries(start_date, end_date, employee_ids=employee_ids)
+
+
+@receiver(post_save, sender=EmployeeScheduleHistory)
+@receiver(post_delete, sender=EmployeeScheduleHistory)
+def invalidate_on_assignment_change(sender, instance, **kwargs):
+    """Un cambio de asignación afecta solo al empleado y a su periodo."""
+    _invalidate_ranges(instance, employee_ids=[instance.employee_id])
+
+
+@receiver(post_save, sender=ScheduleObservation)
+@receiver(post_delete, sender=ScheduleObservation)
+def invalidate_on_holiday_change(sender, instance, **kwargs):
+    """Un feriado afecta a todos los empleados, pero solo en sus fechas."""
+    _invalidate_ranges(instance)
+
+
+@receiver(post_save, sender=Schedule)
+def invalidate_on_schedule_change(sender, instance, created, **kwargs):
+    """
+    Un cambio de horario afecta a los días en que cada empleado lo tenía asignado.
+    Se resuelve con un solo UPDATE sobre el cruce con las asignaciones.
+    """
+    if created:
+        return
+    affected = DailyAttendanceSummary.objects.filter(
+        Q(employee__schedule_history__schedule=instance)
+        & Q(date__gte=F('employee__schedule_history__start_date'))
+        & (Q(employee__schedule_history__end_date__isnull=True)
+           | Q(date__lte=F('employee__schedule_history__end_date')))
+    )
+    DailyAttendanceSummary.objects.filter(pk__in=affected.values('pk'), is_stale=False).update(is_stale=True)
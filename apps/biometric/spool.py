@@ -0,0 +1,130 @@
+import hashlib
+import logging
+from functools import partial
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Min, Q
+
+from .attendance import refresh_for_load
+from .ingest import parse_attlog, save_punches
+from .models import AdmsPushBatch, BiometricDevice, BiometricLoad
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+
+
+class UnknownDeviceError(Exception):
+    """El número de serie del lote no corresponde a un biométrico activo."""
+
+
+def enqueue_push(serial_number, table, raw_body):
+    """
+    Guarda el cuerpo recibido en la cola y retorna de inmediato.
+    El hash del contenido hace que un reenvío del mismo lote no se duplique.
+    """
+    content_hash = hashlib.sha256(raw_body.encode('utf-8')).hexdigest()
+    batch, created = AdmsPushBatch.objects.get_or_create(
+        serial_number=serial_number or '',
+        content_hash=content_hash,
+        defaults={'table': table, 'raw_body': raw_body},
+    )
+    return batch, created
+
+
+def process_batch(batch):
+    """
+    Procesa un lote de la cola hacia BiometricLoad/AttendanceRegistry.
+    Es idempotente: reprocesar un lote no duplica marcaciones. Si el equipo no
+    está registrado o activo lanza UnknownDeviceError y el lote sigue pendiente.
+    """
+    device = BiometricDevice.objects.filter(serial_number=batch.serial_number, is_active=True).first()
+    if not device:
+        raise UnknownDeviceError(f"Número de serie no registrado o inactivo: {batch.serial_number}")
+
+    punches, rejected = parse_attlog(batch.raw_body)
+    load = BiometricLoad.objects.create(
+        biometric=device,
+        load_type="ADMS_PUSH",
+        reason=f"Automatic Push from SN: {batch.serial_number}"
+    )
+    result = save_punches(load, punches)
+    load.num_records = result['inserted']
+    load.save(update_fields=['num_records', 'updated_at'])
+
+    if result['inserted']:
+        transaction.on_commit(partial(refresh_for_load, load), robust=True)
+
+    batch.biometric_load = load
+    batch.error = f"{rejected} líneas con formato inválido." if rejected else None
+    return result['inserted']
+
+
+def _active_serials():
+    return BiometricDevice.objects.filter(is_active=True).values('serial_number')
+
+
+def process_pending(limit=50):
+    """
+    Drena hasta `limit` lotes pendientes, del más antiguo al más reciente.
+
+    Cada lote se bloquea, procesa y confirma en su propia transacción, así un lote
+    lento solo retiene su fila; los bloqueados por otro worker se omiten (SKIP
+    LOCKED). Los lotes de equipos no registrados o inactivos no se toman ni
+    consumen intentos: esperan en la cola hasta que el equipo se registre.
+    Retorna (lotes_procesados, marcaciones_insertadas).
+    """
+    processed = 0
+    inserted = 0
+    pending = AdmsPushBatch.objects.filter(processed_at__isnull=True, attempts__lt=MAX_ATTEMPTS)
+    candidates = list(
+        pending.filter(serial_number__in=_active_serials()).order_by('created_at').values_list('pk', flat=True)[:limit]
+    )
+    for batch_id in candidates:
+        with transaction.atomic():
+            batch = pending.select_for_update(skip_locked=True).filter(pk=batch_id).first()
+            if batch is None:
+                continue  # Lo tomó otro worker o ya se procesó
+            try:
+                with transaction.atomic():
+                    inserted += process_batch(batch)
+                batch.processed_at = datetime.now()
+                processed += 1
+            except UnknownDeviceError as e:
+                # El equipo se desactivó después de elegir el lote: sigue pendiente sin gastar un intento
+                logger.warning(f"[ADMS] Lote {batch.pk}: {e}")
+                batch.error = str(e)
+            except Exception as e:
+                logger.error(f"[ADMS] Error procesando lote {batch.pk}: {e}", exc_info=True)
+                batch.attempts += 1
+                batch.error = str(e)
+            else:
+                batch.attempts += 1
+            batch.save(update_fields=['attempts', 'processed_at', 'error', 'biometric_load', 'updated_at'])
+    return processed, inserted
+
+
+def spool_metrics(window_minutes=10):
+    """
+    Métricas de retraso de la cola: pendientes, lote más antiguo y lotes/minuto.
+    `waiting_device` son los pendientes cuyo equipo no está registrado o activo.
+    """
+    now = datetime.now()
+    data = AdmsPushBatch.objects.aggregate(
+        pending=Count('id', filter=Q(processed_at__isnull=True, attempts__lt=MAX_ATTEMPTS)),
+        failed=Count('id', filter=Q(processed_at__isnull=True, attempts__gte=MAX_ATTEMPTS)),
+        waiting_device=Count('id', filter=Q(processed_at__isnull=True, attempts__lt=MAX_ATTEMPTS)
+                             & ~Q(serial_number__in=_active_serials())),
+        oldest_pending=Min('created_at', filter=Q(processed_at__isnull=True, attempts__lt=MAX_ATTEMPTS)),
+        recent=Count('id', filter=Q(processed_at__gte=now - timedelta(minutes=window_minutes))),
+    )
+    oldest = data['oldest_pending']
+    return {
+        'pending': data['pending'],
+        'failed': data['failed'],
+        'waiting_device': data['waiting_device'],
+        'oldest_pending': oldest.strftime('%Y-%m-%d %H:%M:%S') if oldest else None,
+        'lag_seconds': int((now - oldest).total_seconds()) if oldest else 0,
+        'batches_per_minute': round(data['recent'] / window_minutes, 2),
+    }
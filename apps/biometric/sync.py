@@ -0,0 +1,146 @@
+import logging
+import time
+from functools import partial
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.db import connection as db_connection, transaction
+
+from .attendance import refresh_for_load
+from .ingest import clean_datetime, normalize_pin, resolve_pins, save_punches
+from .models import BiometricDevice, BiometricLoad
+from .utils import BiometricConnection
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 60
+DEFAULT_WORKERS = 8
+# Margen sobre el timeout antes de dejar de esperar un hilo y cada cuánto se revisa
+ABANDON_GRACE = 5
+POLL_INTERVAL = 1
+
+
+def sync_device(device, timeout=DEFAULT_TIMEOUT, zk_class=None, user=None, full=False, load=None):
+    """
+    Descarga las marcaciones de un dispositivo y las guarda por lotes.
+    Siempre registra una BiometricLoad con duración, registros y error (si lo hubo);
+    si se recibe `load` se completa esa en lugar de crear una nueva.
+
+    Las marcaciones con fecha igual o anterior a device.last_punch_synced se
+    descartan antes de cualquier consulta, salvo que se pida una carga completa.
+    """
+    began = time.monotonic()
+    if load is None:
+        load = BiometricLoad.objects.create(biometric=device, load_type="DIRECT_SYNC", created_by=user)
+    options = {'zk_class': zk_class} if zk_class else {}
+    bio = BiometricConnection(device.ip_address, device.port, timeout=timeout, **options)
+    high_water_mark = None if full else device.last_punch_synced
+    try:
+        if not bio.connect():
+            raise ConnectionError(f"Fallo de conexión con {device.ip_address}:{device.port}")
+        raw_records = bio.get_attendance() or []
+        if time.monotonic() - began > timeout:
+            raise TimeoutError(f"La descarga superó el tiempo máximo de {timeout}s")
+
+        punches = []
+        for rec in raw_records:
+            registry_date = clean_datetime(rec.timestamp)
+            if high_water_mark and registry_date <= high_water_mark:
+                continue
+            punches.append((normalize_pin(rec.user_id), registry_date))
+
+        load.records_seen = len(raw_records)
+        load.records_skipped = len(raw_records) - len(punches)
+        pin_map = resolve_pins(pin for pin, _ in punches)
+        newest = _next_high_water_mark(punches, pin_map, high_water_mark)
+        with transaction.atomic():
+            result = save_punches(load, punches, pin_map=pin_map)
+            if newest and newest != device.last_punch_synced:
+                BiometricDevice.objects.filter(pk=device.pk).update(last_punch_synced=newest)
+                device.last_punch_synced = newest
+        load.num_records = result['inserted']
+        if result['inserted']:
+            transaction.on_commit(partial(refresh_for_load, load), robust=True)
+    except Exception as e:
+        logger.error(f"Error sincronizando {device}: {e}")
+        load.error_message = str(e)
+    finally:
+        bio.disconnect()
+
+    load.duration_seconds = round(time.monotonic() - began, 3)
+    load.save(update_fields=['num_records', 'records_seen', 'records_skipped', 'error_message',
+                             'duration_seconds', 'updated_at'])
+    return load
+
+
+def _next_high_water_mark(punches, pin_map, current=None):
+    """
+    Nueva last_punch_synced tras guardar `punches`: la marcación aceptada más reciente,
+    sin pasar la primera cuyo PIN aún no tiene empleado. Esa (y las siguientes) se
+    vuelven a leer en cada sincronización y se guardan cuando el empleado se registre.
+    """
+    first_unresolved = min((registry_date for pin, registry_date in punches if pin not in pin_map), default=None)
+    newest = max(
+        (registry_date for pin, registry_date in punches
+         if pin in pin_map and (first_unresolved is None or registry_date < first_unresolved)),
+        default=None,
+    )
+    return newest or current
+
+
+def _sync_in_thread(device, started, **options):
+    started[options['load'].pk] = time.monotonic()
+    try:
+        return sync_device(device, **options)
+    finally:
+        # Cada hilo abre su propia conexión a la base de datos
+        db_connection.close()
+
+
+def sync_all_devices(devices=None, max_workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT, zk_class=None, user=None,
+                     full=False):
+    """
+    Sincroniza varios dispositivos en paralelo con un pool de hilos acotado.
+    Retorna la lista de BiometricLoad generadas (una por dispositivo).
+
+    El timeout de sync_device solo se comprueba cuando get_attendance() retorna,
+    así que aquí se deja de esperar a los hilos que pasan de timeout + ABANDON_GRACE
+    desde que empezaron: su carga se marca con error y se retorna sin esperarlos.
+    El hilo sigue hasta que el socket falle y completa la carga al terminar.
+    """
+    if devices is None:
+        devices = BiometricDevice.objects.filter(is_active=True)
+    devices = list(devices)
+    if not devices:
+        return []
+
+    # Las cargas se crean aquí para poder reportar los dispositivos abandonados
+    started = {}
+    futures = {}
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(devices)))
+    for device in devices:
+        load = BiometricLoad.objects.create(biometric=device, load_type="DIRECT_SYNC", created_by=user)
+        future = executor.submit(_sync_in_thread, device, started, timeout=timeout, zk_class=zk_class, user=user,
+                                 full=full, load=load)
+        futures[future] = load
+
+    loads = []
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            loads.extend(future.result() for future in done)
+            now = time.monotonic()
+            for future in [f for f in pending if now - started.get(futures[f].pk, now) > timeout + ABANDON_GRACE]:
+                pending.discard(future)
+                loads.append(_abandon(futures[future], timeout, now - started[futures[future].pk]))
+    finally:
+        executor.shutdown(wait=False)
+    return loads
+
+
+def _abandon(load, timeout, elapsed):
+    message = f"El dispositivo no respondió dentro de {timeout}s; la descarga continúa en segundo plano"
+    logger.error(f"Error sincronizando {load.biometric}: {message}")
+    BiometricLoad.objects.filter(pk=load.pk).update(error_message=message,
+                                                   duration_seconds=round(elapsed, 3))
+    return BiometricLoad.objects.select_related('biometric').get(pk=load.pk)
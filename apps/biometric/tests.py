@@ -0,0 +1,187 @@
+from datetime import date, datetime, time
+from unittest import mock
+
+from django.test import TestCase
+
+from employee.models import InstitutionalData
+from person.models import Person
+from schedule.models import EmployeeScheduleHistory, Schedule, ScheduleObservation
+from . import ingest
+from .attendance import (STATUS_ABSENT, STATUS_HOLIDAY, STATUS_INCOMPLETE, STATUS_LATE, STATUS_NO_SCHEDULE,
+                         STATUS_PRESENT, STATUS_REST, compute_attendance, get_summaries, refresh_range)
+from .models import AdmsPushBatch, AttendanceRegistry, BiometricDevice, BiometricLoad, DailyAttendanceSummary
+from .spool import MAX_ATTEMPTS, process_pending
+from .sync import _next_high_water_mark
+
+# Semana de prueba: 2026-03-02 es lunes
+MONDAY = date(2026, 3, 2)
+
+
+def create_employee(pin, document_number, **employee_fields):
+    person = Person.objects.create(first_name='Ana', last_name=f'Empleada {pin}', document_number=document_number)
+    employee = person.employee_profile
+    if employee_fields:
+        for field, value in employee_fields.items():
+            setattr(employee, field, value)
+        employee.save()
+    InstitutionalData.objects.create(employee=employee, biometric_id=pin)
+    return employee
+
+
+def create_device(serial_number='SN1', is_active=True):
+    return BiometricDevice.objects.create(name=f'Reloj {serial_number}', ip_address='10.0.0.1', location='Matriz',
+                                          serial_number=serial_number, is_active=is_active)
+
+
+class SavePunchesTests(TestCase):
+
+    def setUp(self):
+        self.employee = create_employee('12', '1100000001')
+        self.load = BiometricLoad.objects.create(biometric=create_device())
+
+    def test_counts_inserted_duplicates_and_unknown_pins(self):
+        punches = [
+            ('12', datetime(2026, 3, 2, 8, 0)),
+            ('12', datetime(2026, 3, 2, 8, 0)),  # Repetida en el mismo lote
+            ('12', datetime(2026, 3, 2, 17, 0)),
+            ('99', datetime(2026, 3, 2, 8, 1)),  # PIN sin empleado
+        ]
+        result = ingest.save_punches(self.load, punches)
+        self.assertEqual(result, {'seen': 4, 'unknown': 1, 'duplicates': 1, 'inserted': 2})
+        self.assertEqual(AttendanceRegistry.objects.filter(biometric_load=self.load).count(), 2)
+
+        again = ingest.save_punches(self.load, punches)
+        self.assertEqual(again['inserted'], 0)
+        self.assertEqual(again['duplicates'], 3)
+
+    def test_inserted_excludes_rows_dropped_by_conflicts(self):
+        other_load = BiometricLoad.objects.create(biometric=self.load.biometric)
+        ingest.save_punches(other_load, [('12', datetime(2026, 3, 2, 8, 0))])
+
+        # Otra carga guardó la marcación entre la consulta de duplicados y el INSERT
+        with mock.patch.object(ingest, 'existing_punches', return_value=set()):
+            result = ingest.save_punches(self.load, [('12', datetime(2026, 3, 2, 8, 0)),
+                                                     ('12', datetime(2026, 3, 2, 17, 0))])
+        self.assertEqual(result['inserted'], 1)
+        self.assertEqual(result['duplicates'], 1)
+        self.assertEqual(AttendanceRegistry.objects.filter(biometric_load=self.load).count(), 1)
+
+
+class HighWaterMarkTests(TestCase):
+
+    def test_stops_before_first_unresolved_punch(self):
+        punches = [('1', datetime(2026, 3, 2, 8)), ('2', datetime(2026, 3, 2, 9)), ('1', datetime(2026, 3, 2, 10))]
+        self.assertEqual(_next_high_water_mark(punches, {'1': 1}), datetime(2026, 3, 2, 8))
+
+    def test_advances_over_all_accepted_punches(self):
+        punches = [('1', datetime(2026, 3, 2, 8)), ('1', datetime(2026, 3, 2, 10))]
+        self.assertEqual(_next_high_water_mark(punches, {'1': 1}, datetime(2026, 3, 1)), datetime(2026, 3, 2, 10))
+
+    def test_keeps_current_mark_without_accepted_punches(self):
+        current = datetime(2026, 3, 1)
+        self.assertEqual(_next_high_water_mark([('2', datetime(2026, 3, 2, 8))], {'1': 1}, current), current)
+
+
+class ComputeAttendanceTests(TestCase):
+
+    def setUp(self):
+        self.employee = create_employee('12', '1100000001')
+        self.schedule = Schedule.objects.create(name='Ordinario', morning_start=time(8), morning_end=time(13),
+                                                afternoon_start=time(14), afternoon_end=time(17))
+        EmployeeScheduleHistory.objects.create(employee=self.employee, schedule=self.schedule, start_date=MONDAY)
+        self.load = BiometricLoad.objects.create(biometric=create_device())
+
+    def punch(self, day, hour, minute=0):
+        AttendanceRegistry.objects.create(employee=self.employee, biometric_load=self.load, employee_id_bio='12',
+                                          registry_date=datetime.combine(day, time(hour, minute)))
+
+    def rows(self, start_date, end_date):
+        return {row['date']: row for row in compute_attendance(start_date, end_date, [self.employee.pk])}
+
+    def test_day_statuses(self):
+        monday, tuesday, wednesday, thursday = (date(2026, 3, day) for day in (2, 3, 4, 5))
+        for hour, minute in ((8, 5), (13, 0), (14, 0), (17, 0)):
+            self.punch(monday, hour, minute)
+        for hour, minute in ((8, 40), (13, 0), (14, 0), (17, 0)):
+            self.punch(tuesday, hour, minute)
+        self.punch(thursday, 8)
+        self.punch(thursday, 13)
+
+        rows = self.rows(MONDAY, date(2026, 3, 7))
+        self.assertEqual(rows[monday]['status'], STATUS_PRESENT)
+        self.assertEqual(rows[monday]['late_minutes'], 0)  # Dentro de la tolerancia
+        self.assertEqual(rows[monday]['worked_minutes'], 8 * 60 - 5)
+        self.assertEqual(rows[tuesday]['status'], STATUS_LATE)
+        self.assertEqual(rows[tuesday]['late_minutes'], 40)
+        self.assertEqual(rows[wednesday]['status'], STATUS_ABSENT)
+        self.assertTrue(rows[wednesday]['absent'])
+        self.assertEqual(rows[thursday]['status'], STATUS_INCOMPLETE)
+        self.assertEqual(rows[date(2026, 3, 7)]['status'], STATUS_REST)
+
+    def test_holidays_and_days_without_schedule(self):
+        ScheduleObservation.objects.create(name='Feriado', start_date=date(2026, 3, 3), end_date=date(2026, 3, 3))
+        rows = self.rows(date(2026, 3, 1), date(2026, 3, 3))
+        self.assertEqual(rows[date(2026, 3, 1)]['status'], STATUS_NO_SCHEDULE)
+        self.assertEqual(rows[date(2026, 3, 3)]['status'], STATUS_HOLIDAY)
+
+    def test_skips_days_outside_employment(self):
+        self.employee.date_joined = date(2026, 3, 4)
+        self.employee.save()
+        self.assertEqual(sorted(self.rows(MONDAY, date(2026, 3, 5))), [date(2026, 3, 4), date(2026, 3, 5)])
+
+
+class SummaryInvalidationTests(TestCase):
+
+    def setUp(self):
+        self.employee = create_employee('12', '1100000001')
+        self.schedule = Schedule.objects.create(name='Ordinario', morning_start=time(8), morning_end=time(17))
+        EmployeeScheduleHistory.objects.create(employee=self.employee, schedule=self.schedule, start_date=MONDAY)
+        refresh_range(MONDAY, date(2026, 3, 6), [self.employee.pk])
+
+    def stale_days(self):
+        return set(DailyAttendanceSummary.objects.filter(is_stale=True).values_list('date', flat=True))
+
+    def test_holiday_marks_only_its_dates(self):
+        ScheduleObservation.objects.create(name='Feriado', start_date=date(2026, 3, 4), end_date=date(2026, 3, 4))
+        self.assertEqual(self.stale_days(), {date(2026, 3, 4)})
+
+        summary = get_summaries(MONDAY, date(2026, 3, 6), [self.employee.pk]).get(date=date(2026, 3, 4))
+        self.assertEqual(summary.status, STATUS_HOLIDAY)
+        self.assertEqual(self.stale_days(), set())
+
+    def test_schedule_change_marks_assigned_days(self):
+        self.schedule.saturday = True
+        self.schedule.save()
+        self.assertEqual(self.stale_days(), {date(2026, 3, day) for day in range(2, 7)})
+
+    def test_assignment_change_marks_previous_and_new_range(self):
+        assignment = EmployeeScheduleHistory.objects.get(employee=self.employee)
+        DailyAttendanceSummary.objects.update(is_stale=False)
+        assignment.start_date = date(2026, 3, 5)
+        assignment.save()
+        self.assertEqual(self.stale_days(), {date(2026, 3, day) for day in range(2, 7)})
+
+
+class SpoolTests(TestCase):
+
+    def setUp(self):
+        create_employee('12', '1100000001')
+        self.device = create_device('SN1')
+
+    def test_unknown_device_batches_wait_without_attempts(self):
+        self.device.is_active = False
+        self.device.save()
+        batch = AdmsPushBatch.objects.create(serial_number='SN1', content_hash='a',
+                                             raw_body='12\t2026-03-02 08:00:00\t0')
+        for _ in range(MAX_ATTEMPTS + 1):
+            self.assertEqual(process_pending(), (0, 0))
+        batch.refresh_from_db()
+        self.assertEqual(batch.attempts, 0)
+        self.assertIsNone(batch.processed_at)
+
+        self.device.is_active = True
+        self.device.save()
+        self.assertEqual(process_pending(), (1, 1))
+        batch.refresh_from_db()
+        self.assertIsNotNone(batch.processed_at)
+        self.assertEqual(batch.biometric_load.num_records, 1)
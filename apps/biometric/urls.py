@@ -25,5 +25,6 @@ urlpatterns = [
     # Reports
     path('reports/employees/', views.EmployeeReportListView.as_view(), name='employee_report_list'),
     path('reports/monthly-pdf/', views.generate_monthly_report_pdf, name='generate_monthly_pdf'),
+    path('reports/monthly-batch/', views.generate_monthly_batch_pdf, name='generate_monthly_batch'),
     path('reports/specific-pdf/', views.generate_specific_report_pdf, name='generate_specific_pdf'),
 ]
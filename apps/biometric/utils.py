@@ -9,11 +9,12 @@ logger = logging.getLogger(__name__)
 class BiometricConnection:
     """Clase especializada para la comunicación con hardware ZKTeco."""
 
-    def __init__(self, ip_address, port=4370, timeout=5):
+    def __init__(self, ip_address, port=4370, timeout=5, zk_class=ZK):
         self.ip_address = ip_address
         self.port = int(port)
         self.timeout = timeout
-        self.zk = ZK(self.ip_address, port=self.port, timeout=self.timeout)
+        # zk_class permite inyectar un dispositivo simulado (ver fake_zk.FakeZK)
+        self.zk = zk_class(self.ip_address, port=self.port, timeout=self.timeout)
         self.conn = None
 
     def connect(self):
@@ -1,6 +1,8 @@
 import calendar
+import io
 import logging
-from datetime import datetime
+from datetime import date, datetime
+from functools import partial
 
 from django.views.generic import ListView, View
 from django.http import JsonResponse, HttpResponse
@@ -13,7 +15,19 @@ from django.shortcuts import get_object_or_404
 from xhtml2pdf import pisa
 from .models import BiometricDevice, BiometricLoad, AttendanceRegistry
 from .utils import test_connection, BiometricConnection
+from .sync import sync_device
+from .ingest import import_attendance_lines
+from .attendance import refresh_for_load
+from .reports import MONTHLY_TEMPLATE, SPECIFIC_TEMPLATE, monthly_calendar_contexts, monthly_report_fingerprint, \
+    render_pdf, render_monthly_batch, build_zip, specific_report_fingerprint, unit_employee_ids
+from core.documents import cached_document_response
+from core.jobs import enqueue_response
+from core.models import SystemConfiguration
+from core.pagination import KeysetPaginationMixin
+from core.stats import status_stats
 from employee.models import InstitutionalData
+from institution.models import AdministrativeUnit
+from person.search import search_people
 
 logger = logging.getLogger(__name__)
 
@@ -43,16 +57,12 @@ class BiometricListView(ListView):
                 'devices': self.object_list
             }, request=request)
 
-            all_devs = BiometricDevice.objects.all()
+            shown = self.object_list.count()
             return JsonResponse({
                 'html': html,
-                'stats': {
-                    'total': all_devs.count(),
-                    'active': all_devs.filter(is_active=True).count(),
-                    'inactive': all_devs.filter(is_active=False).count()
-                },
+                'stats': status_stats(BiometricDevice.objects.all()),
                 'pagination': {
-                    'label': f"Mostrando 1-{self.object_list.count()} de {self.object_list.count()}" if self.object_list.count() > 0 else "Mostrando 0-0 de 0"
+                    'label': f"Mostrando 1-{shown} de {shown}" if shown > 0 else "Mostrando 0-0 de 0"
                 }
             })
         return super().get(request, *args, **kwargs)
@@ -87,40 +97,16 @@ def save_biometric_ajax(request):
 @csrf_exempt
 def load_attendance_ajax(request, pk):
     device = get_object_or_404(BiometricDevice, pk=pk)
-    connection = BiometricConnection(device.ip_address, device.port)
-    if not connection.connect():
-        return JsonResponse({'status': 'error', 'message': 'Fallo de conexión'}, status=400)
-
-    try:
-        raw_records = connection.get_attendance()
-        saved_count = 0
-        with transaction.atomic():
-            load_entry = BiometricLoad.objects.create(biometric=device, load_type="DIRECT_SYNC")
-            for rec in raw_records:
-                user_id = str(rec.user_id).strip().lstrip('0')
-                inst = InstitutionalData.objects.filter(biometric_id=user_id).first()
-                if inst:
-                    # El dispositivo devuelve hora local naive, usarla directamente sin conversiones
-                    registry_datetime = rec.timestamp
-                    
-                    # Si por alguna razón viene con tzinfo, removerlo para mantener la hora local
-                    if hasattr(registry_datetime, 'tzinfo') and registry_datetime.tzinfo is not None:
-                        registry_datetime = registry_datetime.replace(tzinfo=None)
-
-                    if not AttendanceRegistry.objects.filter(employee=inst.employee, registry_date=registry_datetime).exists():
-                        AttendanceRegistry.objects.create(
-                            employee=inst.employee,
-                            biometric_load=load_entry,
-                            employee_id_bio=user_id,
-                            registry_date=registry_datetime
-                        )
-                        saved_count += 1
-            load_entry.num_records = saved_count
-            load_entry.save()
-        connection.disconnect()
-        return JsonResponse({'status': 'success', 'message': f'Sincronizados {saved_count} registros.'})
-    except Exception as e:
-        return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
+    if request.GET.get('background'):
+        return enqueue_response(request, 'biometric.sync_devices', {'device_ids': [device.pk]})
+    load_entry = sync_device(device, user=request.user if request.user.is_authenticated else None)
+    if load_entry.error_message:
+        return JsonResponse({'status': 'error', 'message': load_entry.error_message}, status=400)
+    return JsonResponse({
+        'status': 'success',
+        'message': f'Sincronizados {load_entry.num_records} registros '
+                   f'({load_entry.records_seen} leídos, {load_entry.records_skipped} ya sincronizados).'
+    })
 
 
 @csrf_exempt
@@ -194,34 +180,36 @@ def upload_biometric_file_ajax(request, pk):
         device = get_object_or_404(BiometricDevice, pk=pk)
         file = request.FILES['file']
         try:
-            content = file.read().decode('utf-8', errors='ignore').strip()
-            lines = content.splitlines()
-            saved_count = 0
-            with transaction.atomic():
-                manual_load = BiometricLoad.objects.create(
-                    biometric=device, load_type="MANUAL_USB",
-                    reason=f"Archivo: {file.name}", created_by=request.user
-                )
-                for line in lines:
-                    parts = line.strip().split('\t')
-                    if len(parts) < 2: continue
-                    user_pin = parts[0].strip().lstrip('0')
-                    try:
-                        naive_date = datetime.strptime(parts[1].strip(), '%Y-%m-%d %H:%M:%S')
-                        reg_date = make_aware(naive_date)
-                        inst_data = InstitutionalData.objects.filter(biometric_id=user_pin).first()
-                        if inst_data and not AttendanceRegistry.objects.filter(employee=inst_data.employee,
-                                                                               registry_date=reg_date).exists():
-                            AttendanceRegistry.objects.create(
-                                employee=inst_data.employee, biometric_load=manual_load,
-                                employee_id_bio=user_pin, registry_date=reg_date
-                            )
-                            saved_count += 1
-                    except:
-                        continue
-                manual_load.num_records = saved_count
-                manual_load.save()
-            return JsonResponse({'status': 'success', 'message': f'Cargados {saved_count} registros.'})
+            manual_load = BiometricLoad.objects.create(
+                biometric=device, load_type="MANUAL_USB",
+                reason=f"Archivo: {file.name}", created_by=request.user
+            )
+
+            def report_progress(lines_read, inserted):
+                # Se guarda el avance para que la carga sea visible mientras se procesa
+                BiometricLoad.objects.filter(pk=manual_load.pk).update(num_records=inserted)
+                logger.info(f"[USB] {file.name}: {lines_read} líneas leídas, {inserted} registros cargados.")
+
+            # El archivo se recorre línea por línea y se confirma por bloques
+            summary = import_attendance_lines(manual_load, file, progress=report_progress)
+
+            rejected = summary['malformed'] + summary['bad_dates'] + summary['unknown_pins']
+            manual_load.num_records = summary['inserted']
+            manual_load.records_seen = summary['lines']
+            manual_load.records_skipped = summary['duplicates'] + rejected
+            manual_load.reason = (
+                f"Archivo: {file.name}. Rechazadas: {summary['bad_dates']} fechas inválidas, "
+                f"{summary['unknown_pins']} PIN desconocidos, {summary['malformed']} líneas mal formadas."
+            )
+            manual_load.save(update_fields=['num_records', 'records_seen', 'records_skipped', 'reason',
+                                            'updated_at'])
+            if summary['inserted']:
+                transaction.on_commit(partial(refresh_for_load, manual_load), robust=True)
+            return JsonResponse({
+                'status': 'success',
+                'message': f'Cargados {summary["inserted"]} registros.',
+                'summary': summary,
+            })
         except Exception as e:
             return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
     return JsonResponse({'status': 'error', 'message': 'Archivo requerido.'}, status=400)
@@ -231,39 +219,42 @@ def generate_monthly_report_pdf(request):
     emp_id = request.GET.get('emp_id')
     month = int(request.GET.get('month', 1))
     year = int(request.GET.get('year', 2026))
-    inst_data = get_object_or_404(InstitutionalData, employee_id=emp_id)
-
-    # Query de marcaciones (Naive)
-    punches = AttendanceRegistry.objects.filter(
-        employee_id=emp_id, registry_date__year=year, registry_date__month=month
-    ).order_by('registry_date')
-
-    punches_map = {}
-    for p in punches:
-        day = p.registry_date.day
-        if day not in punches_map: punches_map[day] = []
-        punches_map[day].append({
-            'time': p.registry_date.strftime('%H:%M'),
-            'device': p.biometric_load.biometric.name[:10]
+    inst_data = get_object_or_404(InstitutionalData.objects.select_related('employee__person'), employee_id=emp_id)
+    employee_id = inst_data.employee_id
+
+    def render(issued_at=None):
+        context = monthly_calendar_contexts([employee_id], year, month)[employee_id]
+        if issued_at:
+            context['today'] = issued_at
+        return render_pdf(MONTHLY_TEMPLATE, context)
+
+    # Solo un mes cerrado es inmutable: el mes en curso se genera siempre
+    if date(year, month, calendar.monthrange(year, month)[1]) >= date.today():
+        return HttpResponse(render(), content_type='application/pdf')
+
+    # El documento en caché lleva como fecha de emisión su Last-Modified, no la hora de cada descarga
+    fingerprint, last_modified = monthly_report_fingerprint(employee_id, year, month)
+    filename = f"Asistencia_{year}_{month:02d}_{inst_data.employee.person.document_number}.pdf"
+    return cached_document_response(request, fingerprint, partial(render, last_modified), filename, last_modified)
+
+
+def generate_monthly_batch_pdf(request):
+    """Calendarios mensuales de todos los empleados de una unidad, empaquetados en un ZIP."""
+    unit = get_object_or_404(AdministrativeUnit, pk=request.GET.get('unit_id'))
+    month = int(request.GET.get('month', 1))
+    year = int(request.GET.get('year', 2026))
+    include_descendants = request.GET.get('descendants') in ('1', 'true')
+    if request.GET.get('background'):
+        return enqueue_response(request, 'biometric.monthly_batch', {
+            'unit_id': unit.pk, 'year': year, 'month': month, 'descendants': include_descendants,
         })
 
-    weeks = calendar.Calendar(firstweekday=0).monthdayscalendar(year, month)
-    calendar_data = []
-    for week in weeks:
-        week_list = []
-        for day in week:
-            week_list.append({'day': day if day != 0 else '', 'punches': punches_map.get(day, [])})
-        calendar_data.append(week_list)
-
-    months_es = ["", "ENERO", "FEBRERO", "MARZO", "ABRIL", "MAYO", "JUNIO", "JULIO", "AGOSTO", "SEPTIEMBRE", "OCTUBRE",
-                 "NOVIEMBRE", "DICIEMBRE"]
-    template = get_template('biometric/reports/pdf_attendance_calendar.html')
-    html = template.render({
-        'emp': inst_data.employee, 'month_name': months_es[month], 'year': year,
-        'calendar': calendar_data, 'today': datetime.now()  # Naive
-    })
-    response = HttpResponse(content_type='application/pdf')
-    pisa.CreatePDF(html, dest=response)
+    files = render_monthly_batch(unit_employee_ids(unit, include_descendants), year, month)
+    if not files:
+        return HttpResponse("La unidad no tiene empleados con ID biométrico.", status=404)
+
+    response = HttpResponse(build_zip(files), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="Asistencia_{unit.pk}_{year}_{month:02d}.zip"'
     return response
 
 
@@ -279,7 +270,7 @@ class ADMSReceiverView(View):
         return adms_receive_attendance(request)
 
 
-class EmployeeReportListView(ListView):
+class EmployeeReportListView(KeysetPaginationMixin, ListView):
     model = InstitutionalData
     template_name = 'biometric/employee_report_list.html'
     context_object_name = 'employees'
@@ -291,22 +282,22 @@ class EmployeeReportListView(ListView):
             biometric_id__isnull=False
         ).exclude(biometric_id='')
 
-        q = self.request.GET.get('q')
-        if q:
-            qs = qs.filter(
-                models.Q(employee__person__first_name__icontains=q) |
-                models.Q(employee__person__last_name__icontains=q) |
-                models.Q(employee__person__document_number__icontains=q)
-            )
-        return qs
+        qs = qs.order_by('employee__person__last_name')
+        return search_people(qs, self.request.GET.get('q'), person_path='employee__person')
 
     def get(self, request, *args, **kwargs):
         if request.headers.get('x-requested-with') == 'XMLHttpRequest':
             self.object_list = self.get_queryset()
-            html = render_to_string('biometric/partials/partial_report_employee_table.html', {
-                'employees': self.object_list
-            }, request=request)
-            return JsonResponse({'html': html})
+            context = self.get_context_data()
+            page_obj = context['page_obj']
+            html = render_to_string('biometric/partials/partial_report_employee_table.html', context, request=request)
+            return JsonResponse({
+                'html': html,
+                'has_next': page_obj.has_next(),
+                'has_previous': page_obj.has_previous(),
+                'next_cursor': getattr(page_obj, 'next_cursor', None),
+                'previous_cursor': getattr(page_obj, 'previous_cursor', None),
+            })
         return super().get(request, *args, **kwargs)
 
 
@@ -324,27 +315,36 @@ def generate_specific_report_pdf(request):
     end_date = datetime.strptime(end_str, '%Y-%m-%d').date()
 
     institutional_info = get_object_or_404(InstitutionalData, employee_id=employee_id)
-
-    # Obtener marcaciones en el rango (usando __date para comparar solo la parte de fecha)
-    punches = AttendanceRegistry.objects.filter(
-        employee_id=employee_id,
-        registry_date__date__range=[start_date, end_date]
-    ).select_related('biometric_load__biometric').order_by('registry_date')
-
-    template = get_template('biometric/reports/pdf_attendance_specific.html')
-    html_content = template.render({
-        'emp': institutional_info.employee,
-        'start_date': start_date,
-        'end_date': end_date,
-        'punches': punches,
-        'today': datetime.now(),
-    })
-
-    response = HttpResponse(content_type='application/pdf')
+    employee_id = institutional_info.employee_id
     filename = f"Reporte_Especifico_{institutional_info.employee.person.document_number}_{start_str}_al_{end_str}.pdf"
-    response['Content-Disposition'] = f'inline; filename="{filename}"'
 
-    pisa_status = pisa.CreatePDF(html_content, dest=response)
-    if pisa_status.err:
+    def render(issued_at=None):
+        # Obtener marcaciones en el rango [inicio, fin + 1 día) para aprovechar el índice
+        punches = AttendanceRegistry.objects.between(start_date, end_date).filter(
+            employee_id=employee_id
+        ).select_related('biometric_load__biometric').order_by('registry_date')
+
+        html_content = get_template(SPECIFIC_TEMPLATE).render({
+            'emp': institutional_info.employee,
+            'start_date': start_date,
+            'end_date': end_date,
+            'punches': punches,
+            'today': issued_at or datetime.now(),
+            'institution': SystemConfiguration.get_current(),
+        })
+        buffer = io.BytesIO()
+        if pisa.CreatePDF(html_content, dest=buffer).err:
+            raise RuntimeError('Error al generar PDF')
+        return buffer.getvalue()
+
+    try:
+        # Un rango ya transcurrido no cambia salvo que cambien sus marcaciones
+        if end_date < date.today():
+            fingerprint, last_modified = specific_report_fingerprint(employee_id, start_date, end_date)
+            return cached_document_response(request, fingerprint, partial(render, last_modified), filename,
+                                            last_modified)
+        response = HttpResponse(render(), content_type='application/pdf')
+    except RuntimeError:
         return HttpResponse('Error al generar PDF', status=500)
-    return response
\ No newline at end of file
+    response['Content-Disposition'] = f'inline; filename="{filename}"'
+    return response
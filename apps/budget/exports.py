@@ -0,0 +1,57 @@
+"""
+Reporte Excel del consolidado del distributivo (budget.rollup) sobre core.exports.
+"""
+from openpyxl.styles import Alignment, Font, NamedStyle
+from openpyxl.utils import get_column_letter
+
+from core.exports import DEFAULT_STYLES, HEADER_FILL, THIN_BORDER, XlsxStreamWriter
+from .rollup import STATUS_CODES
+
+ROLLUP_WIDTHS = [14, 22, 50, 10, 10] + [10] * len(STATUS_CODES) + [16, 16, 14]
+LEVEL_LABELS = {'program': 'PROGRAMA', 'subprogram': 'SUBPROGRAMA', 'project': 'PROYECTO', 'activity': 'ACTIVIDAD'}
+MONEY_FORMAT = '#,##0.00'
+RIGHT = Alignment(horizontal='right', vertical='center')
+
+# Montos con separador de miles; 'money_total' con el fondo de 'subheader' para programas y total
+MONEY_STYLES = (
+    NamedStyle(name='money', font=Font(name='Arial', size=9), alignment=RIGHT, border=THIN_BORDER,
+               number_format=MONEY_FORMAT),
+    NamedStyle(name='money_total', font=Font(name='Arial', size=9, bold=True), alignment=RIGHT,
+               border=THIN_BORDER, fill=HEADER_FILL, number_format=MONEY_FORMAT),
+)
+ROLLUP_STYLES = (*DEFAULT_STYLES, *MONEY_STYLES)
+
+
+def rollup_rows(tree):
+    """Filas del reporte recorriendo el árbol de rollup_tree() en preorden; cada programa en negrita."""
+    def walk(nodes):
+        for node in nodes:
+            yield node['level'], [
+                LEVEL_LABELS[node['level']], node['code'], node['name'], node['lines'], node['headcount'],
+                *(node[code.lower()] for code in STATUS_CODES),
+                node['total_rmu'], node['occupied_rmu'], node['avg_rmu'],
+            ]
+            yield from walk(node.get('children', ()))
+    yield from walk(tree['children'])
+
+
+def write_rollup_report(tree, title='CONSOLIDADO DEL DISTRIBUTIVO POR ESTRUCTURA PROGRAMÁTICA'):
+    columns = len(ROLLUP_WIDTHS)
+    writer = XlsxStreamWriter("Consolidado", styles=ROLLUP_STYLES, widths=ROLLUP_WIDTHS)
+    writer.append([title] + [None] * (columns - 1), 'title')
+    writer.merge(f'A1:{get_column_letter(columns)}1')
+    writer.append(["NIVEL", "CÓDIGO", "DENOMINACIÓN", "PARTIDAS", "OCUPANTES",
+                   *STATUS_CODES, "RMU TOTAL", "RMU OCUPADAS", "RMU PROMEDIO"], 'header')
+
+    counts = ['cell'] * (2 + len(STATUS_CODES))
+    detail_styles = ['cell', 'cell_left', 'cell_left', *counts, 'money', 'money', 'money']
+    program_styles = ['subheader'] * (3 + len(counts)) + ['money_total'] * 3
+    for level, values in rollup_rows(tree):
+        writer.append(values, program_styles if level == 'program' else detail_styles)
+
+    totals = tree['totals']
+    writer.append(["TOTAL", None, None, totals['lines'], totals['headcount'],
+                   *(totals[code.lower()] for code in STATUS_CODES),
+                   totals['total_rmu'], totals['occupied_rmu'], totals['avg_rmu']],
+                  ['subheader'] * (3 + len(counts)) + ['money_total'] * 3)
+    return writer
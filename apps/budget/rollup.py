@@ -0,0 +1,155 @@
+"""
+Consolidado del distributivo por estructura programática.
+
+Programa -> Subprograma -> Proyecto -> Actividad con, en cada nivel, número de
+partidas, ocupantes, partidas por estado y remuneraciones (total, de las
+ocupadas y promedio). En PostgreSQL todos los niveles salen de una sola consulta
+con GROUP BY ROLLUP; GROUPING() indica a qué nivel pertenece cada fila. En otros
+motores se agrupa por actividad con el ORM (también una consulta) y los niveles
+superiores se suman en Python.
+
+budget_rollup() retorna las filas planas (orden jerárquico, el total al final) y
+rollup_tree() las anida para la interfaz.
+"""
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import Count, Q, Sum
+
+from core.models import CatalogItem
+from .models import Activity, BudgetLine, Program, Project, Subprogram
+
+LEVELS = ('program', 'subprogram', 'project', 'activity')
+# Estados del catálogo BUDGET_STATUS con columna propia (los de las tarjetas del listado)
+STATUS_CODES = ('LIBRE', 'OCUPADA', 'CONCURSO', 'LITIGIO', 'INACTIVA')
+VACANT_CODE = 'LIBRE'
+METRICS = ('lines', 'headcount', *(code.lower() for code in STATUS_CODES), 'total_rmu', 'occupied_rmu')
+
+# GROUPING(programa, subprograma, proyecto, actividad): bit en 1 = nivel agregado
+_LEVEL_BY_MASK = {0b0000: 'activity', 0b0001: 'project', 0b0011: 'subprogram', 0b0111: 'program',
+                  0b1111: 'total'}
+_CENT = Decimal('0.01')
+
+
+def _rollup_sql(program_id=None):
+    tables = {
+        'budget_line': BudgetLine._meta.db_table, 'activity': Activity._meta.db_table,
+        'project': Project._meta.db_table, 'subprogram': Subprogram._meta.db_table,
+        'program': Program._meta.db_table, 'status_item': CatalogItem._meta.db_table,
+    }
+    columns = ', '.join(f'{alias}.id, {alias}.code, {alias}.name' for alias in LEVELS)
+    groups = ', '.join(f'({alias}.id, {alias}.code, {alias}.name)' for alias in LEVELS)
+    status_counts = ', '.join('COUNT(*) FILTER (WHERE status_item.code = %s)' for _ in STATUS_CODES)
+    sql = f"""
+        SELECT GROUPING(program.id, subprogram.id, project.id, activity.id), {columns},
+               COUNT(*), COUNT(budget_line.current_employee_id), {status_counts},
+               SUM(budget_line.remuneration),
+               SUM(budget_line.remuneration) FILTER (WHERE budget_line.current_employee_id IS NOT NULL)
+        FROM {tables['budget_line']} budget_line
+        JOIN {tables['activity']} activity ON activity.id = budget_line.activity_id
+        JOIN {tables['project']} project ON project.id = activity.project_id
+        JOIN {tables['subprogram']} subprogram ON subprogram.id = project.subprogram_id
+        JOIN {tables['program']} program ON program.id = subprogram.program_id
+        JOIN {tables['status_item']} status_item ON status_item.id = budget_line.status_item_id
+        {'WHERE program.id = %s' if program_id else ''}
+        GROUP BY ROLLUP ({groups})
+        ORDER BY program.code NULLS LAST, subprogram.code NULLS FIRST, project.code NULLS FIRST,
+                 activity.code NULLS FIRST
+    """
+    params = [*STATUS_CODES, *([program_id] if program_id else [])]
+    return sql, params
+
+
+def _postgres_rows(program_id=None):
+    sql, params = _rollup_sql(program_id)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        for record in cursor.fetchall():
+            row = {'level': _LEVEL_BY_MASK[record[0]]}
+            for index, level in enumerate(LEVELS):
+                row[level] = record[1 + index * 3:4 + index * 3] if record[1 + index * 3] is not None else None
+            row.update(zip(METRICS, record[1 + len(LEVELS) * 3:]))
+            yield row
+
+
+def _orm_rows(program_id=None):
+    """Agrupa por actividad en una consulta y acumula los niveles superiores en Python."""
+    paths = {
+        'program': 'activity__project__subprogram__program',
+        'subprogram': 'activity__project__subprogram',
+        'project': 'activity__project',
+        'activity': 'activity',
+    }
+    fields = [f'{paths[level]}__{attr}' for level in LEVELS for attr in ('id', 'code', 'name')]
+    queryset = BudgetLine.objects.all()
+    if program_id:
+        queryset = queryset.filter(activity__project__subprogram__program_id=program_id)
+    grouped = queryset.order_by().values_list(*fields).annotate(
+        lines=Count('pk'),
+        headcount=Count('current_employee'),
+        **{code.lower(): Count('pk', filter=Q(status_item__code=code)) for code in STATUS_CODES},
+        total_rmu=Sum('remuneration'),
+        occupied_rmu=Sum('remuneration', filter=Q(current_employee__isnull=False)),
+    )
+
+    nodes = {}
+    for record in grouped:
+        keys = [tuple(record[index * 3:index * 3 + 3]) for index in range(len(LEVELS))]
+        metrics = dict(zip(METRICS, record[len(LEVELS) * 3:]))
+        for depth in range(len(LEVELS) + 1):
+            path = tuple(keys[:depth])
+            node = nodes.get(path)
+            if node is None:
+                node = nodes[path] = {
+                    'level': LEVELS[depth - 1] if depth else 'total',
+                    **{level: keys[index] if index < depth else None for index, level in enumerate(LEVELS)},
+                    **{metric: None for metric in METRICS},
+                }
+            for metric, value in metrics.items():
+                if value is not None:
+                    node[metric] = value if node[metric] is None else node[metric] + value
+
+    # Mismo orden que el ROLLUP: por código en cada nivel, el total al final
+    def sort_key(item):
+        path, _ = item
+        return (not path, [key[1] for key in path])
+    return [node for _, node in sorted(nodes.items(), key=sort_key)]
+
+
+def budget_rollup(program_id=None):
+    """Filas del consolidado de todos los niveles (opcionalmente de un solo programa)."""
+    rows = _postgres_rows(program_id) if connection.vendor == 'postgresql' else _orm_rows(program_id)
+    result = []
+    for row in rows:
+        for metric in METRICS:
+            if row[metric] is None:
+                row[metric] = Decimal('0.00') if metric.endswith('_rmu') else 0
+        row['vacancies'] = row[VACANT_CODE.lower()]
+        row['avg_rmu'] = (row['total_rmu'] / row['lines']).quantize(_CENT) if row['lines'] else Decimal('0.00')
+        result.append(row)
+    return result
+
+
+def rollup_tree(rows):
+    """Anida las filas de budget_rollup(): {'totals': {...}, 'children': [programas con sus hijos]}."""
+    root = {'children': []}
+    parents = {}
+    for row in rows:
+        metrics = {key: value for key, value in row.items() if key not in LEVELS and key != 'level'}
+        if row['level'] == 'total':
+            root['totals'] = metrics
+            continue
+        depth = LEVELS.index(row['level'])
+        node_id, code, name = row[row['level']]
+        node = {
+            'id': node_id, 'level': row['level'], 'name': name,
+            'code': '.'.join(row[level][1] for level in LEVELS[:depth + 1]),
+            **metrics,
+        }
+        if depth < len(LEVELS) - 1:
+            node['children'] = []
+        parent = parents.get(tuple(row[level][0] for level in LEVELS[:depth])) if depth else root
+        parent['children'].append(node)
+        parents[tuple(row[level][0] for level in LEVELS[:depth + 1])] = node
+    root.setdefault('totals', {metric: 0 for metric in (*METRICS, 'vacancies', 'avg_rmu')})
+    return root
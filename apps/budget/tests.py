@@ -1,3 +1,90 @@
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.db import connection
 from django.test import TestCase
 
-# Create your tests here.
+from core.models import Catalog, CatalogItem
+from person.models import Person
+from .models import Activity, BudgetLine, Program, Project, Subprogram
+from .rollup import METRICS, _orm_rows, _postgres_rows, budget_rollup, rollup_tree
+
+
+class BudgetRollupTests(TestCase):
+    """
+    P1 > S1 > 001 > (001: ocupada 1000 + libre 800, 002: concurso 900)
+    P2 > S1 > 001 > 001: litigio 700
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        catalog = Catalog.objects.create(name='Estados de partida', code='BUDGET_STATUS')
+        status = {code: CatalogItem.objects.create(catalog=catalog, name=code.title(), code=code)
+                  for code in ('LIBRE', 'OCUPADA', 'CONCURSO', 'LITIGIO', 'INACTIVA')}
+        cls.first, cls.second = (Program.objects.create(code=code, name=f'Programa {code}') for code in ('P1', 'P2'))
+        activities = []
+        for program in (cls.first, cls.second):
+            subprogram = Subprogram.objects.create(program=program, code='S1', name='Subprograma')
+            project = Project.objects.create(subprogram=subprogram, code='001', name='Proyecto')
+            activities += [Activity.objects.create(project=project, code=code, name=f'Actividad {code}')
+                           for code in ('001', '002')]
+        employee = Person.objects.create(first_name='Ana', last_name='Ocupante', document_number='1100000001')
+        lines = [
+            (activities[0], 'OCUPADA', '1000.00', employee.employee_profile),
+            (activities[0], 'LIBRE', '800.00', None),
+            (activities[1], 'CONCURSO', '900.00', None),
+            (activities[2], 'LITIGIO', '700.00', None),
+        ]
+        for index, (activity, code, remuneration, occupant) in enumerate(lines):
+            BudgetLine.objects.create(activity=activity, code='510105', number_individual=str(index + 1),
+                                      remuneration=Decimal(remuneration), status_item=status[code],
+                                      current_employee=occupant)
+
+    def test_orm_rows_levels_and_order(self):
+        rows = _orm_rows()
+        self.assertEqual([row['level'] for row in rows], [
+            'program', 'subprogram', 'project', 'activity', 'activity',
+            'program', 'subprogram', 'project', 'activity',
+            'total',
+        ])
+        first_activity = rows[3]
+        self.assertEqual(first_activity['activity'][1:], ('001', 'Actividad 001'))
+        self.assertEqual((first_activity['lines'], first_activity['headcount'], first_activity['ocupada'],
+                          first_activity['libre'], first_activity['total_rmu'], first_activity['occupied_rmu']),
+                         (2, 1, 1, 1, Decimal('1800.00'), Decimal('1000.00')))
+        # Actividades sin partidas no aparecen
+        self.assertEqual(sum(1 for row in rows if row['level'] == 'activity'), 3)
+
+    def test_totals_and_derived_metrics(self):
+        rows = budget_rollup()
+        total = rows[-1]
+        self.assertEqual(total['level'], 'total')
+        self.assertEqual((total['lines'], total['headcount'], total['vacancies'], total['litigio'], total['inactiva']),
+                         (4, 1, 1, 1, 0))
+        self.assertEqual(total['total_rmu'], Decimal('3400.00'))
+        self.assertEqual(total['avg_rmu'], Decimal('850.00'))
+        # Sin ocupantes la suma es NULL y se normaliza a cero
+        second_program = next(row for row in rows if row['level'] == 'program' and row['program'][1] == 'P2')
+        self.assertEqual(second_program['occupied_rmu'], Decimal('0.00'))
+
+    def test_filter_by_program(self):
+        rows = budget_rollup(program_id=self.second.pk)
+        self.assertEqual({row['program'][1] for row in rows if row['program']}, {'P2'})
+        self.assertEqual(rows[-1]['total_rmu'], Decimal('700.00'))
+
+    def test_tree(self):
+        tree = rollup_tree(budget_rollup())
+        self.assertEqual([program['code'] for program in tree['children']], ['P1', 'P2'])
+        activities = tree['children'][0]['children'][0]['children'][0]['children']
+        self.assertEqual([activity['code'] for activity in activities], ['P1.S1.001.001', 'P1.S1.001.002'])
+        self.assertNotIn('children', activities[0])
+        self.assertEqual(tree['totals']['lines'], 4)
+        self.assertEqual(rollup_tree([])['totals']['lines'], 0)
+
+    @skipUnless(connection.vendor == 'postgresql', 'GROUP BY ROLLUP requiere PostgreSQL')
+    def test_rollup_sql_matches_orm(self):
+        def normalized(rows):
+            return [(row['level'], *(row[level] and tuple(row[level]) for level in ('program', 'subprogram',
+                                                                                    'project', 'activity')),
+                     *(row[metric] or 0 for metric in METRICS)) for row in rows]
+        self.assertEqual(normalized(_postgres_rows()), normalized(_orm_rows()))
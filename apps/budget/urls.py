@@ -8,6 +8,11 @@ urlpatterns = [
     path('create/', views.BudgetCreateView.as_view(), name='budget_create'),
     path('update/<int:pk>/', views.BudgetUpdateView.as_view(), name='budget_update'),
 
+    # Consolidado por estructura programática
+    path('rollup/', views.BudgetRollupView.as_view(), name='budget_rollup'),
+    path('api/rollup/', views.BudgetRollupJsonView.as_view(), name='api_rollup'),
+    path('rollup/excel/', views.BudgetRollupExcelView.as_view(), name='budget_rollup_excel'),
+
     # API para cascada
     path('api/hierarchy/', views.HierarchyOptionsJsonView.as_view(), name='api_hierarchy'),
     # --- Estructura ---
@@ -6,10 +6,17 @@ from django.views.generic import ListView, CreateView, UpdateView, View, DetailV
 from django.http import JsonResponse
 from django.db.models import Q
 from datetime import date
+from core.catalogs import get_catalog_item
 from core.models import CatalogItem
+from core.exports import ExportMixin, xlsx_response
+from core.pagination import KeysetPaginationMixin
+from core.stats import count_stats, status_stats
 from employee.models import Employee
+from person.search import people_q
 from .models import BudgetLine, Program, Subprogram, Project, Activity, BudgetModificationHistory, \
     BudgetAssignmentHistory
+from .exports import write_rollup_report
+from .rollup import budget_rollup, rollup_tree
 from .forms import BudgetLineForm, ProgramForm, ActivityForm, SubprogramForm, ProjectForm, block_parent_field, \
     AssignIndividualNumberForm, BudgetChangeStatusForm
 from django.utils import timezone
@@ -46,26 +53,43 @@ class HierarchyOptionsJsonView(LoginRequiredMixin, View):
         return JsonResponse({'results': results})
 
 
-# --- 2. ESTADÍSTICAS (Python Calculation) ---
+# --- 2. ESTADÍSTICAS (una sola consulta, ver core.stats) ---
+BUDGET_STATUS_BUCKETS = {
+    'total': None,
+    'libre': Q(status_item__code='LIBRE'),
+    'ocupada': Q(status_item__code='OCUPADA'),
+    'concurso': Q(status_item__code='CONCURSO'),
+    'litigio': Q(status_item__code='LITIGIO'),
+    'inactiva': Q(status_item__code='INACTIVA'),
+}
+
+
 def get_budget_stats():
-    qs = BudgetLine.objects.all()
-    return {
-        'total': qs.count(),
-        'libre': qs.filter(status_item__code='LIBRE').count(),
-        'ocupada': qs.filter(status_item__code='OCUPADA').count(),
-        'concurso': qs.filter(status_item__code='CONCURSO').count(),
-        'litigio': qs.filter(status_item__code='LITIGIO').count(),
-        'inactiva': qs.filter(status_item__code='INACTIVA').count(),
-    }
+    return count_stats(BudgetLine.objects.all(), BUDGET_STATUS_BUCKETS, cache_key='status',
+                       depends_on=(CatalogItem,))
 
 
 # --- 3. LISTADO ---
-class BudgetListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+class BudgetListView(LoginRequiredMixin, PermissionRequiredMixin, ExportMixin, KeysetPaginationMixin, ListView):
     model = BudgetLine
     template_name = 'budget/budget_list.html'
     context_object_name = 'lines'
     paginate_by = 15
     permission_required = 'budget.view_budgetline'
+    export_filename = 'Partidas_Presupuestarias'
+    export_columns = (
+        ('number_individual', 'Partida Individual'),
+        ('code', 'Código Partida'),
+        ('activity__project__subprogram__program__name', 'Programa'),
+        ('activity__name', 'Actividad'),
+        ('position_item__name', 'Denominación'),
+        ('regime_item__name', 'Régimen'),
+        ('remuneration', 'RMU'),
+        ('status_item__name', 'Estado'),
+        ('current_employee__person__document_number', 'Cédula Ocupante'),
+        ('current_employee__person__last_name', 'Apellidos Ocupante'),
+        ('current_employee__person__first_name', 'Nombres Ocupante'),
+    )
 
     def get_queryset(self):
         qs = BudgetLine.objects.select_related(
@@ -82,8 +106,7 @@ class BudgetListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
                 Q(number_individual__icontains=q) |
                 Q(code__icontains=q) |
                 Q(position_item__name__icontains=q) |
-                Q(current_employee__person__first_name__icontains=q) |
-                Q(current_employee__person__last_name__icontains=q)
+                people_q(q, person_path='current_employee__person')
             )
 
         if status and status != 'all':
@@ -105,6 +128,35 @@ class BudgetListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
         return super().get(request, *args, **kwargs)
 
 
+# --- CONSOLIDADO POR ESTRUCTURA PROGRAMÁTICA (ver budget.rollup) ---
+def get_rollup_tree(request):
+    """Árbol del consolidado, opcionalmente limitado al programa de ?program=."""
+    program_id = request.GET.get('program')
+    return rollup_tree(budget_rollup(int(program_id) if program_id and program_id.isdigit() else None))
+
+
+class BudgetRollupView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    permission_required = 'budget.view_budgetline'
+
+    def get(self, request):
+        return render(request, 'budget/budget_rollup.html', {'programs': Program.objects.filter(is_active=True)})
+
+
+class BudgetRollupJsonView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    permission_required = 'budget.view_budgetline'
+
+    def get(self, request):
+        return JsonResponse(get_rollup_tree(request))
+
+
+class BudgetRollupExcelView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    permission_required = 'budget.view_budgetline'
+
+    def get(self, request):
+        filename = f"Consolidado_Distributivo_{timezone.now().strftime('%Y%m%d_%H%M')}.xlsx"
+        return xlsx_response(write_rollup_report(get_rollup_tree(request)), filename)
+
+
 # --- 4. CREAR ---
 class BudgetCreateView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
     model = BudgetLine
@@ -117,7 +169,7 @@ class BudgetCreateView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
         if form.is_valid():
             obj = form.save(commit=False)
             try:
-                status_libre = CatalogItem.objects.get(code='LIBRE', catalog__code='BUDGET_STATUS')
+                status_libre = get_catalog_item('BUDGET_STATUS', 'LIBRE')
                 obj.status_item = status_libre
             except CatalogItem.DoesNotExist:
                 return JsonResponse({
@@ -202,13 +254,11 @@ class ProgramListView(StructureBaseListView):
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        qs = Program.objects.all()
         ctx.update({
             'model_type': 'program', 'level_title': 'Programas', 'level_title_singular': 'Programa',
             'level_desc': 'Gestión de Programas',
             'nav_url_name': 'budget:subprogram_list',  # El siguiente nivel
-            'total': qs.count(), 'active': qs.filter(is_active=True).count(),
-            'inactive': qs.filter(is_active=False).count()
+            **status_stats(Program.objects.all())
         })
         return ctx
 
@@ -224,12 +274,10 @@ class SubprogramListView(StructureBaseListView):
         ctx = super().get_context_data(**kwargs)
         # IMPORTANTE: Asegúrate que el ID en la URL existe en la DB
         parent = get_object_or_404(Program, id=self.kwargs['program_id'])
-        qs = Subprogram.objects.filter(program=parent)
         ctx.update({
             'parent': parent, 'model_type': 'subprogram', 'level_title': 'Subprogramas',
             'nav_url_name': 'budget:project_list', 'level_title_singular': 'Subprograma',
-            'total': qs.count(), 'active': qs.filter(is_active=True).count(),
-            'inactive': qs.filter(is_active=False).count()
+            **status_stats(Subprogram.objects.filter(program=parent), cache_key=f'program:{parent.pk}')
         })
         return ctx
 
@@ -244,12 +292,10 @@ class ProjectListView(StructureBaseListView):
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
         parent = get_object_or_404(Subprogram, id=self.kwargs['subprogram_id'])
-        qs = Project.objects.filter(subprogram=parent)
         ctx.update({
             'parent': parent, 'model_type': 'project', 'level_title': 'Proyectos',
             'nav_url_name': 'budget:activity_list', 'level_title_singular': 'Proyecto',
-            'total': qs.count(), 'active': qs.filter(is_active=True).count(),
-            'inactive': qs.filter(is_active=False).count()
+            **status_stats(Project.objects.filter(subprogram=parent), cache_key=f'subprogram:{parent.pk}')
         })
         return ctx
 
@@ -264,12 +310,10 @@ class ActivityListView(StructureBaseListView):
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
         parent = get_object_or_404(Project, id=self.kwargs['project_id'])
-        qs = Activity.objects.filter(project=parent)
         ctx.update({
             'parent': parent, 'model_type': 'activity', 'level_title': 'Actividades',
             'nav_url_name': None, 'level_title_singular': 'Actividad',
-            'total': qs.count(), 'active': qs.filter(is_active=True).count(),
-            'inactive': qs.filter(is_active=False).count()
+            **status_stats(Activity.objects.filter(project=parent), cache_key=f'project:{parent.pk}')
         })
         return ctx
 
@@ -437,7 +481,7 @@ class BudgetAssignEmployeeView(LoginRequiredMixin, View):
         try:
             with transaction.atomic():
                 emp = Employee.objects.get(pk=employee_id)
-                status_occupied = CatalogItem.objects.get(code='OCUPADA', catalog__code='BUDGET_STATUS')
+                status_occupied = get_catalog_item('BUDGET_STATUS', 'OCUPADA')
 
                 # --- LIMPIEZA DE HISTORIAL "ZOMBIE" ---
                 # Cerramos cualquier historial previo de este empleado que haya quedado como is_current
@@ -494,7 +538,7 @@ class BudgetReleaseView(LoginRequiredMixin, View):
                     history.save()
 
                 # 2. Resetear la Partida
-                status_libre = CatalogItem.objects.get(code='LIBRE', catalog__code='BUDGET_STATUS')
+                status_libre = get_catalog_item('BUDGET_STATUS', 'LIBRE')
                 line.current_employee = None
                 line.status_item = status_libre
                 line.save(modified_by=request.user)
@@ -11,9 +11,13 @@ from django.utils import timezone
 from django.views.generic import ListView, View
 
 from budget.models import BudgetModificationHistory
+from core.catalogs import get_catalog_item
 from core.models import CatalogItem
+from core.exports import ExportMixin
+from core.stats import count_stats, status_stats
 from employee.models import Employee
 from institution.models import AdministrativeUnit
+from person.search import people_q
 from schedule.models import Schedule
 from .forms import LaborRegimeForm, ContractTypeForm
 from .models import LaborRegime, ContractType, ManagementPeriod, History
@@ -27,10 +31,10 @@ class LaborRegimeListView(LoginRequiredMixin, PermissionRequiredMixin, ListView)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        qs = LaborRegime.objects.all()
-        context['stats_total'] = qs.count()
-        context['stats_active'] = qs.filter(is_active=True).count()
-        context['stats_inactive'] = qs.filter(is_active=False).count()
+        stats = status_stats(LaborRegime.objects.all())
+        context['stats_total'] = stats['total']
+        context['stats_active'] = stats['active']
+        context['stats_inactive'] = stats['inactive']
         return context
 
 
@@ -46,12 +50,7 @@ class LaborRegimeTablePartialView(LoginRequiredMixin, View):
         elif is_active == 'false':
             queryset = queryset.filter(is_active=False)
 
-        all_qs = LaborRegime.objects.all()
-        stats = {
-            'total': all_qs.count(),
-            'active': all_qs.filter(is_active=True).count(),
-            'inactive': all_qs.filter(is_active=False).count(),
-        }
+        stats = status_stats(LaborRegime.objects.all())
 
         html = render_to_string('contract/partials/partial_labor_regime_table.html', {
             'regimes': queryset
@@ -250,13 +249,13 @@ class ManagementPeriodListView(LoginRequiredMixin, PermissionRequiredMixin, List
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        qs = ManagementPeriod.objects.filter(is_active=True)
-
         # Estadísticas dinámicas según el video
-        context['total_active'] = qs.count()
-        # conteo
-        context['count_losep'] = qs.filter(contract_type__labor_regime__code='LOSEP').count()
-        context['count_ct'] = qs.filter(contract_type__labor_regime__code='CT').count()
+        stats = count_stats(ManagementPeriod.objects.filter(is_active=True), {
+            'total_active': None,
+            'count_losep': Q(contract_type__labor_regime__code='LOSEP'),
+            'count_ct': Q(contract_type__labor_regime__code='CT'),
+        }, cache_key='active_by_regime', depends_on=(ContractType, LaborRegime))
+        context.update(stats)
 
         context['regimes'] = LaborRegime.objects.filter(is_active=True).prefetch_related('contract_types')
         context['schedules'] = Schedule.objects.filter(is_active=True)
@@ -338,10 +337,26 @@ class GetAvailableBudgetLinesAPIView(LoginRequiredMixin, View):
         return JsonResponse({'success': True, 'lines': data})
 
 
-class ManagementPeriodTablePartialView(LoginRequiredMixin, View):
-    def get(self, request):
+class ManagementPeriodTablePartialView(LoginRequiredMixin, ExportMixin, View):
+    export_filename = 'Periodos_de_Gestion'
+    export_columns = (
+        ('document_number', 'Nro. Documento'),
+        ('employee__person__document_number', 'Cédula'),
+        ('employee__person__last_name', 'Apellidos'),
+        ('employee__person__first_name', 'Nombres'),
+        ('budget_line__number_individual', 'Partida Individual'),
+        ('budget_line__position_item__name', 'Denominación'),
+        ('contract_type__labor_regime__name', 'Régimen Laboral'),
+        ('contract_type__name', 'Tipo de Contrato'),
+        ('administrative_unit__name', 'Unidad Administrativa'),
+        ('start_date', 'Fecha de Inicio'),
+        ('end_date', 'Fecha de Fin'),
+        ('status__name', 'Estado'),
+    )
+
+    def get_queryset(self):
         # 1. Filtros avanzados
-        is_advanced = request.GET.get('advanced', 'false') == 'true'
+        request = self.request
         q = request.GET.get('q', '').strip()
         regime_code_filter = request.GET.get('regime_code', '').strip()
         unit_id = request.GET.get('unit', '')
@@ -360,9 +375,7 @@ class ManagementPeriodTablePartialView(LoginRequiredMixin, View):
         # 3. Aplicación de lógica de filtrado
         if q:
             queryset = queryset.filter(
-                Q(employee__person__first_name__icontains=q) |
-                Q(employee__person__last_name__icontains=q) |
-                Q(employee__person__document_number__icontains=q) |
+                people_q(q, person_path='employee__person') |
                 Q(document_number__icontains=q)
             )
         if regime_code_filter:
@@ -374,13 +387,22 @@ class ManagementPeriodTablePartialView(LoginRequiredMixin, View):
         if date_from: queryset = queryset.filter(start_date__gte=date_from)
         if date_to: queryset = queryset.filter(start_date__lte=date_to)
 
-        # Límite de performance
-        has_filters = any([q, regime_code_filter, unit_id, regime_id, doc_num, status_code, date_from, date_to])
-        queryset = queryset[:2000] if (is_advanced or has_filters) else queryset[:50]
+        self.has_filters = any([q, regime_code_filter, unit_id, regime_id, doc_num, status_code, date_from, date_to])
+        return queryset
+
+    def get(self, request):
+        is_advanced = request.GET.get('advanced', 'false') == 'true'
+        queryset = self.get_queryset()
+
+        # Límite de performance (la exportación usa el queryset completo)
+        queryset = queryset[:2000] if (is_advanced or self.has_filters) else queryset[:50]
 
         # 4. Estadísticas Dinámicas
         active_status = ['SIN_FIRMAR', 'FIRMADO', 'ACTIVO']
-        total_active = ManagementPeriod.objects.filter(status__code__in=active_status).count()
+        total_active = count_stats(
+            ManagementPeriod.objects.all(), {'total': Q(status__code__in=active_status)},
+            cache_key='active_status', depends_on=(CatalogItem,)
+        )['total']
         regime_stats = LaborRegime.objects.filter(is_active=True).annotate(
             active_contracts=Count('contract_types__management_periods', filter=Q(contract_types__management_periods__status__code__in=active_status))
         ).order_by('name')
@@ -412,8 +434,8 @@ class ManagementPeriodTerminateView(LoginRequiredMixin, PermissionRequiredMixin,
         try:
             with transaction.atomic():
                 # 1. Obtener estados
-                finalizado_status = CatalogItem.objects.get(catalog__code='STATUS_CONTRACT', code='FINALIZADO')
-                libre_status = CatalogItem.objects.get(catalog__code='BUDGET_STATUS', code='LIBRE')
+                finalizado_status = get_catalog_item('STATUS_CONTRACT', 'FINALIZADO')
+                libre_status = get_catalog_item('BUDGET_STATUS', 'LIBRE')
                 current_status = period.employee.employment_status.code
                 exit_status = 'PERSONA'
                 # 2. Finalizar el Periodo
@@ -474,9 +496,7 @@ class ManagementPeriodCreateView(LoginRequiredMixin, PermissionRequiredMixin, Vi
         data = request.POST
         try:
             with transaction.atomic():
-                status_initial = CatalogItem.objects.get(
-                    catalog__code='STATUS_CONTRACT', code='SIN_FIRMAR'
-                )
+                status_initial = get_catalog_item('STATUS_CONTRACT', 'SIN_FIRMAR')
 
                 employee = get_object_or_404(Employee, pk=data.get('employee'))
                 budget_line = employee.current_budget_line.first()
@@ -523,10 +543,7 @@ class ManagementPeriodSignView(LoginRequiredMixin, PermissionRequiredMixin, View
         period = get_object_or_404(ManagementPeriod, pk=pk)
         try:
             with transaction.atomic():
-                status_signed = CatalogItem.objects.get(
-                    catalog__code='STATUS_CONTRACT',
-                    code='FIRMADO'
-                )
+                status_signed = get_catalog_item('STATUS_CONTRACT', 'FIRMADO')
                 period.status = status_signed
                 period.updated_by = request.user
                 period.save()
@@ -0,0 +1,81 @@
+"""
+Caché de catálogos en memoria del proceso.
+
+Los ítems de catálogo cambian muy poco y se consultan en casi todas las vistas
+(combos, estados LIBRE/OCUPADA, FINALIZADO...). Se cargan una sola vez por
+proceso y se recargan cuando cambia el contador de versión compartido en la
+caché de Django, que se incrementa desde las señales post_save/post_delete de
+Catalog y CatalogItem. Así todos los workers ven las ediciones hechas en
+cualquiera de ellos.
+
+Las instancias se comparten entre peticiones, así que todas las funciones
+retornan copias: modificar un ítem devuelto no altera la caché del proceso.
+"""
+import copy
+import threading
+
+from .models import CatalogItem
+from .versioning import SharedVersion
+
+catalog_version = SharedVersion('core:catalog_version')
+
+_lock = threading.Lock()
+_state = {
+    'version': None,
+    'by_catalog': {},   # código de catálogo -> tupla de ítems (ordenados por nombre)
+    'by_code': {},      # (código de catálogo, código de ítem) -> ítem
+    'by_id': {},        # pk -> ítem
+}
+
+
+def _load(version):
+    by_catalog, by_code, by_id = {}, {}, {}
+    items = CatalogItem.objects.select_related('catalog').order_by('catalog__code', 'name')
+    for item in items:
+        by_catalog.setdefault(item.catalog.code, []).append(item)
+        by_code[(item.catalog.code, item.code)] = item
+        by_id[item.pk] = item
+    _state.update(
+        version=version,
+        by_catalog={code: tuple(items) for code, items in by_catalog.items()},
+        by_code=by_code,
+        by_id=by_id,
+    )
+
+
+def _snapshot():
+    """Retorna el estado vigente, recargándolo si otro proceso modificó los catálogos."""
+    version = catalog_version.current()
+    if version != _state['version']:
+        with _lock:
+            if version != _state['version']:
+                _load(version)
+    return _state
+
+
+def get_catalog_items(catalog_code, active_only=True):
+    """Copias de los ítems del catálogo ordenados por nombre (por defecto solo los activos)."""
+    items = _snapshot()['by_catalog'].get(catalog_code, ())
+    return [copy.copy(item) for item in items if item.is_active or not active_only]
+
+
+def get_catalog_item(catalog_code, code):
+    """
+    Equivalente a CatalogItem.objects.get(catalog__code=..., code=...).
+    Lanza CatalogItem.DoesNotExist si el ítem no está configurado.
+    """
+    item = _snapshot()['by_code'].get((catalog_code, code))
+    if item is None:
+        raise CatalogItem.DoesNotExist(f'No existe el ítem {code} en el catálogo {catalog_code}.')
+    return copy.copy(item)
+
+
+def get_catalog_item_by_id(pk):
+    """Ítem por clave primaria o None."""
+    item = _snapshot()['by_id'].get(pk)
+    return copy.copy(item) if item is not None else None
+
+
+def invalidate_catalogs():
+    """Incrementa la versión compartida; cada proceso recargará en su próxima consulta."""
+    catalog_version.bump()
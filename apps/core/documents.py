@@ -0,0 +1,198 @@
+"""
+Caché en disco de documentos oficiales ya renderizados (PDF e impresiones).
+
+Un calendario de un mes cerrado o un perfil legalizado no cambia mientras no
+cambien sus datos. Cada vista arma una huella con document_fingerprint(): el
+updated_at (y conteo) de las filas de origen, la versión de la plantilla y la
+SystemConfiguration vigente. La huella es a la vez el nombre del archivo en disco
+y el ETag de la respuesta, así el navegador revalida con 304 y el servidor solo
+renderiza cuando algo cambió.
+
+Los archivos se guardan en DOCUMENT_CACHE_DIR (fuera de MEDIA_ROOT, no se
+publican) y se descartan por LRU, según la fecha del último acceso, cuando el
+total supera DOCUMENT_CACHE_MAX_BYTES.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.template.loader import get_template
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date
+
+from .models import SystemConfiguration
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Al desalojar se baja hasta esta fracción del límite para no barrer en cada escritura
+EVICT_TO = 0.9
+
+_template_versions = {}
+
+
+def _template_stamp(template_name):
+    """((ruta, mtime), hash) del código de la plantilla, recalculado solo si cambia la fecha del archivo."""
+    origin = get_template(template_name).origin.name
+    stamp = (origin, os.path.getmtime(origin))
+    cached = _template_versions.get(template_name)
+    if cached is None or cached[0] != stamp:
+        with open(origin, 'rb') as handle:
+            cached = (stamp, hashlib.sha256(handle.read()).hexdigest()[:16])
+        _template_versions[template_name] = cached
+    return cached
+
+
+def template_version(template_name):
+    return _template_stamp(template_name)[1]
+
+
+def template_modified(template_name):
+    """Fecha de modificación del archivo de la plantilla (naive, como el resto con USE_TZ=False)."""
+    return datetime.fromtimestamp(_template_stamp(template_name)[0][1])
+
+
+def document_fingerprint(template_name, *parts):
+    """Huella de un documento: plantilla, configuración institucional vigente y `parts` (datos de origen)."""
+    config = SystemConfiguration.get_current()
+    digest = hashlib.sha256()
+    for part in (template_name, template_version(template_name), SystemConfiguration.cache_version.current(),
+                 (config.pk, config.updated_at) if config else None, *parts):
+        digest.update(repr(part).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def latest(*values):
+    """Fecha más reciente entre las dadas (ignora None); sirve para Last-Modified."""
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+def document_last_modified(template_name, *values):
+    """
+    Last-Modified de un documento: lo más reciente entre `values` (datos de origen),
+    la plantilla y la configuración institucional vigente, las mismas fuentes que
+    document_fingerprint(); así un If-Modified-Since no recibe 304 con contenido viejo.
+    """
+    config = SystemConfiguration.get_current()
+    return latest(*values, template_modified(template_name), config.updated_at if config else None)
+
+
+class DocumentCache:
+    """Almacén direccionado por contenido (huella -> archivo) con desalojo LRU por tamaño total."""
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or getattr(settings, 'DOCUMENT_CACHE_DIR',
+                                              os.path.join(settings.BASE_DIR, 'document_cache'))
+        self.max_bytes = max_bytes if max_bytes is not None else getattr(settings, 'DOCUMENT_CACHE_MAX_BYTES',
+                                                                         DEFAULT_MAX_BYTES)
+        self._lock = threading.Lock()
+        # Tamaño estimado por este proceso; se corrige con cada recorrido del directorio
+        self._size = None
+
+    def path(self, key, suffix='.pdf'):
+        return os.path.join(self.directory, key[:2], f'{key}{suffix}')
+
+    def open(self, key, suffix='.pdf'):
+        """Archivo abierto del documento o None si no está (o lo desalojó otro proceso)."""
+        path = self.path(key, suffix)
+        try:
+            handle = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)  # Marca el acceso para el LRU
+        except OSError:
+            pass
+        return handle
+
+    def put(self, key, content, suffix='.pdf'):
+        path = self.path(key, suffix)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Escritura atómica: un lector nunca ve un archivo a medias
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(content)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self.size()
+            else:
+                self._size += len(content)
+            if self._size > self.max_bytes:
+                self.evict()
+        return path
+
+    def entries(self):
+        """(último acceso, tamaño, ruta) de cada documento guardado."""
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield stat.st_mtime, stat.st_size, path
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, max_bytes=None):
+        """Elimina los documentos usados hace más tiempo hasta quedar bajo el límite. Retorna cuántos."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        if total > limit:
+            for _, size, path in entries:
+                if total <= limit * EVICT_TO:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+        self._size = total
+        return removed
+
+    def clear(self):
+        return self.evict(max_bytes=0)
+
+
+document_cache = DocumentCache()
+
+
+def cached_document_response(request, key, render, filename, last_modified=None,
+                             content_type='application/pdf', suffix='.pdf', as_attachment=False):
+    """
+    Respuesta del documento `key`: 304 si el cliente ya lo tiene, el archivo en
+    caché si existe o, en otro caso, el resultado de render() (bytes), que se guarda.
+    """
+    etag = f'"{key}"'
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        handle = document_cache.open(key, suffix)
+        if handle is not None:
+            response = FileResponse(handle, content_type=content_type)
+            response['X-Document-Cache'] = 'HIT'
+        else:
+            content = render()
+            document_cache.put(key, content, suffix)
+            response = HttpResponse(content, content_type=content_type)
+            response['X-Document-Cache'] = 'MISS'
+        response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+
+    response['ETag'] = etag
+    if timestamp:
+        response['Last-Modified'] = http_date(timestamp)
+    # Documentos con datos personales: solo caché del navegador y revalidando siempre
+    response['Cache-Control'] = 'private, no-cache'
+    return response
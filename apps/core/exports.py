@@ -0,0 +1,244 @@
+"""
+Exportación de hojas de cálculo en modo streaming.
+
+XlsxStreamWriter usa el modo write-only de openpyxl: cada fila se serializa al
+agregarla y no queda en memoria, así que el consumo no crece con el número de
+filas. Los estilos se definen una sola vez como estilos con nombre del libro y
+cada celda copia el estilo ya construido de su prototipo en lugar de crear
+Font/Border/Alignment por celda.
+
+El libro se escribe en un archivo temporal que xlsx_response() envía al cliente
+por bloques.
+
+ExportMixin agrega a cualquier listado la descarga de su queryset filtrado en
+CSV o XLSX (?export=csv|xlsx). Las columnas se declaran como (campo, encabezado)
+o (campo, encabezado, formateador) con rutas de values_list(), de modo que las
+relaciones se resuelven con JOIN y las filas se leen por bloques con
+.iterator() sin instanciar modelos ni cargar el listado completo.
+
+En modo write-only las filas solo pueden agregarse en orden y los anchos de
+columna deben fijarse antes de la primera fila.
+"""
+import csv
+import tempfile
+from copy import copy
+
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, Http404, HttpRequest, QueryDict, StreamingHttpResponse
+from django.urls import resolve, reverse
+from django.utils import timezone
+from django.utils.http import content_disposition_header
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+from .jobs import enqueue_response
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+EXPORT_FORMATS = ('csv', 'xlsx')
+EXPORT_CHUNK_SIZE = 2000
+
+_thin = Side(style='thin')
+THIN_BORDER = Border(left=_thin, right=_thin, top=_thin, bottom=_thin)
+HEADER_FILL = PatternFill(start_color='DAE8FC', end_color='DAE8FC', fill_type='solid')
+CENTER = Alignment(horizontal='center', vertical='center', wrap_text=True)
+LEFT = Alignment(horizontal='left', vertical='center', wrap_text=True)
+
+
+def _style(name, **attrs):
+    style = NamedStyle(name=name)
+    for attr, value in attrs.items():
+        setattr(style, attr, value)
+    return style
+
+
+# Estilos institucionales comunes a los reportes
+DEFAULT_STYLES = (
+    _style('title', font=Font(name='Arial', size=11, bold=True), alignment=CENTER),
+    _style('label', font=Font(name='Arial', size=8, bold=True)),
+    _style('text', font=Font(name='Arial', size=9)),
+    _style('header', font=Font(name='Arial', size=10, bold=True), alignment=CENTER, border=THIN_BORDER,
+           fill=HEADER_FILL),
+    _style('subheader', font=Font(name='Arial', size=8, bold=True), alignment=CENTER, border=THIN_BORDER,
+           fill=HEADER_FILL),
+    _style('cell', font=Font(name='Arial', size=9), alignment=CENTER, border=THIN_BORDER),
+    _style('cell_left', font=Font(name='Arial', size=9), alignment=LEFT, border=THIN_BORDER),
+)
+
+
+class XlsxStreamWriter:
+    """Hoja única en modo write-only con estilos con nombre precargados."""
+
+    def __init__(self, title, styles=DEFAULT_STYLES, widths=None):
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet(title=title[:31])
+        self._prototypes = {}
+        for style in styles:
+            named = copy(style)
+            # copy() no conserva el formato numérico del estilo con nombre
+            named.number_format = style.number_format
+            self.workbook.add_named_style(named)
+            prototype = WriteOnlyCell(self.sheet)
+            prototype.style = style.name
+            self._prototypes[style.name] = prototype._style
+        self.rows_written = 0
+        if widths:
+            for index, width in enumerate(widths, start=1):
+                self.sheet.column_dimensions[get_column_letter(index)].width = width
+
+    def cell(self, value, style=None):
+        cell = WriteOnlyCell(self.sheet, value=value)
+        if style:
+            cell._style = copy(self._prototypes[style])
+        return cell
+
+    def append(self, values, styles=None):
+        """
+        Agrega una fila. `styles` es un nombre de estilo para toda la fila o una
+        secuencia con un estilo por columna (None deja la celda sin estilo).
+        """
+        if styles is None:
+            row = list(values)
+        else:
+            if isinstance(styles, str):
+                styles = [styles] * len(values)
+            row = [self.cell(value, style) for value, style in zip(values, styles)]
+        self.sheet.append(row)
+        self.rows_written += 1
+        return self.rows_written
+
+    def append_rows(self, rows, styles=None):
+        for values in rows:
+            self.append(values, styles)
+
+    def merge(self, cell_range):
+        """Combina un rango; las celdas cubiertas deben escribirse (vacías) con su estilo de borde."""
+        self.sheet.merged_cells.add(cell_range)
+
+    def save(self, fileobj):
+        self.workbook.save(fileobj)
+
+
+def xlsx_response(writer, filename):
+    """Guarda el libro en un temporal y lo envía por bloques como adjunto."""
+    handle = tempfile.TemporaryFile(suffix='.xlsx')
+    writer.save(handle)
+    handle.seek(0)
+    return FileResponse(handle, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
+
+
+def yes_no(value):
+    return 'SI' if value else 'NO'
+
+
+def export_rows(queryset, columns, chunk_size=EXPORT_CHUNK_SIZE):
+    """Filas del queryset con los campos de `columns`, leídas por bloques con values_list()."""
+    formatters = [column[2] if len(column) > 2 else None for column in columns]
+    rows = queryset.values_list(*[column[0] for column in columns]).iterator(chunk_size=chunk_size)
+    for values in rows:
+        yield [fmt(value) if fmt else value for value, fmt in zip(values, formatters)]
+
+
+class _Echo:
+    """Pseudo-archivo para csv.writer: devuelve cada línea en lugar de guardarla."""
+
+    def write(self, value):
+        return value
+
+
+def csv_stream(headers, rows):
+    writer = csv.writer(_Echo())
+    # BOM para que Excel reconozca UTF-8 (tildes y eñes)
+    yield '\ufeff' + writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _xlsx_writer(filename, headers, rows):
+    writer = XlsxStreamWriter(filename, widths=[max(12, len(header) + 4) for header in headers])
+    writer.append(headers, 'header')
+    # Filas de datos sin estilo: en exportaciones masivas el costo por celda importa
+    writer.append_rows(rows)
+    return writer
+
+
+def export_response(queryset, columns, export_format, filename):
+    """Respuesta en streaming con el queryset en CSV o XLSX; `filename` va sin extensión."""
+    headers = [column[1] for column in columns]
+    rows = export_rows(queryset, columns)
+    if export_format == 'csv':
+        response = StreamingHttpResponse(csv_stream(headers, rows), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = content_disposition_header(True, f'{filename}.csv')
+        return response
+    return xlsx_response(_xlsx_writer(filename, headers, rows), f'{filename}.xlsx')
+
+
+def export_view_to_file(view_name, query, export_format, user, handle):
+    """
+    Escribe en `handle` (binario) la exportación del listado `view_name` con los
+    filtros de `query` (cadena GET). La usa el trabajo core.export_list, fuera de
+    la petición original, así que aquí no corre dispatch(): el acceso de `user`
+    a la vista se valida de nuevo. Retorna el nombre del archivo.
+    """
+    match = resolve(reverse(view_name))
+    view_class = getattr(match.func, 'view_class', None)
+    if view_class is None or not issubclass(view_class, ExportMixin):
+        raise PermissionDenied('La vista no admite exportación.')
+    view = view_class(**match.func.view_initkwargs)
+    request = HttpRequest()
+    request.method = 'GET'
+    request.GET = QueryDict(query)
+    request.user = user
+    request.resolver_match = match
+    view.setup(request, *match.args, **match.kwargs)
+    # Lo que harían LoginRequiredMixin y PermissionRequiredMixin en dispatch()
+    if not user.is_authenticated or (hasattr(view, 'has_permission') and not view.has_permission()):
+        raise PermissionDenied('No tiene permisos para exportar este listado.')
+
+    headers = [column[1] for column in view.export_columns]
+    rows = export_rows(view.get_export_queryset(), view.export_columns)
+    filename = f'{view.get_export_filename()}.{export_format}'
+    if export_format == 'csv':
+        for line in csv_stream(headers, rows):
+            handle.write(line.encode('utf-8'))
+    else:
+        _xlsx_writer(view.get_export_filename(), headers, rows).save(handle)
+    return filename
+
+
+class ExportMixin:
+    """
+    Para vistas de listado: ?export=csv|xlsx descarga el queryset filtrado de la
+    vista (sin paginar) con las columnas de export_columns. Con &background=1 la
+    exportación se encola como trabajo (core.jobs) y la respuesta trae la URL de
+    consulta. Debe ir después de los mixins de login y permisos para que éstos se
+    apliquen primero.
+    """
+    export_param = 'export'
+    background_param = 'background'
+    export_columns = ()
+    export_filename = 'Listado'
+
+    def get_export_queryset(self):
+        return self.get_queryset()
+
+    def get_export_filename(self):
+        return f"{self.export_filename}_{timezone.now().strftime('%Y%m%d_%H%M')}"
+
+    def dispatch(self, request, *args, **kwargs):
+        export_format = request.GET.get(self.export_param)
+        if request.method != 'GET' or not export_format:
+            return super().dispatch(request, *args, **kwargs)
+        if export_format not in EXPORT_FORMATS:
+            raise Http404('Formato de exportación no soportado.')
+        if request.GET.get(self.background_param):
+            query = request.GET.copy()
+            for key in (self.export_param, self.background_param):
+                query.pop(key, None)
+            return enqueue_response(request, 'core.export_list', {
+                'view': request.resolver_match.view_name, 'query': query.urlencode(),
+                'export_format': export_format,
+            })
+        return export_response(self.get_export_queryset(), self.export_columns, export_format,
+                               self.get_export_filename())
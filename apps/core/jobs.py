@@ -0,0 +1,187 @@
+"""
+Trabajos en segundo plano respaldados por la base de datos.
+
+Las tareas largas (lotes de PDF, exportaciones, sincronización de biométricos,
+recarga de catálogos) ya no corren dentro de la petición: la vista crea un Job
+con enqueue() y responde de inmediato; el comando run_jobs los toma con
+SELECT ... FOR UPDATE SKIP LOCKED y los ejecuta en un pool de procesos. El
+cliente consulta el estado en core:api_job_detail y descarga el archivo
+generado (guardado en MEDIA_ROOT/jobs/) en core:job_download.
+
+Cada app declara sus trabajos en su módulo jobs.py con @register_job. La función
+recibe el Job (para publicar avance con job.set_progress y guardar archivos con
+save_job_file) y los parámetros con que se encoló; lo que retorne (serializable
+a JSON) queda en job.result.
+"""
+import logging
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.files.base import ContentFile, File
+from django.db import transaction
+from django.db.models import Count, F, Min, Q
+from django.http import JsonResponse
+from django.urls import reverse
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Un trabajo en ejecución más allá de este tiempo se considera huérfano (worker caído)
+STALE_AFTER = timedelta(hours=2)
+MAX_ATTEMPTS = 3
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    name: str
+    func: Callable
+    permission: Optional[str] = None
+    # False: solo se encola desde el código (la vista que lo usa valida los parámetros)
+    api: bool = True
+
+
+_registry = {}
+_discovered = False
+
+
+def register_job(name, permission=None, api=True):
+    """
+    Registra `func(job, **params)` como trabajo; `permission` se exige al encolar
+    desde la API. Con api=False la API rechaza encolarlo.
+    """
+    def decorator(func):
+        _registry[name] = JobSpec(name, func, permission, api)
+        return func
+    return decorator
+
+
+def get_job_spec(name):
+    global _discovered
+    if not _discovered:
+        autodiscover_modules('jobs')
+        _discovered = True
+    return _registry.get(name)
+
+
+def enqueue(name, params=None, user=None):
+    if get_job_spec(name) is None:
+        raise ValueError(f'Trabajo no registrado: {name}')
+    return Job.objects.create(name=name, params=params or {},
+                              created_by=user if user and user.is_authenticated else None)
+
+
+def save_job_file(job, filename, content):
+    """Guarda el resultado (bytes o archivo abierto) en MEDIA_ROOT y lo asocia al trabajo."""
+    job.result_file.save(filename, ContentFile(content) if isinstance(content, bytes) else File(content),
+                         save=False)
+    Job.objects.filter(pk=job.pk).update(result_file=job.result_file.name)
+
+
+def job_user(job):
+    return job.created_by or AnonymousUser()
+
+
+def job_payload(job):
+    return {
+        'id': job.pk,
+        'name': job.name,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'progress': job.progress,
+        'message': job.message,
+        'result': job.result,
+        'error': job.error,
+        'created_at': job.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        'finished_at': job.finished_at.strftime('%Y-%m-%d %H:%M:%S') if job.finished_at else None,
+        'status_url': reverse('core:api_job_detail', args=[job.pk]),
+        'download_url': reverse('core:job_download', args=[job.pk]) if job.result_file else None,
+    }
+
+
+def enqueue_response(request, name, params=None):
+    """Encola el trabajo y responde 202 con la URL de consulta."""
+    job = enqueue(name, params, request.user)
+    return JsonResponse({'success': True, 'status': 'queued', 'job': job_payload(job)}, status=202)
+
+
+# --- Worker ---
+
+def claim_pending(limit):
+    """Marca como RUNNING hasta `limit` trabajos en cola; los bloqueados por otro worker se omiten."""
+    with transaction.atomic():
+        ids = list(
+            Job.objects.select_for_update(skip_locked=True).filter(status=Job.STATUS_PENDING)
+            .order_by('created_at').values_list('pk', flat=True)[:limit]
+        )
+        if ids:
+            Job.objects.filter(pk__in=ids).update(
+                status=Job.STATUS_RUNNING, started_at=datetime.now(), attempts=F('attempts') + 1, progress=0
+            )
+    return ids
+
+
+def run_job(job_id):
+    """Ejecuta un trabajo ya reclamado y guarda su resultado o error. Retorna el estado final."""
+    job = Job.objects.get(pk=job_id)
+    spec = get_job_spec(job.name)
+    try:
+        if spec is None:
+            raise LookupError(f'Trabajo no registrado: {job.name}')
+        job.result = spec.func(job, **job.params)
+        job.status, job.progress, job.error = Job.STATUS_SUCCESS, 100, None
+    except Exception as e:
+        logger.error(f"[JOBS] Error en {job.name} #{job.pk}: {e}", exc_info=True)
+        job.status, job.error = Job.STATUS_FAILED, str(e) or e.__class__.__name__
+    job.finished_at = datetime.now()
+    job.save(update_fields=['status', 'progress', 'result', 'error', 'finished_at', 'updated_at'])
+    return job.status
+
+
+def fail_job(job_id, error):
+    Job.objects.filter(pk=job_id).update(status=Job.STATUS_FAILED, error=error, finished_at=datetime.now())
+
+
+def requeue_stale(older_than=STALE_AFTER):
+    """Devuelve a la cola los trabajos huérfanos; los que agotaron los intentos quedan fallidos."""
+    stale = Job.objects.filter(status=Job.STATUS_RUNNING, started_at__lt=datetime.now() - older_than)
+    requeued = stale.filter(attempts__lt=MAX_ATTEMPTS).update(status=Job.STATUS_PENDING)
+    failed = stale.update(status=Job.STATUS_FAILED, finished_at=datetime.now(),
+                          error='El worker se interrumpió durante la ejecución.')
+    return requeued, failed
+
+
+def job_metrics():
+    now = datetime.now()
+    data = Job.objects.aggregate(
+        pending=Count('id', filter=Q(status=Job.STATUS_PENDING)),
+        running=Count('id', filter=Q(status=Job.STATUS_RUNNING)),
+        failed=Count('id', filter=Q(status=Job.STATUS_FAILED)),
+        oldest_pending=Min('created_at', filter=Q(status=Job.STATUS_PENDING)),
+    )
+    oldest = data.pop('oldest_pending')
+    data['lag_seconds'] = int((now - oldest).total_seconds()) if oldest else 0
+    return data
+
+
+# --- Trabajos comunes ---
+
+@register_job('core.export_list', api=False)
+def export_list(job, view, query, export_format):
+    """
+    Exportación en segundo plano de un listado con ExportMixin. Solo la encola
+    ExportMixin.dispatch; los permisos de la vista se validan de nuevo con el
+    usuario que la pidió.
+    """
+    from .exports import export_view_to_file
+
+    job.set_progress(5, 'Generando archivo')
+    with tempfile.TemporaryFile() as handle:
+        filename = export_view_to_file(view, query, export_format, job_user(job), handle)
+        handle.seek(0)
+        save_job_file(job, filename, handle)
+    return {'filename': filename}
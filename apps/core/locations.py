@@ -0,0 +1,68 @@
+"""
+Índice en memoria del árbol de ubicaciones (País > Provincia > Ciudad > Parroquia).
+
+Se carga con una sola consulta por proceso y sirve Location.__str__ y los
+selectores en cascada de LocationJsonView sin recorrer padres uno a uno. Se
+recarga cuando cambia la versión compartida (ver core.versioning), que las
+señales de Location incrementan al confirmar cada escritura.
+"""
+import threading
+
+from .models import Location
+from .versioning import SharedVersion
+
+location_version = SharedVersion('core:location_version')
+
+_lock = threading.Lock()
+_state = {
+    'version': None,
+    'nodes': {},      # pk -> (nombre, parent_id, nivel, activo)
+    'children': {},   # parent_id -> [pk, ...] ordenados por nombre
+    'roots': [],      # países (nivel 1) ordenados por nombre
+}
+
+
+def _load(version):
+    nodes, children, roots = {}, {}, []
+    rows = Location.objects.order_by('name').values_list('pk', 'name', 'parent_id', 'level', 'is_active')
+    for pk, name, parent_id, level, is_active in rows:
+        nodes[pk] = (name, parent_id, level, is_active)
+        children.setdefault(parent_id, []).append(pk)
+        if level == 1:
+            roots.append(pk)
+    _state.update(version=version, nodes=nodes, children=children, roots=roots)
+
+
+def _snapshot():
+    version = location_version.current()
+    if version != _state['version']:
+        with _lock:
+            if version != _state['version']:
+                _load(version)
+    return _state
+
+
+def location_path(pk):
+    """Ruta completa "País > Provincia > ..." o None si la ubicación no está en el índice."""
+    nodes = _snapshot()['nodes']
+    if pk not in nodes:
+        return None
+    names = []
+    seen = set()
+    while pk is not None and pk in nodes and pk not in seen:
+        seen.add(pk)
+        name, pk, _, _ = nodes[pk]
+        names.append(name)
+    return ' > '.join(reversed(names))
+
+
+def active_children(parent_id=None):
+    """Ubicaciones activas hijas de `parent_id` (sin padre: los países), ordenadas por nombre."""
+    state = _snapshot()
+    nodes = state['nodes']
+    candidates = state['roots'] if parent_id is None else state['children'].get(parent_id, [])
+    return [{'id': pk, 'name': nodes[pk][0]} for pk in candidates if nodes[pk][3]]
+
+
+def invalidate_locations():
+    location_version.bump()
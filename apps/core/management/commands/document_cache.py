@@ -0,0 +1,27 @@
+# apps/core/management/commands/document_cache.py
+from django.core.management.base import BaseCommand
+
+from core.documents import document_cache
+
+
+class Command(BaseCommand):
+    help = 'Muestra el uso de la caché de documentos renderizados, la recorta al límite o la vacía'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--evict', action='store_true',
+                            help='Descarta los documentos menos usados hasta quedar bajo el límite')
+        parser.add_argument('--clear', action='store_true', help='Elimina todos los documentos')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            removed = document_cache.clear()
+            self.stdout.write(self.style.SUCCESS(f'Documentos eliminados: {removed}'))
+        elif options['evict']:
+            removed = document_cache.evict()
+            self.stdout.write(self.style.SUCCESS(f'Documentos descartados: {removed}'))
+
+        entries = list(document_cache.entries())
+        total = sum(size for _, size, _ in entries)
+        self.stdout.write(f'Directorio: {document_cache.directory}')
+        self.stdout.write(f'Documentos: {len(entries)}')
+        self.stdout.write(f'Tamaño: {total / 1024 / 1024:.1f} MB de {document_cache.max_bytes / 1024 / 1024:.0f} MB')
@@ -0,0 +1,76 @@
+# apps/core/management/commands/run_jobs.py
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.jobs import claim_pending, fail_job, job_metrics, requeue_stale, run_job
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta los trabajos en segundo plano en cola (reportes, exportaciones, sincronizaciones)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1),
+                            help='Procesos simultáneos')
+        parser.add_argument('--sleep', type=float, default=2.0,
+                            help='Segundos de espera cuando la cola está vacía')
+        parser.add_argument('--once', action='store_true',
+                            help='Ejecuta los trabajos en cola y termina')
+        parser.add_argument('--stats', action='store_true',
+                            help='Muestra el estado de la cola y termina')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self._print_metrics()
+            return
+
+        requeued, failed = requeue_stale()
+        if requeued or failed:
+            self.stdout.write(self.style.WARNING(f'Trabajos huérfanos: {requeued} reencolados, {failed} fallidos'))
+
+        workers = max(1, options['workers'])
+        self.stdout.write(self.style.SUCCESS(f'--- Worker de trabajos iniciado ({workers} procesos) ---'))
+        running = {}
+        try:
+            # Los procesos hijos no deben heredar conexiones abiertas a la base de datos
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+                while True:
+                    if len(running) < workers:
+                        claimed = claim_pending(workers - len(running))
+                        connections.close_all()
+                        for job_id in claimed:
+                            running[executor.submit(run_job, job_id)] = job_id
+                    if not running:
+                        if options['once']:
+                            break
+                        time.sleep(options['sleep'])
+                        continue
+                    done, _ = wait(running, timeout=options['sleep'], return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._report(running.pop(future), future)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Worker detenido.'))
+
+        self._print_metrics()
+
+    def _report(self, job_id, future):
+        try:
+            status = future.result()
+        except Exception as e:
+            # El proceso murió (p. ej. sin memoria): el trabajo no pudo registrar su error
+            fail_job(job_id, f'El proceso del trabajo terminó inesperadamente: {e}')
+            status = 'FAILED'
+        style = self.style.SUCCESS if status == 'SUCCESS' else self.style.ERROR
+        self.stdout.write(style(f'Trabajo {job_id}: {status}'))
+
+    def _print_metrics(self):
+        metrics = job_metrics()
+        self.stdout.write(
+            f"En cola: {metrics['pending']} | En ejecución: {metrics['running']} | "
+            f"Fallidos: {metrics['failed']} | Retraso: {metrics['lag_seconds']}s"
+        )
@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-17 11:40
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_table(apps, schema_editor):
+    """Crea la tabla de la caché de base de datos (idempotente)."""
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_fix_timezone_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_table, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 6.0 on 2026-10-17 10:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_create_cache_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Estado')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última Modificación')),
+                ('name', models.CharField(max_length=100, verbose_name='Trabajo')),
+                ('params', models.JSONField(blank=True, default=dict, verbose_name='Parámetros')),
+                ('status', models.CharField(choices=[('PENDING', 'En cola'), ('RUNNING', 'En ejecución'), ('SUCCESS', 'Completado'), ('FAILED', 'Fallido')], default='PENDING', max_length=20, verbose_name='Estado')),
+                ('progress', models.PositiveSmallIntegerField(default=0, verbose_name='Progreso (%)')),
+                ('message', models.CharField(blank=True, max_length=255, null=True, verbose_name='Mensaje')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='Resultado')),
+                ('result_file', models.FileField(blank=True, null=True, upload_to='jobs/%Y/%m/', verbose_name='Archivo Generado')),
+                ('error', models.TextField(blank=True, null=True, verbose_name='Error')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Intentos')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Inicio')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Fin')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(app_label)s_%(class)s_created', to=settings.AUTH_USER_MODEL, verbose_name='Creado por')),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(app_label)s_%(class)s_updated', to=settings.AUTH_USER_MODEL, verbose_name='Actualizado por')),
+            ],
+            options={
+                'verbose_name': 'Trabajo en Segundo Plano',
+                'verbose_name_plural': 'Trabajos en Segundo Plano',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='core_job_status_idx')],
+            },
+        ),
+    ]
@@ -1,8 +1,14 @@
 # apps/core/models.py
-from django.db import models
+import base64
+import mimetypes
+from functools import cached_property
+
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
 
+from .versioning import SharedVersion
+
 
 class BaseModel(models.Model):
     """
@@ -136,6 +142,11 @@ class Location(BaseModel):
         unique_together = ('parent', 'name')
 
     def __str__(self):
+        # La ruta sale del índice en memoria (core.locations) sin consultar cada padre
+        from .locations import location_path
+        full_path = location_path(self.pk) if self.pk else None
+        if full_path is not None:
+            return full_path
         full_path = [self.name]
         p = self.parent
         while p is not None:
@@ -149,19 +160,18 @@ class Location(BaseModel):
         """
         new_status = not self.is_active
         self.is_active = new_status
-        self.save()
+        with transaction.atomic():
+            self.save()
+            self._propagate_status(new_status)
 
-        # Propagación recursiva a los hijos
-        self._propagate_status(self, new_status)
-
-    def _propagate_status(self, location, status):
-        # Obtenemos los hijos directos
-        children = location.children.all()
-        for child in children:
-            child.is_active = status
-            child.save()
-            # Llamada recursiva para los hijos de los hijos
-            self._propagate_status(child, status)
+    def _propagate_status(self, status):
+        """Propagación nivel por nivel: un UPDATE por nivel en lugar de un save() por descendiente."""
+        from django.utils import timezone
+        frontier = [self.pk]
+        while frontier:
+            frontier = list(Location.objects.filter(parent_id__in=frontier).values_list('pk', flat=True))
+            if frontier:
+                Location.objects.filter(pk__in=frontier).update(is_active=status, updated_at=timezone.now())
 
 
 class SystemConfiguration(BaseModel):
@@ -256,17 +266,51 @@ class SystemConfiguration(BaseModel):
     def __str__(self):
         return f"{self.institution_name} - Vigente desde {self.effective_date}"
 
+    # Memoria por proceso de get_current: ((fecha, versión), configuración)
+    _current_memo = None
+    cache_version = SharedVersion('core:system_configuration_version')
+
     @classmethod
     def get_current(cls):
         """
         Obtiene la configuración activa vigente.
         Retorna la configuración más reciente que esté activa.
+
+        El resultado se memoriza durante el día (solo cambia al pasar una fecha de
+        vigencia o al guardar una configuración, lo que incrementa la versión).
         """
         from django.utils import timezone
-        return cls.objects.filter(
-            is_active=True,
-            effective_date__lte=timezone.now().date()
-        ).first()
+        key = (timezone.now().date(), cls.cache_version.current())
+        memo = cls._current_memo
+        if memo is None or memo[0] != key:
+            memo = (key, cls.objects.filter(is_active=True, effective_date__lte=key[0]).first())
+            cls._current_memo = memo
+        return memo[1]
+
+    @staticmethod
+    def _read_image(field):
+        if not field:
+            return None
+        with field.open('rb') as image_file:
+            content = image_file.read()
+        mime_type = mimetypes.guess_type(field.name)[0] or 'image/png'
+        return {
+            'bytes': content,
+            'data_uri': f"data:{mime_type};base64,{base64.b64encode(content).decode('ascii')}",
+        }
+
+    @cached_property
+    def image_assets(self):
+        """
+        Logo leído una sola vez: bytes y data URI listos para incrustar en las
+        plantillas de xhtml2pdf sin volver a abrir el archivo de MEDIA_ROOT.
+        """
+        return {'logo': self._read_image(self.logo)}
+
+    @property
+    def logo_data_uri(self):
+        asset = self.image_assets['logo']
+        return asset['data_uri'] if asset else ''
 
 class Authorities(BaseModel):
     name = models.CharField(verbose_name='Nombre* :', max_length=255)
@@ -278,4 +322,51 @@ class Authorities(BaseModel):
         ordering = ['pk']
 
     def __str__(self):
-        return '%s' % self.name
\ No newline at end of file
+        return '%s' % self.name
+
+class Job(BaseModel):
+    """Trabajo en segundo plano (reportes, exportaciones, sincronizaciones) que ejecuta run_jobs."""
+    STATUS_PENDING = 'PENDING'
+    STATUS_RUNNING = 'RUNNING'
+    STATUS_SUCCESS = 'SUCCESS'
+    STATUS_FAILED = 'FAILED'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'En cola'),
+        (STATUS_RUNNING, 'En ejecución'),
+        (STATUS_SUCCESS, 'Completado'),
+        (STATUS_FAILED, 'Fallido'),
+    ]
+
+    name = models.CharField(max_length=100, verbose_name="Trabajo")
+    params = models.JSONField(default=dict, blank=True, verbose_name="Parámetros")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="Estado")
+    progress = models.PositiveSmallIntegerField(default=0, verbose_name="Progreso (%)")
+    message = models.CharField(max_length=255, blank=True, null=True, verbose_name="Mensaje")
+    result = models.JSONField(blank=True, null=True, verbose_name="Resultado")
+    result_file = models.FileField(upload_to='jobs/%Y/%m/', blank=True, null=True, verbose_name="Archivo Generado")
+    error = models.TextField(blank=True, null=True, verbose_name="Error")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Intentos")
+    started_at = models.DateTimeField(blank=True, null=True, verbose_name="Inicio")
+    finished_at = models.DateTimeField(blank=True, null=True, verbose_name="Fin")
+
+    class Meta:
+        verbose_name = "Trabajo en Segundo Plano"
+        verbose_name_plural = "Trabajos en Segundo Plano"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='core_job_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_SUCCESS, self.STATUS_FAILED)
+
+    def set_progress(self, progress, message=None):
+        """Publica el avance sin tocar el resto de campos (lo lee el endpoint de consulta)."""
+        self.progress = max(0, min(100, int(progress)))
+        if message is not None:
+            self.message = message[:255]
+        Job.objects.filter(pk=self.pk).update(progress=self.progress, message=self.message)
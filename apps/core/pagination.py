@@ -0,0 +1,276 @@
+"""
+Paginación por cursor (keyset) y conteo estimado para los listados grandes.
+
+Con OFFSET cada página lee y descarta todas las filas anteriores y además hace
+un COUNT(*) completo. KeysetPaginationMixin añade a un ListView un modo opcional:
+cuando la petición trae el parámetro ?cursor= (vacío para la primera página) la
+página se obtiene filtrando a partir de la última fila vista sobre el orden del
+queryset más la clave primaria, lo que usa el índice y cuesta lo mismo en
+cualquier página. Sin el parámetro el listado sigue paginando por ?page=.
+
+El total de la cabecera puede estimarse con el plan de PostgreSQL (?count=estimate
+o estimate_count = True en la vista) en lugar de contar todas las filas.
+"""
+import base64
+import datetime
+import json
+import uuid
+from decimal import Decimal
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.db.models import F, Model, Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+# Por debajo de este número de filas estimadas se cuenta exactamente
+EXACT_COUNT_THRESHOLD = 1000
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def estimate_count(queryset, threshold=EXACT_COUNT_THRESHOLD):
+    """
+    Filas estimadas por el planificador de PostgreSQL para el queryset. En otros
+    motores, o si la estimación es pequeña, devuelve el COUNT(*) exacto.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    sql, params = queryset.order_by().values('pk').query.get_compiler(using=queryset.db).as_sql()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimated = int(plan[0]['Plan']['Plan Rows'])
+    return queryset.count() if estimated < threshold else estimated
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator por OFFSET cuyo total proviene de estimate_count()."""
+
+    @cached_property
+    def count(self):
+        return estimate_count(self.object_list)
+
+
+def _json_value(value):
+    # Sin recortar los microsegundos (DjangoJSONEncoder los reduce a milisegundos)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    raise TypeError(f'{type(value).__name__} no puede usarse en un cursor de paginación.')
+
+
+def encode_cursor(values, direction, offset):
+    payload = json.dumps({'v': values, 'd': direction, 'o': offset}, default=_json_value)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        values, direction, offset = payload['v'], payload['d'], int(payload['o'])
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor('El cursor de paginación no es válido.')
+    if direction not in ('n', 'p') or not isinstance(values, list) or offset < 0:
+        raise InvalidCursor('El cursor de paginación no es válido.')
+    return values, direction, offset
+
+
+class KeysetPage:
+    """Página con la misma interfaz que django.core.paginator.Page que usan las plantillas."""
+
+    def __init__(self, object_list, paginator, offset, has_next, has_previous, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.offset = offset
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.next_cursor = next_cursor if has_next else None
+        self.previous_cursor = previous_cursor if has_previous else None
+
+    def __repr__(self):
+        return f'<KeysetPage {self.number}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    @property
+    def number(self):
+        return self.offset // self.paginator.per_page + 1
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+    def start_index(self):
+        return self.offset + 1 if self.object_list else 0
+
+    def end_index(self):
+        return self.offset + len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Pagina un queryset ordenado filtrando por los valores de la última (o primera)
+    fila de la página anterior. El orden es el del queryset (o el Meta.ordering del
+    modelo) con la clave primaria como desempate; la comparación sigue el orden de
+    nulos de PostgreSQL (al final en ASC, al inicio en DESC).
+    """
+
+    def __init__(self, queryset, per_page, estimate=False):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.estimate = estimate
+        self.keys = self._ordering_keys(queryset)
+
+    @staticmethod
+    def _ordering_keys(queryset):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        keys = []
+        for field in ordering:
+            if not isinstance(field, str) or field == '?':
+                raise ImproperlyConfigured('La paginación por cursor requiere ordenar por nombres de campo.')
+            desc = field.startswith('-')
+            name = field.lstrip('-')
+            keys.append(('pk' if name in ('pk', 'id') else name, desc))
+        if not keys or keys[-1][0] != 'pk':
+            keys.append(('pk', keys[-1][1] if keys else False))
+        return keys
+
+    @cached_property
+    def count(self):
+        return estimate_count(self.queryset) if self.estimate else self.queryset.count()
+
+    @property
+    def num_pages(self):
+        return max(1, -(-self.count // self.per_page))
+
+    @property
+    def page_range(self):
+        return range(1, self.num_pages + 1)
+
+    @staticmethod
+    def _after(field, desc, value):
+        """Filas posteriores a `value` en el sentido indicado; None si no hay ninguna."""
+        if value is None:
+            return Q(**{f'{field}__isnull': False}) if desc else None
+        after = Q(**{f'{field}__{"lt" if desc else "gt"}': value})
+        return after if desc else after | Q(**{f'{field}__isnull': True})
+
+    def _seek(self, keys, values):
+        condition, equal = Q(pk__in=[]), Q()
+        for (field, desc), value in zip(keys, values):
+            after = self._after(field, desc, value)
+            if after is not None:
+                condition |= equal & after
+            equal &= Q(**{f'{field}__isnull': True}) if value is None else Q(**{field: value})
+        return condition
+
+    def _ordered(self, keys):
+        # Orden de nulos explícito, el mismo que asume _after(), en cualquier motor
+        return self.queryset.order_by(*[
+            F(field).desc(nulls_first=True) if desc else F(field).asc(nulls_last=True) for field, desc in keys
+        ])
+
+    def cursor_values(self, obj):
+        """Valores de las claves de orden de `obj` (los campos relacionados deben venir en select_related)."""
+        values = []
+        for field, _ in self.keys:
+            value = obj
+            for attr in field.split('__'):
+                value = getattr(value, attr) if value is not None else None
+            values.append(value.pk if isinstance(value, Model) else value)
+        return values
+
+    def cursors(self, rows, offset):
+        """(siguiente, anterior) para una página que empieza en `offset`."""
+        if not rows:
+            return None, None
+        return (encode_cursor(self.cursor_values(rows[-1]), 'n', offset + len(rows)),
+                encode_cursor(self.cursor_values(rows[0]), 'p', max(offset - self.per_page, 0)))
+
+    def page(self, cursor=None):
+        values, direction, offset = decode_cursor(cursor) if cursor else (None, 'n', 0)
+        if values is not None and len(values) != len(self.keys):
+            raise InvalidCursor('El cursor no corresponde al orden del listado.')
+
+        if direction == 'n':
+            queryset = self._ordered(self.keys)
+            if values is not None:
+                queryset = queryset.filter(self._seek(self.keys, values))
+            rows = list(queryset[:self.per_page + 1])
+            has_next, has_previous = len(rows) > self.per_page, values is not None
+            rows = rows[:self.per_page]
+        else:
+            reversed_keys = [(field, not desc) for field, desc in self.keys]
+            queryset = self._ordered(reversed_keys).filter(self._seek(reversed_keys, values))
+            rows = list(queryset[:self.per_page + 1])
+            has_next, has_previous = True, len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            if not has_previous:
+                offset = 0
+
+        next_cursor, previous_cursor = self.cursors(rows, offset)
+        return KeysetPage(rows, self, offset, has_next, has_previous, next_cursor, previous_cursor)
+
+
+class KeysetPaginationMixin:
+    """
+    Para ListView: ?cursor= activa la paginación por cursor y ?count=estimate (o
+    estimate_count = True) el total estimado. Las páginas exponen next_cursor y
+    previous_cursor para que las tablas parciales los devuelvan al cliente.
+    """
+    cursor_param = 'cursor'
+    count_param = 'count'
+    estimate_count = False
+
+    def use_estimated_count(self):
+        return self.estimate_count or self.request.GET.get(self.count_param) == 'estimate'
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        if self.use_estimated_count():
+            return EstimatedCountPaginator(queryset, per_page, orphans=orphans,
+                                           allow_empty_first_page=allow_empty_first_page, **kwargs)
+        return super().get_paginator(queryset, per_page, orphans=orphans,
+                                     allow_empty_first_page=allow_empty_first_page, **kwargs)
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.cursor_param not in self.request.GET:
+            paginator, page, object_list, is_paginated = super().paginate_queryset(queryset, page_size)
+            # Las páginas por número también entregan cursores: el cliente puede
+            # continuar desde cualquiera de ellas sin OFFSET
+            rows = list(page.object_list)
+            cursors = KeysetPaginator(queryset, page_size).cursors(rows, page.start_index() - 1 if rows else 0)
+            page.next_cursor = cursors[0] if page.has_next() else None
+            page.previous_cursor = cursors[1] if page.has_previous() else None
+            return paginator, page, object_list, is_paginated
+        paginator = KeysetPaginator(queryset, page_size, estimate=self.use_estimated_count())
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_param) or None)
+        except InvalidPage as e:
+            raise Http404(str(e))
+        return paginator, page, page.object_list, page.has_other_pages()
@@ -0,0 +1,42 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .catalogs import invalidate_catalogs
+from .locations import invalidate_locations
+from .models import Catalog, CatalogItem, Location, SystemConfiguration
+from .stats import STATS_MODELS, invalidate_model_stats
+
+
+@receiver(post_save, sender=Catalog)
+@receiver(post_delete, sender=Catalog)
+@receiver(post_save, sender=CatalogItem)
+@receiver(post_delete, sender=CatalogItem)
+def invalidate_catalog_cache(sender, **kwargs):
+    """Tras confirmar la transacción, para que ningún proceso recargue datos sin confirmar."""
+    transaction.on_commit(invalidate_catalogs)
+
+
+@receiver(post_save, sender=SystemConfiguration)
+@receiver(post_delete, sender=SystemConfiguration)
+def invalidate_system_configuration(sender, **kwargs):
+    transaction.on_commit(SystemConfiguration.cache_version.bump)
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_tree(sender, **kwargs):
+    """Incluye la propagación de estado por update(): se confirma junto con el save() de la raíz."""
+    transaction.on_commit(invalidate_locations)
+
+
+def invalidate_list_stats(sender, **kwargs):
+    """Una escritura invalida los contadores cacheados de su modelo (ver core.stats)."""
+    if not kwargs.get('raw'):
+        invalidate_model_stats(sender)
+
+
+# Referencias perezosas 'app.Modelo': se resuelven al registrarse cada modelo
+for label in STATS_MODELS:
+    post_save.connect(invalidate_list_stats, sender=label, dispatch_uid=f'stats_save:{label}')
+    post_delete.connect(invalidate_list_stats, sender=label, dispatch_uid=f'stats_delete:{label}')
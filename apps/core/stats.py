@@ -0,0 +1,117 @@
+"""
+Estadísticas de los listados (totales por estado) en una sola consulta.
+
+count_stats() arma un aggregate(Count('pk', filter=Q(...))) con todos los grupos
+pedidos y, si se indica cache_key, guarda el resultado unos segundos en la caché
+compartida. La clave incluye la versión del modelo, que la señal post_save /
+post_delete de core.signals incrementa al confirmar cada escritura; así los
+contadores devueltos justo después de guardar ('new_stats') ya están al día.
+
+Solo se cachean los conteos de los modelos listados en STATS_MODELS, que son
+los únicos para los que core.signals conecta la invalidación.
+"""
+import weakref
+
+from django.core.cache import cache
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Count, Q
+
+from .versioning import SharedVersion
+
+STATS_TTL = 30
+STATUS_BUCKETS = {'total': None, 'active': Q(is_active=True), 'inactive': Q(is_active=False)}
+
+# Modelos con contadores cacheados (o de los que éstos dependen vía depends_on)
+STATS_MODELS = (
+    'auth.Group',
+    'biometric.BiometricDevice',
+    'budget.Activity', 'budget.BudgetLine', 'budget.Program', 'budget.Project', 'budget.Subprogram',
+    'contract.ContractType', 'contract.LaborRegime', 'contract.ManagementPeriod',
+    'core.Catalog', 'core.CatalogItem', 'core.Location', 'core.User',
+    'function_manual.Competency', 'function_manual.ManualCatalog',
+    'institution.AdministrativeUnit', 'institution.OrganizationalLevel',
+    'person.Person',
+    'personnel_actions.ActionType', 'personnel_actions.PersonnelAction',
+    'schedule.Schedule', 'schedule.ScheduleObservation',
+)
+_stats_labels = {label.lower() for label in STATS_MODELS}
+
+_versions = {}
+
+
+def _model_version(model):
+    label = model._meta.label_lower
+    if label not in _versions:
+        _versions[label] = SharedVersion(f'stats:{label}')
+    return _versions[label]
+
+
+def count_stats(queryset, buckets, cache_key=None, depends_on=(), ttl=STATS_TTL):
+    """
+    Cuenta todos los grupos de `buckets` ({nombre: Q o None para el total}) sobre
+    `queryset` en una sola consulta. `cache_key` identifica el conjunto dentro del
+    modelo (p. ej. 'status' o 'program:4'); sin ella el resultado no se cachea.
+    `depends_on` lista otros modelos cuyas escrituras también invalidan el conteo
+    (p. ej. User para las personas filtradas por user__is_active).
+    """
+    key = None
+    models = (queryset.model, *depends_on)
+    # Dentro de una transacción los conteos pueden incluir escrituras sin confirmar; un
+    # modelo fuera de STATS_MODELS no se invalidaría al escribir
+    if (cache_key and not connection.in_atomic_block
+            and all(model._meta.label_lower in _stats_labels for model in models)):
+        versions = '.'.join(str(_model_version(model).current()) for model in models)
+        key = f'stats:{queryset.model._meta.label_lower}:{versions}:{cache_key}'
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    stats = queryset.order_by().aggregate(**{
+        name: Count('pk', filter=condition) if condition is not None else Count('pk')
+        for name, condition in buckets.items()
+    })
+    if key:
+        cache.set(key, stats, ttl)
+    return stats
+
+
+def status_stats(queryset, cache_key='status'):
+    """Total, activos e inactivos (el trío de casi todos los listados)."""
+    return count_stats(queryset, STATUS_BUCKETS, cache_key=cache_key)
+
+
+def _bump(model):
+    try:
+        _model_version(model).bump()
+    except DatabaseError:
+        # Sin la tabla de la caché (p. ej. durante migrate) no hay conteos que invalidar
+        pass
+
+
+class _PendingBump:
+    """Callback on_commit que incrementa la versión de un modelo."""
+
+    def __init__(self, model):
+        self.model = model
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        _bump(self.model)
+
+
+def invalidate_model_stats(model):
+    """
+    Incrementa la versión del modelo al confirmar la transacción, una sola vez por
+    transacción aunque se guarden muchas filas. La conexión recuerda con una
+    referencia débil el callback pendiente de cada modelo: si un rollback lo
+    descarta de la cola, desaparece y la siguiente escritura programa otro.
+    """
+    conn = transaction.get_connection()
+    pending = getattr(conn, '_stats_pending', None)
+    if pending is None:
+        pending = conn._stats_pending = weakref.WeakValueDictionary()
+    callback = pending.get(model)
+    if callback is None or callback.done:
+        callback = pending[model] = _PendingBump(model)
+        transaction.on_commit(callback)
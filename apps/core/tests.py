@@ -1,3 +1,112 @@
-from django.test import TestCase
+from django.contrib.auth.models import Group
+from django.test import TestCase, TransactionTestCase
 
-# Create your tests here.
+from .catalogs import get_catalog_item, get_catalog_items
+from .models import Catalog, CatalogItem, Job
+from .pagination import InvalidCursor, KeysetPaginator
+from .stats import count_stats
+from .versioning import SharedVersion
+
+
+class KeysetPaginatorTests(TestCase):
+    """Recorre todas las páginas hacia adelante y hacia atrás con claves de orden nulas."""
+
+    MESSAGES = ['b', 'a', None, 'a', None, 'c', 'b', None]
+
+    def setUp(self):
+        self.jobs = [Job.objects.create(name='prueba', message=message) for message in self.MESSAGES]
+
+    def expected(self, desc):
+        # Orden de PostgreSQL: nulos al final en ASC y al inicio en DESC, pk como desempate
+        ordered = sorted(self.jobs, key=lambda job: (job.message is None, job.message or '', job.pk), reverse=desc)
+        return [job.pk for job in ordered]
+
+    def walk(self, ordering):
+        paginator = KeysetPaginator(Job.objects.order_by(ordering), per_page=3)
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        backwards = [pages[-1]]
+        while backwards[-1].has_previous():
+            backwards.append(paginator.page(backwards[-1].previous_cursor))
+        return pages, backwards[::-1]
+
+    def assert_walk(self, ordering, desc):
+        pages, backwards = self.walk(ordering)
+        forward_ids = [job.pk for page in pages for job in page]
+        self.assertEqual(forward_ids, self.expected(desc))
+        self.assertEqual([[job.pk for job in page] for page in backwards],
+                         [[job.pk for job in page] for page in pages])
+        self.assertEqual([page.number for page in pages], [1, 2, 3])
+        self.assertFalse(pages[0].has_previous())
+        self.assertFalse(pages[-1].has_next())
+
+    def test_ascending_with_nulls_last(self):
+        self.assert_walk('message', desc=False)
+
+    def test_descending_with_nulls_first(self):
+        self.assert_walk('-message', desc=True)
+
+    def test_rejects_cursor_from_another_ordering(self):
+        page = KeysetPaginator(Job.objects.order_by('message'), per_page=3).page()
+        with self.assertRaises(InvalidCursor):
+            KeysetPaginator(Job.objects.order_by('message', 'name'), per_page=3).page(page.next_cursor)
+        with self.assertRaises(InvalidCursor):
+            KeysetPaginator(Job.objects.order_by('message'), per_page=3).page('no-es-un-cursor')
+
+
+class SharedVersionTests(TestCase):
+
+    def test_bump_is_seen_by_other_instances(self):
+        writer = SharedVersion('tests:shared_version')
+        reader = SharedVersion('tests:shared_version', check_interval=0)
+        before = reader.current()
+        writer.bump()
+        self.assertEqual(writer.current(), before + 1)
+        self.assertEqual(reader.current(), before + 1)
+
+
+class CatalogCacheTests(TestCase):
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.catalog = Catalog.objects.create(name='Estados', code='TEST_STATUS')
+            self.item = CatalogItem.objects.create(catalog=self.catalog, name='Libre', code='LIBRE')
+            CatalogItem.objects.create(catalog=self.catalog, name='Retirado', code='RETIRADO', is_active=False)
+
+    def test_reloads_after_commit(self):
+        self.assertEqual([item.name for item in get_catalog_items('TEST_STATUS')], ['Libre'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item.name = 'Vacante'
+            self.item.save()
+        self.assertEqual(get_catalog_item('TEST_STATUS', 'LIBRE').name, 'Vacante')
+        self.assertEqual(len(get_catalog_items('TEST_STATUS', active_only=False)), 2)
+
+    def test_results_are_copies(self):
+        get_catalog_items('TEST_STATUS')[0].name = 'Modificado'
+        get_catalog_item('TEST_STATUS', 'LIBRE').name = 'Modificado'
+        self.assertEqual(get_catalog_items('TEST_STATUS')[0].name, 'Libre')
+
+
+class StatsInvalidationTests(TestCase):
+
+    def test_one_bump_per_transaction(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            for index in range(5):
+                Group.objects.create(name=f'Grupo {index}')
+        self.assertEqual(len(callbacks), 1)
+
+
+class StatsCacheTests(TransactionTestCase):
+    """count_stats solo cachea fuera de transacciones, por eso sin TestCase."""
+
+    def stats(self):
+        return count_stats(Group.objects.all(), {'total': None}, cache_key='tests')
+
+    def test_cached_until_a_write_commits(self):
+        self.assertEqual(self.stats(), {'total': 0})
+        # bulk_create no envía post_save: la caché sigue vigente
+        Group.objects.bulk_create([Group(name='Sin señal')])
+        self.assertEqual(self.stats(), {'total': 0})
+        Group.objects.create(name='Con señal')
+        self.assertEqual(self.stats(), {'total': 2})
@@ -38,4 +38,9 @@ urlpatterns = [
     path('settings/locations/update/<int:pk>/', views.LocationUpdateView.as_view(), name='location_update'),
     path('settings/locations/toggle/<int:pk>/', views.location_toggle_status, name='location_toggle'),
     path('api/locations/', views.LocationJsonView.as_view(), name='location_list_json'),
+
+    # --- Trabajos en segundo plano ---
+    path('api/jobs/', views.JobApiView.as_view(), name='api_jobs'),
+    path('api/jobs/<int:pk>/', views.JobDetailApiView.as_view(), name='api_job_detail'),
+    path('jobs/<int:pk>/download/', views.JobDownloadView.as_view(), name='job_download'),
 ]
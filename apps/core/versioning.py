@@ -0,0 +1,38 @@
+"""
+Contador de versión compartido entre procesos a través de la caché de Django.
+
+Permite mantener datos en memoria de cada worker (catálogos, configuración del
+sistema) y recargarlos cuando otro proceso los modifica: quien escribe llama a
+bump() y los lectores comparan la versión con la que cargaron sus datos.
+"""
+import time
+
+from django.core.cache import cache
+
+
+class SharedVersion:
+
+    def __init__(self, key, check_interval=5):
+        self.key = key
+        # Cada cuánto se consulta la caché compartida (segundos)
+        self.check_interval = check_interval
+        self._version = None
+        self._checked_at = 0.0
+
+    def current(self):
+        now = time.monotonic()
+        if self._version is None or now - self._checked_at >= self.check_interval:
+            version = cache.get(self.key)
+            if version is None:
+                cache.add(self.key, 1, timeout=None)
+                version = cache.get(self.key, 1)
+            self._version, self._checked_at = version, now
+        return self._version
+
+    def bump(self):
+        try:
+            cache.incr(self.key)
+        except ValueError:
+            cache.set(self.key, 2, timeout=None)
+        # El proceso actual ve el cambio de inmediato, sin esperar el intervalo
+        self._version = None
@@ -1,14 +1,21 @@
+import json
+import os
+
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
 from django.contrib.auth.views import LoginView
-from django.http import JsonResponse
+from django.db.models import Q
+from django.http import FileResponse, Http404, JsonResponse
 from django.urls import reverse_lazy
 from django.views.generic import CreateView
 from django.views.generic import TemplateView, ListView, UpdateView
 from .forms import CatalogForm, CatalogItemForm, LocationForm
+from .jobs import enqueue_response, get_job_spec, job_payload
+from .locations import active_children
 from .forms import UserProfileForm
-from .models import Catalog, CatalogItem, Location
+from .models import Catalog, CatalogItem, Job, Location
 from .models import User
+from .stats import count_stats, status_stats
 from django.shortcuts import get_object_or_404, render
 from django.views.decorators.http import require_POST
 from django.views.generic import View
@@ -57,11 +64,7 @@ class ProfileView(LoginRequiredMixin, UpdateView):
 # --- 4.1 LISTA DE CATÁLOGOS ---
 def get_catalog_stats_dict():
     """Retorna un diccionario con las estadísticas actuales de Catálogos."""
-    return {
-        'total': Catalog.objects.count(),
-        'active': Catalog.objects.filter(is_active=True).count(),
-        'inactive': Catalog.objects.filter(is_active=False).count(),
-    }
+    return status_stats(Catalog.objects.all())
 
 
 class CatalogListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
@@ -279,14 +282,12 @@ def item_toggle_status(request, pk):
 
 
 # --- 6. UBICACIONES ---
+LOCATION_LEVEL_BUCKETS = {'country': Q(level=1), 'province': Q(level=2), 'city': Q(level=3), 'parish': Q(level=4)}
+
+
 def get_location_stats_dict():
     """Retorna un diccionario con las estadísticas actuales de Catálogos."""
-    return {
-        'country': Location.objects.filter(level=1, is_active=True).count(),
-        'province': Location.objects.filter(level=2, is_active=True).count(),
-        'city': Location.objects.filter(level=3, is_active=True).count(),
-        'parish': Location.objects.filter(level=4, is_active=True).count(),
-    }
+    return count_stats(Location.objects.filter(is_active=True), LOCATION_LEVEL_BUCKETS, cache_key='levels')
 
 
 # --- 6.1 LISTA DE UBICACIONES ---
@@ -321,11 +322,11 @@ class LocationListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
         context['form'] = LocationForm()
 
         # Stats
-        base_stats = Location.objects.filter(is_active=True)
-        context['stats_country'] = base_stats.filter(level=1).count()
-        context['stats_province'] = base_stats.filter(level=2).count()
-        context['stats_city'] = base_stats.filter(level=3).count()
-        context['stats_parish'] = base_stats.filter(level=4).count()
+        stats = get_location_stats_dict()
+        context['stats_country'] = stats['country']
+        context['stats_province'] = stats['province']
+        context['stats_city'] = stats['city']
+        context['stats_parish'] = stats['parish']
 
         # --- LÓGICA DE NIVEL VISUAL (Para iluminar los stats) ---
         parent_id = self.request.GET.get('parent_id')
@@ -459,13 +460,63 @@ class LocationJsonView(View):
 
     def get(self, request):
         parent_id = request.GET.get('parent_id')
-        if parent_id:
-            locations = Location.objects.filter(parent_id=parent_id, is_active=True).order_by('name')
-        else:
-            locations = Location.objects.filter(level=1, is_active=True).order_by('name')
-
-        data = [{'id': loc.id, 'name': loc.name} for loc in locations]
+        try:
+            data = active_children(int(parent_id) if parent_id else None)
+        except ValueError:
+            data = []
         return JsonResponse({
             'success': True,
             'data': data
         })
+
+
+# --- TRABAJOS EN SEGUNDO PLANO ---
+def get_user_job(request, pk):
+    """Cada usuario solo consulta sus trabajos; el superusuario, todos."""
+    jobs = Job.objects.select_related('created_by')
+    if not request.user.is_superuser:
+        jobs = jobs.filter(created_by=request.user)
+    return get_object_or_404(jobs, pk=pk)
+
+
+class JobApiView(LoginRequiredMixin, View):
+    """GET: últimos trabajos del usuario. POST: encola un trabajo registrado (name + params JSON)."""
+
+    def get(self, request):
+        jobs = Job.objects.filter(created_by=request.user)[:20]
+        return JsonResponse({'success': True, 'jobs': [job_payload(job) for job in jobs]})
+
+    def post(self, request):
+        try:
+            if request.content_type == 'application/json':
+                data = json.loads(request.body or b'{}')
+            else:
+                data = {'name': request.POST.get('name'), 'params': json.loads(request.POST.get('params') or '{}')}
+        except ValueError:
+            return JsonResponse({'success': False, 'message': 'JSON inválido.'}, status=400)
+
+        spec = get_job_spec(data.get('name') or '')
+        if spec is None:
+            return JsonResponse({'success': False, 'message': 'Trabajo no registrado.'}, status=400)
+        if not spec.api:
+            return JsonResponse({'success': False, 'message': 'Este trabajo no puede encolarse desde la API.'},
+                                status=403)
+        if spec.permission and not request.user.has_perm(spec.permission):
+            return JsonResponse({'success': False, 'message': 'No tiene permisos para este trabajo.'}, status=403)
+        if not isinstance(data.get('params') or {}, dict):
+            return JsonResponse({'success': False, 'message': 'Parámetros inválidos.'}, status=400)
+        return enqueue_response(request, spec.name, data.get('params'))
+
+
+class JobDetailApiView(LoginRequiredMixin, View):
+    def get(self, request, pk):
+        return JsonResponse({'success': True, 'job': job_payload(get_user_job(request, pk))})
+
+
+class JobDownloadView(LoginRequiredMixin, View):
+    def get(self, request, pk):
+        job = get_user_job(request, pk)
+        if not job.result_file:
+            raise Http404('El trabajo no generó ningún archivo.')
+        return FileResponse(job.result_file.open('rb'), as_attachment=True,
+                            filename=os.path.basename(job.result_file.name))
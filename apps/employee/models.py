@@ -1,5 +1,6 @@
 from django.db import models
 from django.core.exceptions import ValidationError
+from core.catalogs import get_catalog_item
 from core.models import BaseModel, CatalogItem
 from person.models import Person
 from institution.models import AdministrativeUnit
@@ -55,7 +56,7 @@ class Employee(BaseModel):
         Actualiza el estado laboral del empleado buscando el codigo en el Catalogo
         """
         try:
-            status = CatalogItem.objects.get(code=status_code, catalog__code='EMPLOYMENT_STATUS')
+            status = get_catalog_item('EMPLOYMENT_STATUS', status_code)
             self.employment_status = status
             self.save()
         except CatalogItem.DoesNotExist:
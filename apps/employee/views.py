@@ -8,7 +8,8 @@ from django.template.loader import render_to_string
 from django.views.decorators.http import require_POST
 from django.views.generic import DetailView
 
-from core.models import CatalogItem, Location
+from core.catalogs import get_catalog_items
+from core.models import Location
 from person.models import Person
 from .forms import AcademicTitleForm, WorkExperienceForm, TrainingForm
 from .models import Employee, Curriculum, AcademicTitle, WorkExperience, Training, InstitutionalData
@@ -76,28 +77,25 @@ class EmployeeDetailWizardView(LoginRequiredMixin, PermissionRequiredMixin, Deta
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # Catálogos para los modales del Wizard
-        context['education_levels'] = CatalogItem.objects.filter(catalog__code='EDUCATION_LEVELS', is_active=True)
-        context['banks_list'] = CatalogItem.objects.filter(catalog__code='BANCO', is_active=True)
-        context['account_types_list'] = CatalogItem.objects.filter(catalog__code='ACCOUNT_TYPES', is_active=True)
-        context['gender_list'] = CatalogItem.objects.filter(catalog__code='GENDERS', is_active=True)
+        context['education_levels'] = get_catalog_items('EDUCATION_LEVELS')
+        context['banks_list'] = get_catalog_items('BANCO')
+        context['account_types_list'] = get_catalog_items('ACCOUNT_TYPES')
+        context['gender_list'] = get_catalog_items('GENDERS')
         context['country_list'] = Location.objects.filter(level=1, is_active=True)
-        context['marital_status_list'] = CatalogItem.objects.filter(catalog__code='MARITAL_STATUSES', is_active=True)
-        context['blood_type_list'] = CatalogItem.objects.filter(catalog__code='BLOOD_TYPES', is_active=True)
-        context['disability_types'] = CatalogItem.objects.filter(catalog__code='DISABILITY_TYPES', is_active=True)
-        context['relationships'] = CatalogItem.objects.filter(catalog__code='RELATIONSHIPS', is_active=True)
+        context['marital_status_list'] = get_catalog_items('MARITAL_STATUSES')
+        context['blood_type_list'] = get_catalog_items('BLOOD_TYPES')
+        context['disability_types'] = get_catalog_items('DISABILITY_TYPES')
+        context['relationships'] = get_catalog_items('RELATIONSHIPS')
         
         # Jerarquía Institucional
         employee = getattr(self.object, 'employee_profile', None)
         hierarchy_list = []
         if employee and employee.area:
-            unit = employee.area
-            # Recorremos hacia arriba hasta la raíz
-            while unit:
-                hierarchy_list.insert(0, {
-                    'name': unit.name,
-                    'level_name': unit.level.name
-                })
-                unit = unit.parent
+            # Desde la raíz hasta el área del empleado, en una sola consulta
+            hierarchy_list = [
+                {'name': name, 'level_name': level_name}
+                for name, level_name in employee.area.ancestors(include_self=True).values_list('name', 'level__name')
+            ]
         context['hierarchy_list'] = hierarchy_list
 
         return context
@@ -616,9 +614,5 @@ def get_areas_list_api(request):
 @login_required
 def get_employment_statuses_api(request):
     """Retorna los estados laborales activos para select2"""
-    from apps.core.models import CatalogItem
-    statuses = CatalogItem.objects.filter(
-        catalog__code='EMPLOYMENT_STATUS', 
-        is_active=True
-    ).values('id', 'name')
-    return JsonResponse({'success': True, 'data': list(statuses)})
+    statuses = [{'id': item.pk, 'name': item.name} for item in get_catalog_items('EMPLOYMENT_STATUS')]
+    return JsonResponse({'success': True, 'data': statuses})
@@ -0,0 +1,59 @@
+"""
+Payload JSON de catálogos del manual de funciones (wizard, matriz y escalas).
+La matriz ocupacional no viaja aquí: el wizard clasifica en el servidor
+(classification.py) y la estructura de valoración recibe sus opciones en el contexto.
+
+Se serializa una sola vez y se guarda en la caché junto con su ETag (hash del
+contenido). Las señales de ManualCatalog, ManualCatalogItem y Competency lo
+eliminan de la caché; la siguiente petición lo reconstruye.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Competency, ManualCatalogItem
+
+PAYLOAD_KEY = 'function_manual:catalogs_payload'
+
+CATALOG_KEYS = {
+    'instruction': 'INSTRUCTION_LEVELS',
+    'decisions': 'DECISION_LEVELS',
+    'impact': 'IMPACT_LEVELS',
+    'roles': 'JOB_ROLES',
+    'verbs': 'ACTION_VERBS',
+    'frequency': 'FREQUENCY',
+    'complexity': 'COMPLEXITY_LEVELS',
+}
+
+
+def build_catalogs_payload():
+    """Arma el diccionario de catálogos con una consulta por tabla."""
+    catalogs_dict = {key: [] for key in CATALOG_KEYS}
+    key_by_code = {code: key for key, code in CATALOG_KEYS.items()}
+    items = ManualCatalogItem.objects.filter(
+        catalog__code__in=key_by_code, is_active=True
+    ).values_list('catalog__code', 'id', 'name', 'target_role_id')
+    for catalog_code, item_id, name, target_role_id in items:
+        catalogs_dict[key_by_code[catalog_code]].append({'id': item_id, 'name': name, 'target_role': target_role_id})
+
+    # Todas las competencias activas para filtrar en Vue
+    catalogs_dict['competencies'] = list(
+        Competency.objects.filter(is_active=True).values('id', 'name', 'type', 'definition')
+    )
+    return catalogs_dict
+
+
+def get_catalogs_payload():
+    """Retorna (json, etag) desde la caché, construyéndolo si no existe."""
+    payload = cache.get(PAYLOAD_KEY)
+    if payload is None:
+        body = json.dumps(build_catalogs_payload(), cls=DjangoJSONEncoder)
+        payload = (body, hashlib.sha1(body.encode()).hexdigest())
+        cache.set(PAYLOAD_KEY, payload, timeout=None)
+    return payload
+
+
+def invalidate_catalogs_payload():
+    cache.delete(PAYLOAD_KEY)
@@ -0,0 +1,95 @@
+"""
+Clasificación ocupacional de perfiles contra la OccupationalMatrix.
+
+La matriz activa se indexa en memoria por sus atributos categóricos
+(rol, instrucción, decisión, impacto, complejidad); para cada clave se guarda la
+lista de umbrales de experiencia mínima ordenada, de modo que clasificar es un
+acceso al diccionario más una búsqueda binaria. El índice se reconstruye cuando
+cambia la versión compartida, que las señales de OccupationalMatrix incrementan.
+"""
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass
+
+from core.versioning import SharedVersion
+from .models import OccupationalMatrix
+
+classification_version = SharedVersion('function_manual:classification_version')
+
+
+@dataclass(frozen=True)
+class MatrixEntry:
+    id: int
+    occupational_group: str
+    grade: int
+    remuneration: object
+    minimum_experience_months: int
+
+    def as_dict(self):
+        return {'id': self.id, 'occupational_group': self.occupational_group, 'grade': self.grade,
+                'remuneration': self.remuneration, 'minimum_experience_months': self.minimum_experience_months}
+
+
+class ClassificationIndex:
+    """clave categórica -> (umbrales ordenados, entradas alineadas con los umbrales)."""
+
+    def __init__(self, rows):
+        grouped = {}
+        for key, entry in rows:
+            grouped.setdefault(key, []).append(entry)
+        self._index = {}
+        for key, entries in grouped.items():
+            # A igual umbral prevalece el grado más bajo
+            entries.sort(key=lambda e: (e.minimum_experience_months, -e.grade))
+            self._index[key] = ([e.minimum_experience_months for e in entries], entries)
+
+    def __len__(self):
+        return len(self._index)
+
+    def classify(self, role_id, instruction_id, experience_months, decision_id, impact_id, complexity_id):
+        """
+        Entrada de la matriz con la misma combinación categórica y el mayor umbral de
+        experiencia que no supera `experience_months`; None si ninguna aplica.
+        """
+        bucket = self._index.get((role_id, instruction_id, decision_id, impact_id, complexity_id))
+        if bucket is None:
+            return None
+        thresholds, entries = bucket
+        position = bisect_right(thresholds, experience_months or 0)
+        return entries[position - 1] if position else None
+
+    def classify_profile(self, profile):
+        return self.classify(
+            profile.job_role_id, profile.required_instruction_id, profile.required_experience_months,
+            profile.decision_making_id, profile.management_impact_id, profile.final_complexity_level_id,
+        )
+
+
+_lock = threading.Lock()
+_state = {'version': None, 'index': None}
+
+
+def _load():
+    rows = OccupationalMatrix.objects.filter(is_active=True).values_list(
+        'required_role_id', 'minimum_instruction_id', 'required_decision_id', 'required_impact_id',
+        'complexity_level_id', 'pk', 'occupational_group', 'grade', 'remuneration', 'minimum_experience_months',
+    )
+    return ClassificationIndex(
+        ((role, instruction, decision, impact, complexity),
+         MatrixEntry(pk, group, grade, remuneration, experience))
+        for role, instruction, decision, impact, complexity, pk, group, grade, remuneration, experience in rows
+    )
+
+
+def get_classification_index():
+    version = classification_version.current()
+    if version != _state['version']:
+        with _lock:
+            if version != _state['version']:
+                _state['index'] = _load()
+                _state['version'] = version
+    return _state['index']
+
+
+def invalidate_classification_index():
+    classification_version.bump()
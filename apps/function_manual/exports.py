@@ -0,0 +1,132 @@
+"""
+Reportes Excel del manual de funciones (formatos MDT) sobre core.exports.
+
+Cada función escribe el encabezado con sus celdas combinadas y luego las filas
+leídas del queryset con .iterator(), sin cargar todos los perfiles en memoria.
+"""
+from core.exports import XlsxStreamWriter
+from .models import JobProfile
+
+VALUATION_WIDTHS = [5, 40, 25, 25, 15, 20, 20, 20, 25, 35]  # A a J
+ACTIVITY_WIDTHS = [5, 25, 45, 12, 12, 12, 5, 5, 5, 10, 15]  # A a K
+
+
+def legalized_profiles():
+    """Perfiles legalizados (con las 3 firmas) en el orden del reporte de valoración."""
+    return JobProfile.objects.select_related(
+        'job_role', 'required_instruction', 'decision_making',
+        'management_impact', 'final_complexity_level',
+        'occupational_classification', 'referential_employee__person'
+    ).filter(
+        is_active=True,
+        prepared_by__isnull=False,
+        reviewed_by__isnull=False,
+        approved_by__isnull=False
+    ).order_by('occupational_classification__grade', 'specific_job_title')
+
+
+def valuation_rows(profiles):
+    """Filas del reporte de valoración (Nro. + 9 columnas) para un queryset con select_related."""
+    for idx, p in enumerate(profiles, start=1):
+        yield [
+            idx,
+            p.specific_job_title,
+            p.job_role.name if p.job_role else "",
+            p.required_instruction.name if p.required_instruction else "",
+            f"{p.required_experience_months} Meses",
+            p.decision_making.name if p.decision_making else "",
+            p.management_impact.name if p.management_impact else "",
+            p.final_complexity_level.name if p.final_complexity_level else "",
+            p.occupational_classification.occupational_group if p.occupational_classification else "",
+            str(p.referential_employee.person) if p.referential_employee else "VACANTE",
+        ]
+
+
+def write_valuation_report(rows):
+    """Formato de Valoración de Puestos (legalizados). `rows` proviene de valuation_rows()."""
+    writer = XlsxStreamWriter("Valoración de Puestos", widths=VALUATION_WIDTHS)
+    title_styles = [None, None, None, 'title'] + [None] * 6
+
+    # Filas 1 y 2: títulos
+    writer.append([None, None, None, "FORMATO DE VALORACION DE PUESTOS"] + [None] * 6, title_styles)
+    writer.merge('D1:J1')
+    writer.append([None, None, None, "PUESTOS INSTITUCIONALES LEGALIZADOS"] + [None] * 6, title_styles)
+    writer.merge('D2:J2')
+
+    # Filas 3 y 4: encabezados agrupados
+    writer.append(["NRO.", "DENOMINACION DE PUESTO", "RESPONSABILIDAD", "COMPETENCIAS", None,
+                   "NIVEL DE COMPLEJIDAD DEL PUESTO", None, None, "CLASIFICACION", "REFERENCIAL"], 'header')
+    writer.append([None, None, "ROL DEL PUESTO", "INSTRUCCIÓN FORMAL", "EXPERIENCIA", "TOMA DE DECISIONES",
+                   "IMPACTO INSTITUCIONAL A RESULTADOS", "COMPLEJIDAD TECNICA (ESPECIALIZACION DE TAREAS)",
+                   "GRUPO OCUPACIONAL", None], 'subheader')
+    for cell_range in ('A3:A4', 'B3:B4', 'D3:E3', 'F3:H3', 'J3:J4'):
+        writer.merge(cell_range)
+
+    # Título y referencial pueden ser largos: alineados a la izquierda
+    writer.append_rows(rows, ['cell', 'cell_left'] + ['cell'] * 7 + ['cell_left'])
+    return writer
+
+
+def activity_values(name):
+    """Valor normativo de Aporte a la Gestión y Complejidad."""
+    n = name.upper()
+    if "ALTO" in n: return 3
+    if "MEDIO" in n: return 2
+    if "BAJO" in n: return 1
+    return 0
+
+
+def frequency_value(name):
+    n = name.upper()
+    if "DIARIO" in n: return 5
+    if "SEMANAL" in n: return 4
+    if "MENSUAL" in n: return 3
+    if "TRIMESTRAL" in n or "SEMESTRAL" in n: return 2
+    if "ANUAL" in n: return 1
+    return 0
+
+
+def activity_rows(activities):
+    """Filas del levantamiento de actividades con los valores AG, F, C y el total AG*(F+C)."""
+    for idx, act in enumerate(activities, start=1):
+        ag_name = act.contribution.name if act.contribution else "Bajo"
+        f_name = act.frequency.name if act.frequency else "Anual"
+        c_name = act.complexity.name if act.complexity else "Bajo"
+        v_ag, v_f, v_c = activity_values(ag_name), frequency_value(f_name), activity_values(c_name)
+        yield [
+            idx,
+            act.deliverable.name if act.deliverable else "N/A",
+            f"{act.action_verb.name} {act.description}".strip(),
+            ag_name, f_name, c_name,
+            v_ag, v_f, v_c, v_ag * (v_f + v_c),
+            "SELECCIONADA",
+        ]
+
+
+def write_activity_report(profile, rows):
+    """Formato Levantamiento de Actividades de un perfil. `rows` proviene de activity_rows()."""
+    writer = XlsxStreamWriter("Levantamiento de Actividades", widths=ACTIVITY_WIDTHS)
+
+    # Filas 1 y 2: institución y título
+    writer.append(["Municipio de Loja", None, None, "FORMATO LEVANTAMIENTO DE ACTIVIDADES"] + [None] * 7,
+                  ['title', None, None, 'title'] + [None] * 7)
+    writer.append([None] * 11)
+    writer.merge('A1:C2')
+    writer.merge('D1:K2')
+
+    # Fila 3: denominación del puesto
+    writer.append(["DENOMINACIÓN DE PUESTO:", None, None, f"{profile.specific_job_title} ({profile.position_code})"]
+                  + [None] * 7, ['label', None, None, 'text'] + [None] * 7)
+    writer.merge('A3:C3')
+    writer.merge('D3:K3')
+
+    # Filas 4 y 5: cabeceras (cada columna combina las dos filas)
+    writer.append(["NRO.", "ENTREGABLES\n(PRODUCTOS/SERVICIOS)", "ACTIVIDADES", "APORTE A LA GESTION\n(AG)",
+                   "FRECUENCIA (F)", "COMPLEJIDAD (C)", "AG", "F", "C", "TOTAL\nAG*(F+C)",
+                   "ACTIVIDADES\nSELECCIONADAS PARA EL\nPERFIL"], 'subheader')
+    writer.append([None] * 11, 'subheader')
+    for column in 'ABCDEFGHIJK':
+        writer.merge(f'{column}4:{column}5')
+
+    writer.append_rows(rows, ['cell', 'cell_left', 'cell_left'] + ['cell'] * 8)
+    return writer
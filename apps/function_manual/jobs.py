@@ -0,0 +1,31 @@
+"""Trabajos en segundo plano del manual de funciones (ver core.jobs)."""
+import io
+import tempfile
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.jobs import register_job, save_job_file
+from .exports import legalized_profiles, valuation_rows, write_valuation_report
+
+
+@register_job('function_manual.valuation_report', permission='function_manual.view_jobprofile')
+def valuation_report(job):
+    job.set_progress(5, 'Generando reporte de valoración')
+    writer = write_valuation_report(valuation_rows(legalized_profiles().iterator(chunk_size=500)))
+    with tempfile.TemporaryFile(suffix='.xlsx') as handle:
+        writer.save(handle)
+        handle.seek(0)
+        save_job_file(job, f"Reporte_Valoracion_Puestos_{timezone.now().strftime('%Y%m%d_%H%M')}.xlsx", handle)
+    return {'rows': writer.rows_written - 4}
+
+
+@register_job('function_manual.reseed_catalogs', permission='function_manual.change_occupationalmatrix')
+def reseed_catalogs(job, reclassify=False):
+    """Recarga la matriz ocupacional y reconstruye el árbol de valoración (y opcionalmente reclasifica)."""
+    commands = ['init_occupational_matrix', 'seed_valuation_rules'] + (['reclassify_profiles'] if reclassify else [])
+    output = io.StringIO()
+    for step, command in enumerate(commands):
+        job.set_progress(step * 100 // len(commands), f'Ejecutando {command}')
+        call_command(command, stdout=output, no_color=True)
+    return {'output': output.getvalue()}
@@ -0,0 +1,64 @@
+# apps/function_manual/management/commands/benchmark_excel_export.py
+import tempfile
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Border, Font, Side
+
+from function_manual.exports import write_valuation_report
+
+
+class Command(BaseCommand):
+    help = ('Mide tiempo y memoria pico del reporte de valoración: libro en memoria con estilos por celda '
+            'frente al escritor streaming (write-only) de core.exports')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', nargs='+', type=int, default=[10000], help='Filas a exportar en cada medición')
+        parser.add_argument('--skip-legacy', action='store_true', help='No medir el libro en memoria')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('--- Benchmark de exportación Excel ---'))
+        for size in options['rows']:
+            if not options['skip_legacy']:
+                self._measure('En memoria', size, self._legacy)
+            self._measure('Streaming', size, self._streaming)
+
+    @staticmethod
+    def _rows(size):
+        for idx in range(1, size + 1):
+            yield [idx, f'Analista de Talento Humano {idx}', 'Ejecución de Procesos', 'Tercer Nivel (Grado)',
+                   f'{idx % 60} Meses', 'Nivel 2: Decisiones de baja incidencia', 'Nivel 2: Impacto por unidad',
+                   'Nivel Medio', f'SP{idx % 7 + 1}', f'Servidor {idx:06d}']
+
+    def _legacy(self, size, handle):
+        """Réplica del enfoque anterior: Workbook completo y Font/Border/Alignment por celda."""
+        wb = Workbook()
+        ws = wb.active
+        for row_num, row in enumerate(self._rows(size), start=5):
+            for col_idx, value in enumerate(row, start=1):
+                cell = ws.cell(row=row_num, column=col_idx, value=value)
+                cell.font = Font(name='Arial', size=9)
+                cell.border = Border(left=Side(style='thin'), right=Side(style='thin'),
+                                     top=Side(style='thin'), bottom=Side(style='thin'))
+                cell.alignment = Alignment(horizontal='left' if col_idx in (2, 10) else 'center',
+                                           vertical='center', wrap_text=True)
+        wb.save(handle)
+
+    def _streaming(self, size, handle):
+        write_valuation_report(self._rows(size)).save(handle)
+
+    def _measure(self, label, size, export):
+        with tempfile.TemporaryFile(suffix='.xlsx') as handle:
+            tracemalloc.start()
+            began = time.perf_counter()
+            export(size, handle)
+            elapsed = time.perf_counter() - began
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            megabytes = handle.tell() / (1024 * 1024)
+        self.stdout.write(
+            f"{label:<11} {size:>8} filas: {elapsed:8.2f}s  {size / elapsed:9.0f} filas/s  "
+            f"memoria pico {peak / (1024 * 1024):8.1f} MB  archivo {megabytes:.1f} MB"
+        )
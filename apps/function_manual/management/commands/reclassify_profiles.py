@@ -0,0 +1,54 @@
+# apps/function_manual/management/commands/reclassify_profiles.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from function_manual.classification import get_classification_index
+from function_manual.models import JobProfile
+
+
+class Command(BaseCommand):
+    help = ('Recalcula la clasificación ocupacional de todos los perfiles de puesto contra la '
+            'Matriz Ocupacional e informa los perfiles que cambian')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Solo informar los cambios, sin guardarlos')
+        parser.add_argument('--clear-unmatched', action='store_true',
+                            help='Quitar la clasificación a los perfiles sin coincidencia en la matriz')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        index = get_classification_index()
+        profiles = JobProfile.objects.only(
+            'position_code', 'specific_job_title', 'occupational_classification_id', 'job_role_id',
+            'required_instruction_id', 'required_experience_months', 'decision_making_id',
+            'management_impact_id', 'final_complexity_level_id',
+        ).order_by('pk')
+
+        changed, unmatched, total = [], 0, 0
+        for profile in profiles.iterator(chunk_size=options['batch_size']):
+            total += 1
+            entry = index.classify_profile(profile)
+            if entry is None:
+                unmatched += 1
+                if not options['clear_unmatched']:
+                    continue
+            new_id = entry.id if entry else None
+            if new_id == profile.occupational_classification_id:
+                continue
+            label = f'{entry.occupational_group} - G{entry.grade}' if entry else 'sin clasificación'
+            self.stdout.write(
+                f'{profile.position_code or profile.pk}  {profile.specific_job_title}: '
+                f'{profile.occupational_classification_id or "-"} -> {new_id or "-"} ({label})'
+            )
+            profile.occupational_classification_id = new_id
+            changed.append(profile)
+
+        if changed and not options['dry_run']:
+            with transaction.atomic():
+                JobProfile.objects.bulk_update(changed, ['occupational_classification'],
+                                               batch_size=options['batch_size'])
+
+        verb = 'cambiarían' if options['dry_run'] else 'actualizados'
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} perfiles revisados, {len(changed)} {verb}, {unmatched} sin coincidencia en la matriz.'
+        ))
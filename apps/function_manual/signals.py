@@ -0,0 +1,34 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .catalogs import invalidate_catalogs_payload
+from .classification import invalidate_classification_index
+from .models import Competency, ManualCatalog, ManualCatalogItem, OccupationalMatrix, ValuationNode
+from .valuation import invalidate_valuation_tree
+
+
+@receiver(post_save, sender=ManualCatalog)
+@receiver(post_delete, sender=ManualCatalog)
+@receiver(post_save, sender=ManualCatalogItem)
+@receiver(post_delete, sender=ManualCatalogItem)
+@receiver(post_save, sender=Competency)
+@receiver(post_delete, sender=Competency)
+def invalidate_catalogs_on_change(sender, **kwargs):
+    transaction.on_commit(invalidate_catalogs_payload)
+
+
+@receiver(post_save, sender=ValuationNode)
+@receiver(post_delete, sender=ValuationNode)
+@receiver(post_save, sender=ManualCatalogItem)
+@receiver(post_delete, sender=ManualCatalogItem)
+@receiver(post_save, sender=OccupationalMatrix)
+@receiver(post_delete, sender=OccupationalMatrix)
+def invalidate_valuation_tree_on_change(sender, **kwargs):
+    transaction.on_commit(invalidate_valuation_tree)
+
+
+@receiver(post_save, sender=OccupationalMatrix)
+@receiver(post_delete, sender=OccupationalMatrix)
+def invalidate_classification_on_change(sender, **kwargs):
+    transaction.on_commit(invalidate_classification_index)
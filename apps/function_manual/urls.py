@@ -23,6 +23,7 @@ urlpatterns = [
 
     path('api/search-employee-simple/', views.api_search_employee_simple, name='api_search_employee_simple'),
     path('api/roles/', views.api_get_available_roles, name='api_get_available_roles'),
+    path('api/catalogs/', views.api_catalogs, name='api_catalogs'),
 
     # API para asignar grupo ocupacional
     path('api/profile/<int:profile_id>/valuation-chain/', views.api_get_profile_valuation_chain,
@@ -59,6 +60,8 @@ urlpatterns = [
     path('api/units/<int:parent_id>/children/', views.ApiUnitChildrenView.as_view(), name='api_units_children'),
     path('api/units/<int:unit_id>/next-code/', views.ApiNextPositionCodeView.as_view(), name='api_next_code'),
     path('api/valuation-nodes/', views.ApiValuationNodesView.as_view(), name='api_valuation_nodes'),
+    path('api/valuation-tree/', views.ApiValuationTreeView.as_view(), name='api_valuation_tree'),
+    path('api/classify/', views.ApiClassifyView.as_view(), name='api_classify'),
     path('api/valuation-nodes/detail/<int:pk>/', views.ValuationNodeDetailApi.as_view(), name='api_node_detail'),
     path('api/valuation-nodes/save/', views.ValuationNodeSaveApi.as_view(), name='api_node_save'),
     path('api/profile/save/', views.JobProfileSaveApi.as_view(), name='api_profile_save'),
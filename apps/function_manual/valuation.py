@@ -0,0 +1,182 @@
+"""
+Árbol de valoración (Rol -> Instrucción -> ... -> Resultado) precargado en memoria.
+
+El árbol completo se lee con una consulta y se guarda como estructura inmutable
+por proceso; se reconstruye cuando cambia la versión compartida, que las señales
+de ValuationNode, ManualCatalogItem y OccupationalMatrix incrementan. Con él se
+sirven los niveles del wizard, las migas de pan y la resolución de la cadena
+completa de un nodo sin más consultas.
+"""
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from core.versioning import SharedVersion
+from .models import ValuationNode
+
+valuation_version = SharedVersion('function_manual:valuation_version')
+
+# Orden de los niveles de la norma
+CHAIN_TYPES = ('ROLE', 'INSTRUCTION', 'EXPERIENCE', 'DECISION', 'IMPACT', 'COMPLEXITY', 'RESULT')
+
+
+@dataclass(frozen=True)
+class TreeNode:
+    id: int
+    parent_id: int
+    node_type: str
+    is_active: bool
+    catalog_item_id: int
+    catalog_item_name: str
+    name_extra: str
+    classification_id: int
+    classification: tuple  # (grupo, remuneración, grado) o None
+    children: tuple = ()
+
+    @property
+    def name(self):
+        if self.catalog_item_name:
+            return self.catalog_item_name
+        if self.node_type == 'RESULT' and self.classification:
+            return f"{self.classification[0]} - G{self.classification[2]}"
+        return self.name_extra if self.name_extra else "Sin Definición"
+
+    def as_dict(self):
+        group, rmu, grade = self.classification or (None, None, None)
+        return {
+            'id': self.id, 'name': self.name, 'type': self.node_type,
+            'catalog_item_id': self.catalog_item_id,
+            'name_extra': self.name_extra,
+            'classification_id': self.classification_id,
+            'classification': {'group': group, 'rmu': rmu, 'grade': grade}
+            if self.node_type == 'RESULT' and self.classification else None,
+        }
+
+
+class ValuationTree:
+    """Vista de solo lectura del árbol; los hijos se listan en orden de id."""
+
+    def __init__(self, nodes, roots):
+        self.nodes = MappingProxyType(nodes)
+        self.roots = tuple(roots)
+        self._results = {}
+        for node in nodes.values():
+            if node.node_type == 'RESULT' and node.classification_id:
+                self._results.setdefault(node.classification_id, node)
+
+    def get(self, node_id):
+        try:
+            return self.nodes.get(int(node_id))
+        except (TypeError, ValueError):
+            return None
+
+    def children(self, parent_id=None, active_only=True):
+        if parent_id is None:
+            child_ids = self.roots
+        else:
+            parent = self.get(parent_id)
+            child_ids = parent.children if parent else ()
+        children = [self.nodes[pk] for pk in child_ids]
+        return [node for node in children if node.is_active] if active_only else children
+
+    def path(self, node_id):
+        """Nodos desde la raíz hasta `node_id` inclusive."""
+        path = []
+        node = self.get(node_id)
+        while node is not None and len(path) <= len(CHAIN_TYPES):
+            path.append(node)
+            node = self.nodes.get(node.parent_id)
+        return path[::-1]
+
+    def chain(self, node_id):
+        """Cadena {tipo: nodo} del nodo elegido y todos sus ancestros."""
+        return {node.node_type: node for node in self.path(node_id)}
+
+    def find_result(self, classification_id):
+        """Nodo RESULT vinculado a una clasificación de la matriz."""
+        return self._results.get(classification_id)
+
+    def match_path(self, steps):
+        """
+        Recorre el árbol desde las raíces eligiendo en cada nivel el primer hijo
+        activo del tipo indicado cuyo catalog_item coincide (None acepta cualquiera).
+        `steps` es una lista de (tipo, catalog_item_id); se detiene en el primer nivel sin coincidencia.
+        """
+        path, parent_id = [], None
+        for node_type, catalog_item_id in steps:
+            match = next((node for node in self.children(parent_id)
+                          if node.node_type == node_type
+                          and (catalog_item_id is None or node.catalog_item_id == catalog_item_id)), None)
+            if match is None:
+                break
+            path.append(match.id)
+            parent_id = match.id
+        return path
+
+    def subtree(self, node_id=None, active_only=True):
+        """Árbol anidado (o el subárbol de `node_id`) listo para serializar."""
+        def build(node):
+            data = node.as_dict()
+            data['children'] = [build(child) for child in self.children(node.id, active_only=active_only)]
+            return data
+
+        if node_id is None:
+            return [build(node) for node in self.children(None, active_only=active_only)]
+        node = self.get(node_id)
+        return [build(node)] if node else []
+
+
+_lock = threading.Lock()
+_state = {'version': None, 'tree': None}
+
+
+def _load():
+    rows = ValuationNode.objects.order_by('pk').values_list(
+        'pk', 'parent_id', 'node_type', 'is_active', 'catalog_item_id', 'catalog_item__name', 'name_extra',
+        'occupational_classification_id', 'occupational_classification__occupational_group',
+        'occupational_classification__remuneration', 'occupational_classification__grade',
+    )
+    fields, children = {}, {}
+    for (pk, parent_id, node_type, is_active, item_id, item_name, name_extra,
+         classification_id, group, rmu, grade) in rows:
+        fields[pk] = dict(
+            id=pk, parent_id=parent_id, node_type=node_type, is_active=is_active,
+            catalog_item_id=item_id, catalog_item_name=item_name, name_extra=name_extra,
+            classification_id=classification_id,
+            classification=(group, rmu, grade) if classification_id else None,
+        )
+        children.setdefault(parent_id, []).append(pk)
+    nodes = {pk: TreeNode(children=tuple(children.get(pk, ())), **values) for pk, values in fields.items()}
+    return ValuationTree(nodes, children.get(None, ()))
+
+
+def get_valuation_tree(require=None):
+    """
+    Árbol vigente. `require` es el id de un nodo que la petición espera encontrar:
+    si falta pero existe en la base (creado en otro proceso antes del siguiente
+    chequeo de versión) el árbol se recarga en lugar de esperar el intervalo.
+    """
+    version = valuation_version.current()
+    if version != _state['version']:
+        with _lock:
+            if version != _state['version']:
+                _state['tree'] = _load()
+                _state['version'] = version
+    tree = _state['tree']
+    if require is not None and tree.get(require) is None and _node_exists(require):
+        with _lock:
+            if _state['tree'].get(require) is None:
+                _state['tree'] = _load()
+        tree = _state['tree']
+    return tree
+
+
+def _node_exists(node_id):
+    try:
+        return ValuationNode.objects.filter(pk=int(node_id)).exists()
+    except (TypeError, ValueError):
+        return False
+
+
+def invalidate_valuation_tree():
+    valuation_version.bump()
@@ -1,27 +1,41 @@
 # apps/function_manual/views.py
-import openpyxl
 from django.db import models, transaction
-from django.urls import reverse_lazy
+from django.db.models import Q
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_protect
 from django.views.generic import ListView, CreateView, UpdateView, View
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
-from django.http import JsonResponse, HttpResponse
+from django.http import Http404, JsonResponse, HttpResponse, HttpResponseNotModified
 from django.shortcuts import get_object_or_404, render
+from django.template.loader import render_to_string
 from django.core.serializers.json import DjangoJSONEncoder
 from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import permission_required, login_required
+import io
 import json
+import re
+from functools import partial
 
-from openpyxl.styles import Border, PatternFill, Font, Alignment, Side
+from xhtml2pdf import pisa
 
 from institution.models import Deliverable as InstDeliverable
 from employee.models import Employee
 from institution.models import AdministrativeUnit
 from .models import Competency, JobProfile, ManualCatalog, OccupationalMatrix, ManualCatalogItem, ValuationNode, \
     JobActivity, ProfileCompetency
+from .catalogs import get_catalogs_payload
+from .exports import activity_rows, legalized_profiles, valuation_rows, write_activity_report, \
+    write_valuation_report
+from .classification import get_classification_index
+from .valuation import get_valuation_tree
 from .forms import ManualCatalogForm, ManualCatalogItemForm
 from core.models import BaseModel, Authorities
+from core.documents import cached_document_response, document_fingerprint, document_last_modified
+from core.exports import xlsx_response
+from core.jobs import enqueue_response
+from core.stats import count_stats, status_stats
 
 
 # ============================================================================
@@ -33,48 +47,34 @@ class JobProfileMixin:
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-
-        def get_items(catalog_code):
-            items = ManualCatalogItem.objects.filter(
-                catalog__code=catalog_code, is_active=True
-            ).select_related('target_role')
-            return [
-                {
-                    'id': item.id,
-                    'name': item.name,
-                    'target_role': item.target_role_id if item.target_role else None
-                }
-                for item in items
-            ]
-
-        matrix_data = list(OccupationalMatrix.objects.all().values(
-            'id', 'occupational_group', 'grade', 'remuneration',
-            'required_role_id', 'minimum_instruction_id',
-            'minimum_experience_months', 'required_decision_id',
-            'required_impact_id', 'complexity_level_id'
-        ))
-
-        catalogs_dict = {
-            "instruction": get_items('INSTRUCTION_LEVELS'),
-            "decisions": get_items('DECISION_LEVELS'),
-            "impact": get_items('IMPACT_LEVELS'),
-            "roles": get_items('JOB_ROLES'),
-            "verbs": get_items('ACTION_VERBS'),
-            "frequency": get_items('FREQUENCY'),
-            "complexity": get_items('COMPLEXITY_LEVELS'),
-            "matrix": matrix_data,
-            # Agregamos todas las competencias para filtrar en Vue
-            "competencies": list(Competency.objects.filter(is_active=True).values('id', 'name', 'type', 'definition'))
-        }
-        context['catalogs_json'] = json.dumps(catalogs_dict, cls=DjangoJSONEncoder)
+        # El navegador descarga los catálogos desde una URL versionada por ETag,
+        # así los reutiliza de su caché entre las páginas del wizard
+        _, etag = get_catalogs_payload()
+        context['catalogs_url'] = f"{reverse('function_manual:api_catalogs')}?v={etag}"
         return context
 
 
+@login_required
+def api_catalogs(request):
+    """Payload JSON de catálogos del manual, con ETag y caché de navegador."""
+    body, etag = get_catalogs_payload()
+    quoted_etag = f'"{etag}"'
+    if quoted_etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = quoted_etag
+    # Con ?v=<etag> la URL cambia cuando cambia el contenido: se puede cachear sin revalidar
+    if request.GET.get('v') == etag:
+        response['Cache-Control'] = 'private, max-age=86400'
+    else:
+        response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
 def get_manual_catalog_stats():
     """Retorna estadísticas de catálogos"""
-    total = ManualCatalog.objects.count()
-    active = ManualCatalog.objects.filter(is_active=True).count()
-    return {'total': total, 'active': active, 'inactive': total - active}
+    return status_stats(ManualCatalog.objects.all())
 
 
 # ============================================================================
@@ -118,11 +118,13 @@ class JobProfileListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         if not self.request.GET.get('partial'):
-            qs = self.get_queryset()
-            context['stats_total'] = qs.count()
-            context['stats_classified'] = qs.filter(occupational_classification__isnull=False).count()
-            context['stats_pending'] = qs.filter(occupational_classification__isnull=True).count()
-            context['stats_active'] = qs.filter(is_active=True).count()
+            # Sobre el queryset filtrado por la búsqueda: una consulta, sin caché
+            context.update(count_stats(self.get_queryset(), {
+                'stats_total': None,
+                'stats_classified': Q(occupational_classification__isnull=False),
+                'stats_pending': Q(occupational_classification__isnull=True),
+                'stats_active': Q(is_active=True),
+            }))
 
             # Contexto para el modal de asignación de grupo
             # Serializamos a JSON para manejo dinámico en Vue
@@ -154,94 +156,28 @@ class JobProfileUpdateView(LoginRequiredMixin, PermissionRequiredMixin, JobProfi
         profile = self.object
 
         # 1. Reconstruir ruta organizacional
-        units_path = []
-        current_unit = profile.administrative_unit
-        while current_unit:
-            units_path.insert(0, current_unit.id)
-            current_unit = current_unit.parent
+        units_path = profile.administrative_unit.ancestor_ids(include_self=True) if profile.administrative_unit else []
 
         # 2. Reconstruir ruta de valoración (Valuation Nodes)
-        # Intentar reconstruir desde los campos individuales del perfil
         nodes_path = []
-
-        # Si el perfil tiene clasificación ocupacional, usar esa ruta completa
-        if profile.occupational_classification:
-            leaf_node = ValuationNode.objects.filter(
-                occupational_classification=profile.occupational_classification,
-                node_type='RESULT'
-            ).first()
-
-            if leaf_node:
-                curr = leaf_node
-                while curr:
-                    nodes_path.insert(0, curr.id)
-                    curr = curr.parent
-        else:
-            # Si no tiene clasificación, reconstruir desde los campos individuales
-            # Buscar cada nodo basándose en los catalog_items guardados
-
-            # 1. ROL
-            if profile.job_role:
-                role_node = ValuationNode.objects.filter(
-                    node_type='ROLE',
-                    catalog_item=profile.job_role,
-                    is_active=True
-                ).first()
-                if role_node:
-                    nodes_path.append(role_node.id)
-
-                    # 2. INSTRUCCIÓN
-                    if profile.required_instruction:
-                        instruction_node = ValuationNode.objects.filter(
-                            node_type='INSTRUCTION',
-                            catalog_item=profile.required_instruction,
-                            parent=role_node,
-                            is_active=True
-                        ).first()
-                        if instruction_node:
-                            nodes_path.append(instruction_node.id)
-
-                            # 3. EXPERIENCIA (buscar el primer nodo hijo)
-                            experience_node = ValuationNode.objects.filter(
-                                node_type='EXPERIENCE',
-                                parent=instruction_node,
-                                is_active=True
-                            ).first()
-                            if experience_node:
-                                nodes_path.append(experience_node.id)
-
-                                # 4. DECISIÓN
-                                if profile.decision_making:
-                                    decision_node = ValuationNode.objects.filter(
-                                        node_type='DECISION',
-                                        catalog_item=profile.decision_making,
-                                        parent=experience_node,
-                                        is_active=True
-                                    ).first()
-                                    if decision_node:
-                                        nodes_path.append(decision_node.id)
-
-                                        # 5. IMPACTO
-                                        if profile.management_impact:
-                                            impact_node = ValuationNode.objects.filter(
-                                                node_type='IMPACT',
-                                                catalog_item=profile.management_impact,
-                                                parent=decision_node,
-                                                is_active=True
-                                            ).first()
-                                            if impact_node:
-                                                nodes_path.append(impact_node.id)
-
-                                                # 6. COMPLEJIDAD
-                                                if profile.final_complexity_level:
-                                                    complexity_node = ValuationNode.objects.filter(
-                                                        node_type='COMPLEXITY',
-                                                        catalog_item=profile.final_complexity_level,
-                                                        parent=impact_node,
-                                                        is_active=True
-                                                    ).first()
-                                                    if complexity_node:
-                                                        nodes_path.append(complexity_node.id)
+        tree = get_valuation_tree()
+        # Si el perfil tiene clasificación ocupacional, usar la ruta completa hasta el resultado
+        leaf_node = tree.find_result(profile.occupational_classification_id) \
+            if profile.occupational_classification_id else None
+        if leaf_node:
+            nodes_path = [node.id for node in tree.path(leaf_node.id)]
+        elif not profile.occupational_classification_id and profile.job_role_id:
+            # Si no tiene clasificación, reconstruir desde los catalog_items guardados
+            # (la experiencia toma el primer nodo hijo)
+            steps = []
+            for node_type, catalog_item_id in (
+                    ('ROLE', profile.job_role_id), ('INSTRUCTION', profile.required_instruction_id),
+                    ('EXPERIENCE', None), ('DECISION', profile.decision_making_id),
+                    ('IMPACT', profile.management_impact_id), ('COMPLEXITY', profile.final_complexity_level_id)):
+                if node_type != 'EXPERIENCE' and not catalog_item_id:
+                    break
+                steps.append((node_type, catalog_item_id))
+            nodes_path = tree.match_path(steps)
 
         # 3. Actividades
         activities_data = []
@@ -560,10 +496,12 @@ class CompetencyListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
         complexity_items = ManualCatalogItem.objects.filter(catalog__code='COMPLEXITY_LEVELS', is_active=True)
         context['complexity_levels'] = json.dumps(
             [{'id': item.id, 'name': item.name, 'code': item.code} for item in complexity_items])
-        qs = Competency.objects.filter(is_active=True)
-        context.update({'stats_total': qs.count(), 'stats_behavioral': qs.filter(type='BEHAVIORAL').count(),
-                        'stats_technical': qs.filter(type='TECHNICAL').count(),
-                        'stats_transversal': qs.filter(type='TRANSVERSAL').count()})
+        context.update(count_stats(Competency.objects.filter(is_active=True), {
+            'stats_total': None,
+            'stats_behavioral': Q(type='BEHAVIORAL'),
+            'stats_technical': Q(type='TECHNICAL'),
+            'stats_transversal': Q(type='TRANSVERSAL'),
+        }, cache_key='active_by_type'))
         return context
 
 
@@ -605,29 +543,45 @@ class CompetencyToggleStatusView(LoginRequiredMixin, View):
 
 class ApiValuationNodesView(View):
     def get(self, request):
-        parent_id = request.GET.get('parent')
-        filters = {'parent_id': parent_id} if parent_id else {'parent__isnull': True}
-        nodes = ValuationNode.objects.filter(**filters, is_active=True).select_related(
-            'catalog_item', 'occupational_classification'
-        )
+        parent_id = request.GET.get('parent') or None
+        nodes = get_valuation_tree(require=parent_id).children(parent_id)
+        return JsonResponse([node.as_dict() for node in nodes], safe=False)
+
+
+class ApiValuationTreeView(View):
+    """
+    Árbol de valoración completo (o el subárbol de ?root=) en una sola respuesta,
+    para que el wizard navegue los niveles sin una petición por nivel.
+    """
 
-        def get_node_name(n):
-            if n.catalog_item:
-                return n.catalog_item.name
-            if n.node_type == 'RESULT' and n.occupational_classification:
-                return f"{n.occupational_classification.occupational_group} - G{n.occupational_classification.grade}"
-            return n.name_extra if n.name_extra else "Sin Definición"
-
-        data = [{'id': n.id, 'name': get_node_name(n), 'type': n.node_type,
-                 'catalog_item_id': n.catalog_item_id,
-                 'classification_id': n.occupational_classification_id,
-                 'classification': {'group': n.occupational_classification.occupational_group,
-                                    'rmu': n.occupational_classification.remuneration,
-                                    'grade': n.occupational_classification.grade} if n.node_type == 'RESULT' and n.occupational_classification else None}
-                for n in nodes]
+    def get(self, request):
+        root_id = request.GET.get('root') or None
+        data = get_valuation_tree(require=root_id).subtree(root_id)
+        if root_id and not data:
+            return JsonResponse({'error': 'Nodo no encontrado'}, status=404)
         return JsonResponse(data, safe=False)
 
 
+class ApiClassifyView(View):
+    """
+    Clasifica una combinación de valoración contra la matriz ocupacional.
+    Parámetros: role, instruction, experience (meses), decision, impact, complexity.
+    """
+
+    def get(self, request):
+        def int_param(name):
+            try:
+                return int(request.GET.get(name))
+            except (TypeError, ValueError):
+                return None
+
+        entry = get_classification_index().classify(
+            int_param('role'), int_param('instruction'), int_param('experience') or 0,
+            int_param('decision'), int_param('impact'), int_param('complexity'),
+        )
+        return JsonResponse({'match': entry.as_dict() if entry else None})
+
+
 class ValuationNodeDetailApi(View):
     def get(self, request, pk):
         n = get_object_or_404(ValuationNode, pk=pk)
@@ -691,17 +645,13 @@ class ValuationNodeListView(LoginRequiredMixin, PermissionRequiredMixin, JobProf
         context['breadcrumbs'] = []
 
         if parent_id:
-            parent = get_object_or_404(ValuationNode, pk=parent_id)
+            breadcrumbs = get_valuation_tree(require=parent_id).path(parent_id)
+            if not breadcrumbs:
+                raise Http404
+            parent = breadcrumbs[-1]
             context['parent_node'] = parent
-            context['parent_name'] = parent.catalog_item.name if parent.catalog_item else parent.name_extra
-
-            # Reconstruir camino de Breadcrumbs
-            bc = []
-            curr = parent
-            while curr:
-                bc.insert(0, curr)
-                curr = curr.parent
-            context['breadcrumbs'] = bc
+            context['parent_name'] = parent.catalog_item_name or parent.name_extra
+            context['breadcrumbs'] = breadcrumbs
 
             # Lógica de la Norma: Mapeo de tipos para el siguiente nivel
             mapping = {
@@ -716,6 +666,11 @@ class ValuationNodeListView(LoginRequiredMixin, PermissionRequiredMixin, JobProf
             context['next_node_type'] = res[0]
             context['next_level_name'] = res[1]
 
+        # Opciones del select de clasificación ocupacional (solo en el nivel Resultado)
+        if context['next_node_type'] == 'RESULT':
+            context['matrix_options'] = list(OccupationalMatrix.objects.values(
+                'id', 'occupational_group', 'remuneration'
+            ).order_by('grade'))
         return context
 
 
@@ -766,66 +721,30 @@ class JobProfileSaveApi(LoginRequiredMixin, View):
                 profile.specific_job_title = data.get('specific_job_title')
                 profile.administrative_unit_id = data.get('administrative_unit')
 
-                # Guardar todos los niveles de valoración desde los nodos seleccionados
-                role_node_id = data.get('role_node_id')
-                if role_node_id:
-                    try:
-                        node = ValuationNode.objects.get(pk=role_node_id)
-                        if node.catalog_item:
-                            profile.job_role = node.catalog_item
-                    except ValuationNode.DoesNotExist:
-                        pass
-
-                instruction_node_id = data.get('instruction_node_id')
-                if instruction_node_id:
-                    try:
-                        node = ValuationNode.objects.get(pk=instruction_node_id)
-                        if node.catalog_item:
-                            profile.required_instruction = node.catalog_item
-                    except ValuationNode.DoesNotExist:
-                        pass
-
-                experience_node_id = data.get('experience_node_id')
-                if experience_node_id:
-                    try:
-                        node = ValuationNode.objects.get(pk=experience_node_id)
-                        if node.name_extra:
-                            # Extraer meses de experiencia del nombre
-                            import re
-                            match = re.search(r'(\d+)', node.name_extra)
-                            if match:
-                                profile.required_experience_months = int(match.group(1))
-                            elif 'no requerida' in node.name_extra.lower():
-                                profile.required_experience_months = 0
-                    except ValuationNode.DoesNotExist:
-                        pass
-
-                decision_node_id = data.get('decision_node_id')
-                if decision_node_id:
-                    try:
-                        node = ValuationNode.objects.get(pk=decision_node_id)
-                        if node.catalog_item:
-                            profile.decision_making = node.catalog_item
-                    except ValuationNode.DoesNotExist:
-                        pass
-
-                impact_node_id = data.get('impact_node_id')
-                if impact_node_id:
-                    try:
-                        node = ValuationNode.objects.get(pk=impact_node_id)
-                        if node.catalog_item:
-                            profile.management_impact = node.catalog_item
-                    except ValuationNode.DoesNotExist:
-                        pass
-
-                complexity_node_id = data.get('complexity_node_id')
-                if complexity_node_id:
-                    try:
-                        node = ValuationNode.objects.get(pk=complexity_node_id)
-                        if node.catalog_item:
-                            profile.final_complexity_level = node.catalog_item
-                    except ValuationNode.DoesNotExist:
-                        pass
+                # Guardar todos los niveles de valoración desde el nodo más profundo seleccionado:
+                # la cadena Rol -> ... -> Resultado se resuelve desde el árbol en memoria
+                selected_ids = [data.get(f'{level}_node_id') for level in
+                                ('role', 'instruction', 'experience', 'decision', 'impact', 'complexity', 'result')]
+                deepest_id = next((pk for pk in reversed(selected_ids) if pk), None)
+                chain = get_valuation_tree(require=deepest_id).chain(deepest_id)
+                if deepest_id and not chain:
+                    raise ValueError("El nodo de valoración seleccionado no existe.")
+                catalog_fields = {'ROLE': 'job_role_id', 'INSTRUCTION': 'required_instruction_id',
+                                  'DECISION': 'decision_making_id', 'IMPACT': 'management_impact_id',
+                                  'COMPLEXITY': 'final_complexity_level_id'}
+                for node_type, field in catalog_fields.items():
+                    node = chain.get(node_type)
+                    if node and node.catalog_item_id:
+                        setattr(profile, field, node.catalog_item_id)
+
+                experience = chain.get('EXPERIENCE')
+                if experience and experience.name_extra:
+                    # Extraer meses de experiencia del nombre
+                    match = re.search(r'(\d+)', experience.name_extra)
+                    if match:
+                        profile.required_experience_months = int(match.group(1))
+                    elif 'no requerida' in experience.name_extra.lower():
+                        profile.required_experience_months = 0
 
                 # Retrieve Matrix details
                 matrix_id = data.get('occupational_classification')
@@ -955,8 +874,31 @@ class JobProfileDetailModalView(LoginRequiredMixin, View):
         return render(request, 'function_manual/modals/modal_profile_detail.html', {'profile': profile})
 
 
+PRINT_PROFILE_TEMPLATE = 'function_manual/print_profile.html'
+
+
+def profile_print_fingerprint(profile, activities, competencies):
+    """Huella de la impresión de un perfil (core.documents) y su última modificación."""
+    related = [getattr(profile, name) for name in (
+        'administrative_unit', 'occupational_classification', 'required_instruction', 'job_role',
+        'prepared_by', 'reviewed_by', 'approved_by')]
+    stamps = [obj.updated_at if obj else None for obj in related]
+    parts = (
+        profile.pk, profile.updated_at, stamps,
+        [(a.pk, a.updated_at) for a in activities],
+        [(c.pk, c.competency_id, c.competency.updated_at, c.observable_behavior) for c in competencies],
+    )
+    return document_fingerprint(PRINT_PROFILE_TEMPLATE, *parts), document_last_modified(
+        PRINT_PROFILE_TEMPLATE, profile.updated_at, *stamps, *(a.updated_at for a in activities),
+        *(c.competency.updated_at for c in competencies))
+
+
 class JobProfilePrintView(LoginRequiredMixin, View):
-    """Vista para generar la impresión del perfil"""
+    """
+    Vista para generar la impresión del perfil. Un perfil legalizado se entrega
+    como PDF oficial desde la caché de documentos mientras no cambien sus datos;
+    el borrador se imprime desde el navegador.
+    """
 
     def get(self, request, pk):
         profile = get_object_or_404(JobProfile.objects.select_related(
@@ -970,183 +912,56 @@ class JobProfilePrintView(LoginRequiredMixin, View):
         activities = list(profile.activities.all())
 
         # Separar competencias por tipo
-        competencies_qs = ProfileCompetency.objects.filter(profile=profile).select_related('competency',
-                                                                                           'competency__suggested_level')
-        technical = [c for c in competencies_qs if c.competency.type == 'TECHNICAL']
-        behavioral = [c for c in competencies_qs if c.competency.type == 'BEHAVIORAL']
-        transversal = [c for c in competencies_qs if c.competency.type == 'TRANSVERSAL']
-
-        # Rango para llenar filas vacías en actividades si son pocas (estética)
-        empty_activities_range = range(5 - len(activities)) if len(activities) < 5 else []
-
-        context = {
-            'profile': profile,
-            'activities': activities,
-            'technical_competencies': technical,
-            'behavioral_competencies': behavioral,
-            'transversal_competencies': transversal,
-            'empty_activities_range': empty_activities_range
-        }
-        return render(request, 'function_manual/print_profile.html', context)
+        competencies_qs = list(ProfileCompetency.objects.filter(profile=profile).select_related(
+            'competency', 'competency__suggested_level'))
+
+        def render_document(as_pdf=False):
+            technical = [c for c in competencies_qs if c.competency.type == 'TECHNICAL']
+            behavioral = [c for c in competencies_qs if c.competency.type == 'BEHAVIORAL']
+            transversal = [c for c in competencies_qs if c.competency.type == 'TRANSVERSAL']
+
+            # Rango para llenar filas vacías en actividades si son pocas (estética)
+            empty_activities_range = range(5 - len(activities)) if len(activities) < 5 else []
+
+            context = {
+                'profile': profile,
+                'activities': activities,
+                'technical_competencies': technical,
+                'behavioral_competencies': behavioral,
+                'transversal_competencies': transversal,
+                'empty_activities_range': empty_activities_range,
+                'as_pdf': as_pdf,
+            }
+            html = render_to_string(PRINT_PROFILE_TEMPLATE, context)
+            if not as_pdf:
+                return html.encode()
+            buffer = io.BytesIO()
+            if pisa.CreatePDF(html, dest=buffer).err:
+                raise RuntimeError('Error al generar PDF')
+            return buffer.getvalue()
+
+        if not profile.is_legalized:
+            return HttpResponse(render_document())
+
+        fingerprint, last_modified = profile_print_fingerprint(profile, activities, competencies_qs)
+        filename = f"Perfil_{profile.position_code or profile.pk}.pdf"
+        try:
+            return cached_document_response(request, fingerprint, partial(render_document, as_pdf=True),
+                                            filename, last_modified)
+        except RuntimeError:
+            return HttpResponse('Error al generar PDF', status=500)
 
 
 class JobProfileValuationExcelView(LoginRequiredMixin, View):
     """Genera reporte Excel de Valoración de Puestos (Legalizados) - Estilo mdT"""
 
     def get(self, request):
-        import openpyxl
-        from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-        from django.utils import timezone
+        if request.GET.get('background'):
+            return enqueue_response(request, 'function_manual.valuation_report')
 
-        # 1. Configuración de Respuesta
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        writer = write_valuation_report(valuation_rows(legalized_profiles().iterator(chunk_size=500)))
         filename = f"Reporte_Valoracion_Puestos_{timezone.now().strftime('%Y%m%d_%H%M')}.xlsx"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-        # 2. Crear Libro y Hoja
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Valoración de Puestos"
-
-        # 3. Estilos
-        # Bordes
-        thin_border = Border(left=Side(style='thin'), right=Side(style='thin'),
-                             top=Side(style='thin'), bottom=Side(style='thin'))
-
-        # Fuentes
-        font_header_main = Font(name='Arial', size=11, bold=True, color='000000')
-        font_header_sub = Font(name='Arial', size=10, bold=True)
-        font_body = Font(name='Arial', size=9)
-
-        # Rellenos (Colores)
-        fill_header_gray = PatternFill(start_color='E7E6E6', end_color='E7E6E6',
-                                       fill_type='solid')  # Gris claro para encabezados inferiores
-        fill_header_blue = PatternFill(start_color='DAE8FC', end_color='DAE8FC',
-                                       fill_type='solid')  # Azul claro (Roles, Competencias)
-
-        # Alineación
-        center_aligned = Alignment(horizontal='center', vertical='center', wrap_text=True)
-        left_aligned = Alignment(horizontal='left', vertical='center', wrap_text=True)
-
-        # 4. Construcción del Encabezado (Filas 1 y 2)
-        # Título Principal
-        ws.merge_cells('D1:J1')
-        ws['D1'] = "FORMATO DE VALORACION DE PUESTOS"
-        ws['D1'].font = font_header_main
-        ws['D1'].alignment = center_aligned
-
-        # Subtítulo (Dinámico o estático según requerimiento)
-        ws.merge_cells('D2:J2')
-        ws['D2'] = "PUESTOS INSTITUCIONALES LEGALIZADOS"
-        ws['D2'].font = font_header_main
-        ws['D2'].alignment = center_aligned
-
-        # 5. Encabezados de Tabla (Filas 3 y 4)
-        headings_l1 = [
-            ("NRO.", "A3:A4"),
-            ("DENOMINACION DE PUESTO", "B3:B4"),
-            ("RESPONSABILIDAD", "C3:C3"),  # Padre de Rol
-            ("COMPETENCIAS", "D3:E3"),  # Padre de Instruccion y Experiencia
-            ("NIVEL DE COMPLEJIDAD DEL PUESTO", "F3:H3"),  # Padre de Decisiones, Impacto, Complejidad
-            ("CLASIFICACION", "I3:I3"),  # Padre de Grupo
-            ("REFERENCIAL", "J3:J4"),  # Empleado (Columna extra solicitada)
-        ]
-
-        headings_l2 = [
-            # Col C
-            ("ROL DEL PUESTO", "C4"),
-            # Cols D-E
-            ("INSTRUCCIÓN FORMAL", "D4"),
-            ("EXPERIENCIA", "E4"),
-            # Cols F-H
-            ("TOMA DE DECISIONES", "F4"),
-            ("IMPACTO INSTITUCIONAL A RESULTADOS", "G4"),
-            ("COMPLEJIDAD TECNICA (ESPECIALIZACION DE TAREAS)", "H4"),
-            # Col I
-            ("GRUPO OCUPACIONAL", "I4"),
-        ]
-
-        # Aplicar Merge y Texto Nivel 1
-        for text, merge_range in headings_l1:
-            ws.merge_cells(merge_range)
-            # Obtenemos la celda superior izquierda del merge
-            top_left_cell = ws[merge_range.split(':')[0]]
-            top_left_cell.value = text
-            top_left_cell.font = font_header_sub
-            top_left_cell.alignment = center_aligned
-            top_left_cell.border = thin_border
-            top_left_cell.fill = fill_header_blue
-
-        # Aplicar Texto Nivel 2
-        for text, cell_coord in headings_l2:
-            cell = ws[cell_coord]
-            cell.value = text
-            cell.font = Font(name='Arial', size=8, bold=True)
-            cell.alignment = center_aligned
-            cell.border = thin_border
-            cell.fill = fill_header_blue
-
-        # 6. Datos (Sólo Legalizados: tienen las 3 firmas)
-        # Filtro: prepared_by, reviewed_by, approved_by no nulos
-        profiles = JobProfile.objects.select_related(
-            'job_role', 'required_instruction', 'decision_making',
-            'management_impact', 'final_complexity_level',
-            'occupational_classification', 'referential_employee__person'
-        ).filter(
-            is_active=True,
-            prepared_by__isnull=False,
-            reviewed_by__isnull=False,
-            approved_by__isnull=False
-        ).order_by('occupational_classification__grade', 'specific_job_title')
-
-        row_num = 5
-        for idx, p in enumerate(profiles, start=1):
-            # Obtener textos seguros
-            job_title = p.specific_job_title
-            role = p.job_role.name if p.job_role else ""
-            instruction = p.required_instruction.name if p.required_instruction else ""
-            experience = f"{p.required_experience_months} Meses"
-            decision = p.decision_making.name if p.decision_making else ""
-            impact = p.management_impact.name if p.management_impact else ""
-            complexity = p.final_complexity_level.name if p.final_complexity_level else ""
-            group = p.occupational_classification.occupational_group if p.occupational_classification else ""
-
-            ref_employee = str(p.referential_employee.person) if p.referential_employee else "VACANTE"
-
-            row = [
-                idx,  # A
-                job_title,  # B
-                role,  # C
-                instruction,  # D
-                experience,  # E
-                decision,  # F
-                impact,  # G
-                complexity,  # H
-                group,  # I
-                ref_employee  # J
-            ]
-
-            for col_idx, value in enumerate(row, start=1):
-                cell = ws.cell(row=row_num, column=col_idx, value=value)
-                cell.font = font_body
-                cell.border = thin_border
-                # Alinear al centro excepto Titulo y Referencial que pueden ser largos
-                if col_idx in [2, 10]:
-                    cell.alignment = left_aligned
-                else:
-                    cell.alignment = center_aligned
-
-            row_num += 1
-
-        # 7. Ajuste de Ancho de Columnas
-        column_widths = [5, 40, 25, 25, 15, 20, 20, 20, 25, 35]  # A to J
-        for i, width in enumerate(column_widths, start=1):
-            col_letter = openpyxl.utils.get_column_letter(i)
-            ws.column_dimensions[col_letter].width = width
-
-        # Guardar
-        wb.save(response)
-        return response
+        return xlsx_response(writer, filename)
 
 
 def api_get_profile_valuation_chain(request, profile_id):
@@ -1250,135 +1065,5 @@ class JobActivityReportExcelView(LoginRequiredMixin, PermissionRequiredMixin, Vi
         activities = profile.activities.all().select_related(
             'action_verb', 'deliverable', 'complexity', 'contribution', 'frequency'
         )
-
-        # 1. Configuración del Libro y Hoja
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        filename = f"Levantamiento_Actividades_{profile.position_code}.xlsx"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Levantamiento de Actividades"
-
-        # 2. Estilos Globales
-        thin_border = Border(left=Side(style='thin'), right=Side(style='thin'),
-                             top=Side(style='thin'), bottom=Side(style='thin'))
-        header_fill = PatternFill(start_color='DAE8FC', end_color='DAE8FC', fill_type='solid')
-        main_header_font = Font(name='Arial', size=11, bold=True)
-        sub_header_font = Font(name='Arial', size=8, bold=True)
-        body_font = Font(name='Arial', size=9)
-        center_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
-        left_align = Alignment(horizontal='left', vertical='center', wrap_text=True)
-
-        # 3. Encabezado Superior (Fila 1 y 2)
-        ws.merge_cells('A1:C2')
-        ws['A1'] = "Municipio de Loja"
-        ws['A1'].font = main_header_font
-        ws['A1'].alignment = center_align
-
-        ws.merge_cells('D1:K2')
-        ws['D1'] = "FORMATO LEVANTAMIENTO DE ACTIVIDADES"
-        ws['D1'].font = main_header_font
-        ws['D1'].alignment = center_align
-
-        # Denominación del Puesto (Fila 3)
-        ws.merge_cells('A3:C3')
-        ws['A3'] = "DENOMINACIÓN DE PUESTO:"
-        ws['A3'].font = sub_header_font
-        ws.merge_cells('D3:K3')
-        ws['D3'] = f"{profile.specific_job_title} ({profile.position_code})"
-        ws['D3'].font = body_font
-
-        # 4. Cabeceras de Tabla (Fila 4 y 5)
-        headers = [
-            ("NRO.", "A4:A5"),
-            ("ENTREGABLES\n(PRODUCTOS/SERVICIOS)", "B4:B5"),
-            ("ACTIVIDADES", "C4:C5"),
-            ("APORTE A LA GESTION\n(AG)", "D4:D5"),
-            ("FRECUENCIA (F)", "E4:E5"),
-            ("COMPLEJIDAD (C)", "F4:F5"),
-            ("AG", "G4:G5"),
-            ("F", "H4:H5"),
-            ("C", "I4:I5"),
-            ("TOTAL\nAG*(F+C)", "J4:J5"),
-            ("ACTIVIDADES\nSELECCIONADAS PARA EL\nPERFIL", "K4:K5"),
-        ]
-
-        for text, merge_range in headers:
-            ws.merge_cells(merge_range)
-            cell = ws[merge_range.split(':')[0]]
-            cell.value = text
-            cell.font = sub_header_font
-            cell.alignment = center_align
-            cell.fill = header_fill
-            # Aplicar bordes al rango mergeado
-            for row in ws[merge_range]:
-                for c in row:
-                    c.border = thin_border
-
-        # 5. Mapeos de Lógica Normativa
-        def get_val_ag_c(name):
-            n = name.upper()
-            if "ALTO" in n: return 3
-            if "MEDIO" in n: return 2
-            if "BAJO" in n: return 1
-            return 0
-
-        def get_val_f(name):
-            n = name.upper()
-            if "DIARIO" in n: return 5
-            if "SEMANAL" in n: return 4
-            if "MENSUAL" in n: return 3
-            if "TRIMESTRAL" in n or "SEMESTRAL" in n: return 2
-            if "ANUAL" in n: return 1
-            return 0
-
-        # 6. Datos de Actividades
-        row_num = 6
-        for idx, act in enumerate(activities, start=1):
-            # Obtención de nombres
-            deliverable_name = act.deliverable.name if act.deliverable else "N/A"
-            activity_text = f"{act.action_verb.name} {act.description}".strip()
-            ag_name = act.contribution.name if act.contribution else "Bajo"
-            f_name = act.frequency.name if act.frequency else "Anual"
-            c_name = act.complexity.name if act.complexity else "Bajo"
-
-            # Obtención de valores numéricos
-            v_ag = get_val_ag_c(ag_name)
-            v_f = get_val_f(f_name)
-            v_c = get_val_ag_c(c_name)
-            total = v_ag * (v_f + v_c)
-
-            data_row = [
-                idx,  # A: Nro
-                deliverable_name,  # B: Entregable
-                activity_text,  # C: Actividad (Verbo + Desc)
-                ag_name,  # D: Nombre Aporte
-                f_name,  # E: Nombre Frecuencia
-                c_name,  # F: Nombre Complejidad
-                v_ag,  # G: Valor AG
-                v_f,  # H: Valor F
-                v_c,  # I: Valor C
-                total,  # J: Total
-                "SELECCIONADA"  # K: Selección
-            ]
-
-            for col_idx, value in enumerate(data_row, start=1):
-                cell = ws.cell(row=row_num, column=col_idx, value=value)
-                cell.font = body_font
-                cell.border = thin_border
-                # Alineación
-                if col_idx in [2, 3]:  # Texto largo a la izquierda
-                    cell.alignment = left_align
-                else:
-                    cell.alignment = center_align
-
-            row_num += 1
-
-        # 7. Ajuste de Ancho de Columnas
-        widths = [5, 25, 45, 12, 12, 12, 5, 5, 5, 10, 15]
-        for i, w in enumerate(widths, start=1):
-            ws.column_dimensions[openpyxl.utils.get_column_letter(i)].width = w
-
-        wb.save(response)
-        return response
+        writer = write_activity_report(profile, activity_rows(activities.iterator(chunk_size=500)))
+        return xlsx_response(writer, f"Levantamiento_Actividades_{profile.position_code}.xlsx")
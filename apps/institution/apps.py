@@ -5,3 +5,6 @@ class InstitutionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'institution'
     verbose_name = 'Gestión Institucional'
+
+    def ready(self):
+        import institution.signals
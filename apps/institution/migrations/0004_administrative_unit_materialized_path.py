@@ -0,0 +1,48 @@
+# Generated by Django 6.0 on 2026-10-17 12:10
+
+from django.db import migrations, models
+
+
+def populate_paths(apps, schema_editor):
+    """Calcula la ruta materializada de las unidades existentes, nivel por nivel desde las raíces."""
+    AdministrativeUnit = apps.get_model('institution', 'AdministrativeUnit')
+    parents = dict(AdministrativeUnit.objects.values_list('pk', 'parent_id'))
+    children = {}
+    for pk, parent_id in parents.items():
+        children.setdefault(parent_id if parent_id in parents else None, []).append(pk)
+
+    paths = {}
+    frontier = [(pk, '/') for pk in children.get(None, [])]
+    while frontier:
+        next_frontier = []
+        for pk, parent_path in frontier:
+            paths[pk] = f'{parent_path}{pk}/'
+            next_frontier.extend((child, paths[pk]) for child in children.get(pk, []) if child not in paths)
+        frontier = next_frontier
+
+    units = list(AdministrativeUnit.objects.filter(pk__in=paths))
+    for unit in units:
+        unit.path = paths[unit.pk]
+        unit.depth = unit.path.count('/') - 2
+    AdministrativeUnit.objects.bulk_update(units, ['path', 'depth'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('institution', '0003_remove_deliverable_frequency'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='administrativeunit',
+            name='depth',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Profundidad'),
+        ),
+        migrations.AddField(
+            model_name='administrativeunit',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=255, verbose_name='Ruta Jerárquica'),
+        ),
+        migrations.RunPython(populate_paths, reverse_code=migrations.RunPython.noop),
+    ]
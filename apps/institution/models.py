@@ -1,4 +1,9 @@
-from django.db import models
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import F, Func, OuterRef, Subquery, Value
+from django.db.models.functions import Concat, Substr
+
 from core.models import BaseModel
 
 
@@ -18,8 +23,25 @@ class OrganizationalLevel(BaseModel):
         return self.name
 
 
+class AdministrativeUnitQuerySet(models.QuerySet):
+    """Consultas sobre la jerarquía usando la ruta materializada (una consulta cada una)."""
+
+    def descendants_of(self, unit, include_self=True):
+        qs = self.filter(path__startswith=unit.path)
+        return qs if include_self else qs.exclude(pk=unit.pk)
+
+    def ancestors_of(self, unit, include_self=False):
+        return self.filter(pk__in=unit.ancestor_ids(include_self=include_self)).order_by('depth')
+
+    def with_subtree_employee_counts(self):
+        """Anota `subtree_employees`: empleados asignados a la unidad o a cualquiera de sus dependencias."""
+        Employee = apps.get_model('employee', 'Employee')
+        employees = Employee.objects.filter(area__path__startswith=OuterRef('path')).order_by()
+        return self.annotate(subtree_employees=Subquery(employees.values(total=Func('pk', function='COUNT'))))
+
+
 class AdministrativeUnit(BaseModel):
-    objects = None
+    objects = AdministrativeUnitQuerySet.as_manager()
     level = models.ForeignKey(
         OrganizationalLevel,
         on_delete=models.PROTECT,
@@ -51,6 +73,11 @@ class AdministrativeUnit(BaseModel):
     address = models.CharField(max_length=255, blank=True, null=True, verbose_name="Ubicación Física")
     phone = models.CharField(max_length=20, blank=True, null=True, verbose_name="Teléfono Extensión")
 
+    # Ruta materializada: IDs desde la raíz, p. ej. "/1/5/12/". La mantiene save().
+    path = models.CharField(max_length=255, blank=True, default='', db_index=True, editable=False,
+                            verbose_name="Ruta Jerárquica")
+    depth = models.PositiveIntegerField(default=0, editable=False, verbose_name="Profundidad")
+
     class Meta:
         verbose_name = "Unidad Administrativa"
         verbose_name_plural = "Unidades Administrativas"
@@ -60,9 +87,66 @@ class AdministrativeUnit(BaseModel):
         return f"{self.name} ({self.level.name})"
 
     def get_full_path(self):
-        if self.parent:
-            return f"{self.parent.get_full_path()} > {self.name}"
-        return self.name
+        if not self.path:
+            return self.name
+        return " > ".join(unit.name for unit in self.ancestors(include_self=True))
+
+    def ancestor_ids(self, include_self=False):
+        """IDs desde la raíz, leídos de la ruta (sin consultar la base de datos)."""
+        ids = [int(pk) for pk in self.path.strip('/').split('/') if pk]
+        return ids if include_self else ids[:-1]
+
+    def ancestors(self, include_self=False):
+        return AdministrativeUnit.objects.ancestors_of(self, include_self=include_self)
+
+    def descendants(self, include_self=True):
+        return AdministrativeUnit.objects.descendants_of(self, include_self=include_self)
+
+    def get_descendant_ids(self, include_self=True):
+        """IDs de la unidad y de todas sus dependencias."""
+        return list(self.descendants(include_self=include_self).values_list('pk', flat=True))
+
+    def subtree_employees(self):
+        """Empleados de la unidad y de todas sus dependencias."""
+        Employee = apps.get_model('employee', 'Employee')
+        return Employee.objects.filter(area__path__startswith=self.path)
+
+    def clean(self):
+        super().clean()
+        if self.pk and self.parent_id:
+            parent_path = AdministrativeUnit.objects.filter(pk=self.parent_id).values_list('path', flat=True).first()
+            if self.parent_id == self.pk or f'/{self.pk}/' in (parent_path or ''):
+                raise ValidationError({'parent': 'Una unidad no puede depender de sí misma ni de sus dependencias.'})
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self._sync_path()
+
+    def _sync_path(self):
+        """Recalcula la ruta; si cambió (alta o cambio de padre) se actualiza todo el subárbol en un UPDATE."""
+        parent_path = '/'
+        if self.parent_id:
+            parent_path = AdministrativeUnit.objects.filter(pk=self.parent_id).values_list('path', flat=True).get()
+            if f'/{self.pk}/' in parent_path:
+                raise ValidationError('Una unidad no puede depender de sí misma ni de sus dependencias.')
+        new_path = f'{parent_path}{self.pk}/'
+        if new_path == self.path:
+            return
+        new_depth = new_path.count('/') - 2
+        if self.path:
+            rebase_unit_paths(self.path, new_path, new_depth - self.depth)
+        else:
+            AdministrativeUnit.objects.filter(pk=self.pk).update(path=new_path, depth=new_depth)
+        self.path, self.depth = new_path, new_depth
+
+
+def rebase_unit_paths(old_prefix, new_prefix, depth_delta):
+    """Mueve un subárbol completo: reemplaza el prefijo de la ruta y ajusta la profundidad."""
+    AdministrativeUnit.objects.filter(path__startswith=old_prefix).update(
+        path=Concat(Value(new_prefix), Substr('path', len(old_prefix) + 1), output_field=models.CharField()),
+        depth=F('depth') + depth_delta,
+    )
 
 
 class Deliverable(BaseModel):
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import AdministrativeUnit, rebase_unit_paths
+
+
+@receiver(post_delete, sender=AdministrativeUnit)
+def reroot_orphan_units(sender, instance, **kwargs):
+    """
+    El padre se elimina con SET_NULL: sus dependencias pasan a ser raíces, así que
+    se recorta el prefijo de la unidad eliminada de todo el subárbol.
+    """
+    if instance.path:
+        rebase_unit_paths(instance.path, '/', -(instance.depth + 1))
@@ -1,3 +1,64 @@
+from django.core.exceptions import ValidationError
 from django.test import TestCase
 
-# Create your tests here.
+from .models import AdministrativeUnit, OrganizationalLevel, rebase_unit_paths
+
+
+class UnitPathTests(TestCase):
+    """Ruta materializada: alta, cambio de padre con todo el subárbol y ciclos."""
+
+    def setUp(self):
+        self.level = OrganizationalLevel.objects.create(name='Dirección', level_order=1)
+        self.root = self.unit('Alcaldía')
+        self.finance = self.unit('Financiero', self.root)
+        self.budget = self.unit('Presupuesto', self.finance)
+        self.accounting = self.unit('Contabilidad', self.budget)
+        self.people = self.unit('Talento Humano', self.root)
+
+    def unit(self, name, parent=None):
+        return AdministrativeUnit.objects.create(name=name, level=self.level, parent=parent)
+
+    def stored(self, unit):
+        return AdministrativeUnit.objects.values_list('path', 'depth').get(pk=unit.pk)
+
+    def test_new_units_get_path_and_depth(self):
+        self.assertEqual(self.stored(self.root), (f'/{self.root.pk}/', 0))
+        self.assertEqual(self.stored(self.accounting),
+                         (f'/{self.root.pk}/{self.finance.pk}/{self.budget.pk}/{self.accounting.pk}/', 3))
+        self.assertEqual(self.accounting.ancestor_ids(), [self.root.pk, self.finance.pk, self.budget.pk])
+        self.assertEqual(set(self.finance.get_descendant_ids()), {self.finance.pk, self.budget.pk, self.accounting.pk})
+
+    def test_moving_a_unit_moves_its_subtree(self):
+        self.budget.parent = self.people
+        self.budget.save()
+
+        base = f'/{self.root.pk}/{self.people.pk}/{self.budget.pk}/'
+        self.assertEqual(self.stored(self.budget), (base, 2))
+        self.assertEqual(self.stored(self.accounting), (f'{base}{self.accounting.pk}/', 3))
+        self.assertEqual(set(self.finance.get_descendant_ids()), {self.finance.pk})
+
+        self.budget.parent = None
+        self.budget.save()
+        self.assertEqual(self.stored(self.accounting), (f'/{self.budget.pk}/{self.accounting.pk}/', 1))
+
+    def test_saving_without_changes_keeps_paths(self):
+        before = list(AdministrativeUnit.objects.order_by('pk').values_list('path', 'depth'))
+        self.budget.name = 'Presupuesto Municipal'
+        self.budget.save()
+        self.assertEqual(list(AdministrativeUnit.objects.order_by('pk').values_list('path', 'depth')), before)
+
+    def test_rejects_cycles(self):
+        self.finance.parent = self.accounting
+        with self.assertRaises(ValidationError):
+            self.finance.clean()
+        with self.assertRaises(ValidationError):
+            self.finance.save()
+        self.assertEqual(self.stored(self.finance), (f'/{self.root.pk}/{self.finance.pk}/', 1))
+
+    def test_rebase_only_touches_the_prefix(self):
+        old_prefix = f'/{self.root.pk}/{self.finance.pk}/'
+        rebase_unit_paths(old_prefix, f'/{self.finance.pk}/', -1)
+        self.assertEqual(self.stored(self.finance), (f'/{self.finance.pk}/', 0))
+        self.assertEqual(self.stored(self.accounting),
+                         (f'/{self.finance.pk}/{self.budget.pk}/{self.accounting.pk}/', 2))
+        self.assertEqual(self.stored(self.people), (f'/{self.root.pk}/{self.people.pk}/', 1))
@@ -7,7 +7,10 @@ from django.http import JsonResponse
 from django.db.models import Q
 from django.views.decorators.http import require_POST
 from django.utils.decorators import method_decorator
+from core.exports import ExportMixin, yes_no
+from core.stats import status_stats
 from employee.models import Employee
+from person.search import people_q, search_people
 from .models import AdministrativeUnit, OrganizationalLevel, Deliverable
 from .forms import AdministrativeUnitForm, OrganizationalLevelForm, DeliverableForm
 
@@ -52,15 +55,8 @@ class EmployeeSearchJsonView(LoginRequiredMixin, View):
 
         qs = Employee.objects.filter(is_active=True).select_related('person')
 
-        if term:
-            # Búsqueda por múltiples campos (OR)
-            qs = qs.filter(
-                Q(person__first_name__icontains=term) |
-                Q(person__last_name__icontains=term) |
-                Q(person__document_number__icontains=term)
-            )
-
-        qs = qs[:20]
+        # Cédula por prefijo o nombres por similitud (índice trigram)
+        qs = search_people(qs, term, person_path='person')[:20]
 
         results = []
         for emp in qs:
@@ -79,20 +75,26 @@ class EmployeeSearchJsonView(LoginRequiredMixin, View):
 
 # --- ESTADÍSTICAS ---
 def get_unit_stats():
-    return {
-        'total': AdministrativeUnit.objects.count(),
-        'active': AdministrativeUnit.objects.filter(is_active=True).count(),
-        'inactive': AdministrativeUnit.objects.filter(is_active=False).count(),
-    }
+    return status_stats(AdministrativeUnit.objects.all())
 
 
 # --- LISTA ---
-class UnitListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+class UnitListView(LoginRequiredMixin, PermissionRequiredMixin, ExportMixin, ListView):
     model = AdministrativeUnit
     template_name = 'institution/unit_list.html'
     context_object_name = 'units'
     paginate_by = 10
     permission_required = 'institution.view_administrativeunit'
+    export_filename = 'Unidades_Administrativas'
+    export_columns = (
+        ('code', 'Código'),
+        ('name', 'Nombre'),
+        ('level__name', 'Nivel Organizacional'),
+        ('parent__name', 'Unidad Superior'),
+        ('boss__person__last_name', 'Apellidos Responsable'),
+        ('boss__person__first_name', 'Nombres Responsable'),
+        ('is_active', 'Activa', yes_no),
+    )
 
     def get_queryset(self):
         # Optimizamos consultas (select_related para FKs)
@@ -106,8 +108,7 @@ class UnitListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
             qs = qs.filter(
                 Q(name__icontains=q) |
                 Q(code__icontains=q) |
-                Q(boss__person__first_name__icontains=q) |
-                Q(boss__person__last_name__icontains=q)
+                people_q(q, person_path='boss__person')
             )
 
         if status == 'true':
@@ -197,11 +198,7 @@ class UnitToggleStatusView(LoginRequiredMixin, PermissionRequiredMixin, View):
 # ==========================================
 
 def get_level_stats():
-    return {
-        'total': OrganizationalLevel.objects.count(),
-        'active': OrganizationalLevel.objects.filter(is_active=True).count(),
-        'inactive': OrganizationalLevel.objects.filter(is_active=False).count(),
-    }
+    return status_stats(OrganizationalLevel.objects.all())
 
 
 class LevelListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
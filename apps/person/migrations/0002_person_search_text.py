@@ -0,0 +1,60 @@
+# Generated by Django 6.0 on 2026-10-17 13:10
+
+from django.db import migrations, models
+
+from person.search import normalize_search_text
+
+TRGM_INDEX = 'person_search_text_trgm_idx'
+DOCUMENT_PREFIX_INDEX = 'person_document_number_prefix_idx'
+
+
+def populate_search_text(apps, schema_editor):
+    Person = apps.get_model('person', 'Person')
+    batch = []
+    for person in Person.objects.only('first_name', 'last_name', 'document_number').iterator(chunk_size=2000):
+        person.search_text = normalize_search_text(person.first_name, person.last_name, person.document_number)
+        batch.append(person)
+        if len(batch) >= 2000:
+            Person.objects.bulk_update(batch, ['search_text'])
+            batch = []
+    if batch:
+        Person.objects.bulk_update(batch, ['search_text'])
+
+
+def create_search_indexes(apps, schema_editor):
+    """Índice trigram para búsquedas por contenido y de prefijo para la cédula (solo PostgreSQL)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {TRGM_INDEX} ON person_person USING gin (search_text gin_trgm_ops)"
+    )
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {DOCUMENT_PREFIX_INDEX} "
+        f"ON person_person (document_number varchar_pattern_ops)"
+    )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {TRGM_INDEX}")
+    schema_editor.execute(f"DROP INDEX IF EXISTS {DOCUMENT_PREFIX_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('person', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='person',
+            name='search_text',
+            field=models.CharField(blank=True, default='', editable=False, max_length=300,
+                                   verbose_name='Texto de búsqueda'),
+        ),
+        migrations.RunPython(populate_search_text, reverse_code=migrations.RunPython.noop),
+        migrations.RunPython(create_search_indexes, reverse_code=drop_search_indexes),
+    ]
@@ -3,6 +3,8 @@ from django.conf import settings  # IMPORTANTE: Usar settings, no el User model
 from core.models import BaseModel, CatalogItem, Location
 from datetime import date
 
+from .search import normalize_search_text
+
 
 class Person(models.Model):
     """
@@ -91,6 +93,12 @@ class Person(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Nombres y cédula normalizados para person.search (índice pg_trgm en PostgreSQL)
+    search_text = models.CharField(max_length=300, blank=True, default='', editable=False,
+                                   verbose_name="Texto de búsqueda")
+
+    SEARCH_FIELDS = ('first_name', 'last_name', 'document_number')
+
     class Meta:
         verbose_name = "Persona"
         verbose_name_plural = "Personas"
@@ -99,6 +107,13 @@ class Person(models.Model):
     def __str__(self):
         return f"{self.last_name} {self.first_name}"
 
+    def save(self, *args, **kwargs):
+        self.search_text = normalize_search_text(self.first_name, self.last_name, self.document_number)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(self.SEARCH_FIELDS) & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'search_text'}
+        super().save(*args, **kwargs)
+
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
@@ -0,0 +1,73 @@
+"""
+Búsqueda de personas por nombre o cédula.
+
+Person.search_text guarda nombres y cédula normalizados (minúsculas, sin tildes)
+y se mantiene en Person.save(). En PostgreSQL la columna tiene un índice GIN
+pg_trgm, de modo que el `LIKE '%texto%'` de cada palabra usa el índice en lugar
+de recorrer la tabla, y los resultados se ordenan por similitud. Una entrada
+solo numérica se trata como cédula y se busca por prefijo (índice
+varchar_pattern_ops sobre document_number).
+
+Las funciones reciben `person_path`, la ruta hasta Person desde el modelo del
+queryset (p. ej. 'employee__person'), para usarse desde cualquier listado.
+"""
+import unicodedata
+
+from django.db import connections
+from django.db.models import DecimalField, F, FloatField, Func, Q, Value
+from django.db.models.functions import Cast
+
+
+def normalize_search_text(*parts):
+    """Une las partes en minúsculas, sin tildes y con espacios simples."""
+    text = ' '.join(str(part) for part in parts if part)
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(text.lower().split())
+
+
+class Similarity(Func):
+    """similarity() de pg_trgm."""
+    function = 'similarity'
+    output_field = FloatField()
+
+
+def _prefix(person_path):
+    return f'{person_path}__' if person_path else ''
+
+
+def people_q(term, person_path=''):
+    """
+    Condición de búsqueda para combinar con otros filtros (p. ej. en un OR con el
+    código de una partida). Cédula numérica: prefijo; texto: todas las palabras.
+    """
+    prefix = _prefix(person_path)
+    term = (term or '').strip()
+    if term.isdigit():
+        return Q(**{f'{prefix}document_number__startswith': term})
+    condition = Q()
+    for token in normalize_search_text(term).split():
+        condition &= Q(**{f'{prefix}search_text__contains': token})
+    return condition
+
+
+def search_people(queryset, term, person_path=''):
+    """
+    Filtra `queryset` por el término y, en PostgreSQL, lo ordena por similitud
+    (anotación search_rank) conservando el orden previo como desempate.
+
+    search_rank se redondea a NUMERIC(5, 4): el float4 de similarity() no
+    sobrevive intacto al cursor JSON de core.pagination, mientras que un decimal
+    fijo se compara exactamente al buscar la página siguiente.
+    """
+    term = (term or '').strip()
+    if not term:
+        return queryset
+    queryset = queryset.filter(people_q(term, person_path))
+    if term.isdigit() or connections[queryset.db].vendor != 'postgresql':
+        return queryset
+    ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+    rank = Similarity(F(f'{_prefix(person_path)}search_text'), Value(normalize_search_text(term)))
+    return queryset.annotate(
+        search_rank=Cast(rank, DecimalField(max_digits=5, decimal_places=4))
+    ).order_by('-search_rank', *ordering)
@@ -1,19 +1,34 @@
 # apps/person/views.py
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
-from django.db.models import Q
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, render
 from django.views.generic import ListView, CreateView, UpdateView
+
+from core.exports import ExportMixin
+from core.pagination import KeysetPaginationMixin
 from .models import Person
+from .search import search_people
 from .forms import PersonForm
 
 
-class PersonListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+class PersonListView(LoginRequiredMixin, PermissionRequiredMixin, ExportMixin, KeysetPaginationMixin, ListView):
     model = Person
     template_name = 'person/person_list.html'
     context_object_name = 'people'
     paginate_by = 10
     permission_required = 'person.view_person'
+    export_filename = 'Personas'
+    export_columns = (
+        ('document_type__name', 'Tipo de Documento'),
+        ('document_number', 'Nro. Documento'),
+        ('last_name', 'Apellidos'),
+        ('first_name', 'Nombres'),
+        ('email', 'Correo'),
+        ('phone_number', 'Teléfono'),
+        ('birth_date', 'Fecha de Nacimiento'),
+        ('employee_profile__area__name', 'Área'),
+        ('employee_profile__employment_status__name', 'Estado Laboral'),
+    )
 
     def get_queryset(self):
         qs = Person.objects.select_related(
@@ -23,14 +38,7 @@ class PersonListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
             'employee_profile__employment_status'
         ).all().order_by('last_name')
 
-        query = self.request.GET.get('q')
-        if query:
-            qs = qs.filter(
-                Q(first_name__icontains=query) |
-                Q(last_name__icontains=query) |
-                Q(document_number__icontains=query)
-            )
-        return qs
+        return search_people(qs, self.request.GET.get('q'))
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
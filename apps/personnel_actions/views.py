@@ -8,15 +8,31 @@ from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db import transaction
 
+from core.exports import ExportMixin, yes_no
+from core.pagination import KeysetPaginationMixin
+from core.stats import count_stats, status_stats
+from person.search import people_q
 from .models import PersonnelAction, ActionMovement, ActionType
 from .forms import PersonnelActionForm, ActionMovementForm, ActionTypeForm
 
 
-class PersonnelActionListView(LoginRequiredMixin, ListView):
+class PersonnelActionListView(LoginRequiredMixin, ExportMixin, KeysetPaginationMixin, ListView):
     model = PersonnelAction
     template_name = 'personnel_action/personnel_action_list.html'
     context_object_name = 'actions'
     paginate_by = 10
+    export_filename = 'Acciones_de_Personal'
+    export_columns = (
+        ('number', 'Número'),
+        ('action_type__name', 'Tipo de Acción'),
+        ('employee__person__document_number', 'Cédula'),
+        ('employee__person__last_name', 'Apellidos'),
+        ('employee__person__first_name', 'Nombres'),
+        ('date_issue', 'Fecha de Emisión'),
+        ('date_effective', 'Rige a partir de'),
+        ('is_registered', 'Registrada', yes_no),
+        ('date_registered', 'Fecha de Registro'),
+    )
 
     def get_queryset(self):
         qs = super().get_queryset().select_related('employee', 'action_type')
@@ -27,9 +43,7 @@ class PersonnelActionListView(LoginRequiredMixin, ListView):
         q = self.request.GET.get('q')
         if q:
             qs = qs.filter(
-                Q(employee__first_name__icontains=q) |
-                Q(employee__last_name__icontains=q) |
-                Q(employee__identification__icontains=q) |
+                people_q(q, person_path='employee__person') |
                 Q(number__icontains=q)
             )
 
@@ -57,18 +71,16 @@ class PersonnelActionListView(LoginRequiredMixin, ListView):
         context = super().get_context_data(**kwargs)
 
         # --- Cálculo de Estadísticas ---
-        total_qs = PersonnelAction.objects.all()
-
-        context['stats'] = {
-            'total': total_qs.count(),
-            'registered': total_qs.filter(is_registered=True).count(),
-            'pending': total_qs.filter(is_registered=False).count(),
-        }
+        context['stats'] = count_stats(PersonnelAction.objects.all(), {
+            'total': None,
+            'registered': Q(is_registered=True),
+            'pending': Q(is_registered=False),
+        }, cache_key='registration')
 
         # Mantenemos los parámetros actuales para la paginación
         params = self.request.GET.copy()
-        if 'page' in params:
-            del params['page']
+        for key in ('page', self.cursor_param):
+            params.pop(key, None)
         context['current_params'] = params.urlencode()
 
         return context
@@ -93,7 +105,9 @@ class PersonnelActionListView(LoginRequiredMixin, ListView):
                 'has_next': page_obj.has_next(),
                 'has_previous': page_obj.has_previous(),
                 'num_pages': paginator.num_pages,
-                'total_records': paginator.count
+                'total_records': paginator.count,
+                'next_cursor': getattr(page_obj, 'next_cursor', None),
+                'previous_cursor': getattr(page_obj, 'previous_cursor', None),
             })
 
         return super().render_to_response(context, **response_kwargs)
@@ -147,9 +161,10 @@ class ActionTypeListView(LoginRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
         # Estadísticas Globales
-        ctx['stats_total'] = ActionType.objects.count()
-        ctx['stats_active'] = ActionType.objects.filter(is_active=True).count()
-        ctx['stats_inactive'] = ActionType.objects.filter(is_active=False).count()
+        stats = status_stats(ActionType.objects.all())
+        ctx['stats_total'] = stats['total']
+        ctx['stats_active'] = stats['active']
+        ctx['stats_inactive'] = stats['inactive']
         return ctx
 
     def get_template_names(self):
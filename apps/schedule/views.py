@@ -4,7 +4,9 @@ from django.http import JsonResponse
 from django.template.loader import render_to_string
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
 from django.db import transaction
+from django.db.models import Q
 
+from core.stats import count_stats, status_stats
 from .models import Schedule, ScheduleObservation
 from .forms import ScheduleForm, ScheduleSearchForm, ScheduleObservationForm, ObservationSearchForm
 
@@ -20,10 +22,10 @@ class ScheduleListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        all_schedules = Schedule.objects.all()
-        context['total_schedules'] = all_schedules.count()
-        context['active_schedules'] = all_schedules.filter(is_active=True).count()
-        context['inactive_schedules'] = all_schedules.filter(is_active=False).count()
+        stats = status_stats(Schedule.objects.all())
+        context['total_schedules'] = stats['total']
+        context['active_schedules'] = stats['active']
+        context['inactive_schedules'] = stats['inactive']
         return context
 
 
@@ -117,12 +119,7 @@ class ScheduleTablePartialView(LoginRequiredMixin, View):
             queryset = queryset.filter(is_active=False)
 
         # 2. Cálculo de estadísticas (SIEMPRE sobre el total de la base)
-        all_schedules = Schedule.objects.all()
-        stats_data = {
-            'total': all_schedules.count(),
-            'active': all_schedules.filter(is_active=True).count(),
-            'inactive': all_schedules.filter(is_active=False).count(),
-        }
+        stats_data = status_stats(Schedule.objects.all())
 
         # 3. Renderizado del fragmento HTML
         html = render_to_string('schedule/partials/partial_schedule_table.html', {
@@ -136,6 +133,12 @@ class ScheduleTablePartialView(LoginRequiredMixin, View):
         })
 
 
+def get_observation_stats():
+    return count_stats(ScheduleObservation.objects.all(), {
+        'total': None, 'holiday': Q(is_holiday=True), 'special': Q(is_holiday=False),
+    }, cache_key='kind')
+
+
 class ObservationListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
     model = ScheduleObservation
     template_name = 'schedule/observation_list.html'
@@ -147,11 +150,11 @@ class ObservationListView(LoginRequiredMixin, PermissionRequiredMixin, ListView)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        qs = ScheduleObservation.objects.all()
         # Datos iniciales para evitar el parpadeo "0"
-        context['total_obs'] = qs.count()
-        context['holiday_obs'] = qs.filter(is_holiday=True).count()
-        context['special_obs'] = qs.filter(is_holiday=False).count()
+        stats = get_observation_stats()
+        context['total_obs'] = stats['total']
+        context['holiday_obs'] = stats['holiday']
+        context['special_obs'] = stats['special']
         return context
 
 
@@ -168,12 +171,7 @@ class ObservationTablePartialView(LoginRequiredMixin, View):
             queryset = queryset.filter(is_holiday=False)
 
         # Estadísticas en tiempo real
-        all_qs = ScheduleObservation.objects.all()
-        stats = {
-            'total': all_qs.count(),
-            'holiday': all_qs.filter(is_holiday=True).count(),
-            'special': all_qs.filter(is_holiday=False).count(),
-        }
+        stats = get_observation_stats()
 
         html = render_to_string('schedule/partials/partial_observation_table.html', {
             'observations': queryset[:50]
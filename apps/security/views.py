@@ -7,12 +7,24 @@ from django.shortcuts import render, get_object_or_404
 from django.utils.decorators import method_decorator
 from django.views.decorators.http import require_POST
 from django.views.generic import CreateView, View, ListView, UpdateView
+from core.pagination import KeysetPaginationMixin
+from core.stats import count_stats
 from person.models import Person
+from person.search import search_people
 from .forms import RoleForm, UserFilterForm, CredentialCreationForm
 
 
 # --- 1. GESTIÓN DE USUARIOS (PERSONAS) ---
-class UserListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+def get_user_stats():
+    """Personas por estado de su usuario (una sola consulta, cacheada; ver core.stats)."""
+    return count_stats(Person.objects.all(), {
+        'total': None,
+        'active': Q(user__is_active=True),
+        'inactive': Q(user__isnull=False, user__is_active=False),
+    }, cache_key='user_status', depends_on=(get_user_model(),))
+
+
+class UserListView(LoginRequiredMixin, PermissionRequiredMixin, KeysetPaginationMixin, ListView):
     model = Person
     template_name = 'security/users/user_list.html'
     context_object_name = 'persons'
@@ -22,13 +34,7 @@ class UserListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
 
     def get_queryset(self):
         qs = Person.objects.select_related('user').prefetch_related('user__groups').all().order_by('last_name')
-        q = self.request.GET.get('q')
-        if q:
-            qs = qs.filter(
-                Q(first_name__icontains=q) |
-                Q(last_name__icontains=q) |
-                Q(document_number__icontains=q)
-            )
+        qs = search_people(qs, self.request.GET.get('q'))
 
         cedula = self.request.GET.get('cedula')
         first_name = self.request.GET.get('first_name')
@@ -62,10 +68,10 @@ class UserListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
         context['filter_form'] = UserFilterForm(self.request.GET)
         context['creds_form'] = CredentialCreationForm()
 
-        all_persons = Person.objects.all()
-        context['stats_total'] = User.objects.count()
-        context['stats_active'] = all_persons.filter(user__is_active=True).count()
-        context['stats_inactive'] = all_persons.filter(user__is_active=False).count()
+        stats = get_user_stats()
+        context['stats_total'] = count_stats(User.objects.all(), {'total': None}, cache_key='total')['total']
+        context['stats_active'] = stats['active']
+        context['stats_inactive'] = stats['inactive']
 
         return context
 
@@ -95,7 +101,7 @@ class RoleListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = RoleForm()
-        context['stats_total'] = Group.objects.count()
+        context['stats_total'] = count_stats(Group.objects.all(), {'total': None}, cache_key='total')['total']
         return context
 
     def get(self, request, *args, **kwargs):
@@ -318,11 +324,7 @@ class UserToggleStatusView(LoginRequiredMixin, PermissionRequiredMixin, View):
         user.is_active = not user.is_active
         user.save()
 
-        stats = {
-            'total': Person.objects.count(),
-            'active': Person.objects.filter(user__is_active=True).count(),
-            'inactive': Person.objects.filter(user__isnull=False, user__is_active=False).count(),
-        }
+        stats = get_user_stats()
 
         action_verb = "activado" if user.is_active else "desactivado"
 
@@ -405,14 +405,21 @@ const biometricApp = createApp({
 
                 try {
                     // Llamada al endpoint de Python que creamos en views.py
-                    const response = await fetch(`/biometric/load-attendance/${id}/`, {
+                    // La descarga corre en el worker de trabajos (run_jobs); aquí solo se consulta el avance
+                    const response = await fetch(`/biometric/load-attendance/${id}/?background=1`, {
                         method: 'POST',
                         headers: {
                             'X-CSRFToken': BiometricService.getCsrfToken()
                         }
                     });
 
-                    const data = await response.json();
+                    let data = await response.json();
+                    if (response.ok && data.job) {
+                        const job = await window.waitForJob(data.job);
+                        data = job.status === 'SUCCESS'
+                            ? {status: 'success', message: job.result.message}
+                            : {status: 'error', message: job.error};
+                    }
 
                     if (response.ok && data.status === 'success') {
                         // 3. ÉXITO
@@ -1,10 +1,16 @@
 const {createApp} = Vue;
 
+const reportRoot = document.getElementById('report-app');
+
 const reportApp = createApp({
         delimiters: ['[[', ']]'],
         data() {
             return {
                 searchQuery: '',
+                // Paginación por cursor (la primera página llega renderizada con sus cursores)
+                page: 1,
+                nextCursor: reportRoot.dataset.nextCursor || null,
+                previousCursor: null,
                 showMonthlyModal: false,
                 showSpecificModal: false,
                 selectedEmp: {id: '', name: '', dni: ''},
@@ -14,9 +20,26 @@ const reportApp = createApp({
         },
         methods: {
             async search() {
-                const response = await fetch(`?q=${this.searchQuery}`, {headers: {'X-Requested-With': 'XMLHttpRequest'}});
+                this.page = 1;
+                await this.load('');
+            },
+            async load(cursor) {
+                const params = new URLSearchParams({q: this.searchQuery, cursor});
+                const response = await fetch(`?${params}`, {headers: {'X-Requested-With': 'XMLHttpRequest'}});
                 const data = await response.json();
                 document.getElementById('table-content-wrapper').innerHTML = data.html;
+                this.nextCursor = data.has_next ? data.next_cursor : null;
+                this.previousCursor = data.has_previous ? data.previous_cursor : null;
+            },
+            nextPage() {
+                if (!this.nextCursor) return;
+                this.page += 1;
+                this.load(this.nextCursor);
+            },
+            previousPage() {
+                if (!this.previousCursor) return;
+                this.page -= 1;
+                this.load(this.previousCursor);
             },
             openMonthly(id, name, dni) {
                 this.selectedEmp = {id, name, dni};
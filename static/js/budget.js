@@ -28,20 +28,24 @@ document.addEventListener('DOMContentLoaded', () => {
 
 // --- 2. GESTIÓN DE TABLA Y FILTROS ---
 
-let currentFilters = {q: '', status: 'all', page: 1};
+let currentFilters = {q: '', status: 'all', page: 1, cursor: ''};
 
 window.fetchBudgets = function (params = {}) {
-    Object.assign(currentFilters, params);
+    // Sin cursor explícito (búsqueda, filtro, refresco) se vuelve a la primera página
+    Object.assign(currentFilters, {cursor: ''}, params);
     const url = new URL(window.location.href);
     if (currentFilters.q) url.searchParams.set('q', currentFilters.q);
     if (currentFilters.status) url.searchParams.set('status', currentFilters.status);
     if (currentFilters.page) url.searchParams.set('page', currentFilters.page);
+    if (currentFilters.cursor) url.searchParams.set('cursor', currentFilters.cursor);
+    window.setListExportParams(url.searchParams);
 
     fetch(url, {headers: {'X-Requested-With': 'XMLHttpRequest'}})
         .then(res => res.text())
         .then(html => {
             const wrapper = document.getElementById('table-content-wrapper');
             if (wrapper) wrapper.innerHTML = html;
+            updatePaginationUI();
         });
 };
 
@@ -55,6 +59,7 @@ function updatePaginationUI() {
     document.getElementById('btn-next').disabled = meta.dataset.hasNext !== 'true';
     const display = document.getElementById('current-page-display');
     if (display) display.textContent = meta.dataset.page;
+    currentFilters.page = parseInt(meta.dataset.page) || 1;
 }
 
 // --- 3. ACTUALIZACIÓN DE ESTADÍSTICAS (STATS) ---
@@ -528,8 +533,9 @@ window.toggleStructureActive = function (modelType, pk, isActive) {
 
 // Listeners de paginación finales
 document.addEventListener('click', (e) => {
-    if (e.target.id === 'btn-prev') window.fetchBudgets({page: currentFilters.page - 1});
-    if (e.target.id === 'btn-next') window.fetchBudgets({page: currentFilters.page + 1});
+    const meta = document.getElementById('pagination-metadata');
+    if (e.target.closest('#btn-prev')) window.fetchBudgets({cursor: meta?.dataset.prevCursor || '', page: currentFilters.page - 1});
+    if (e.target.closest('#btn-next')) window.fetchBudgets({cursor: meta?.dataset.nextCursor || '', page: currentFilters.page + 1});
 });
 
 // Inicialización de cascadas si es necesario (para modales inyectados se llama al abrir)
@@ -0,0 +1,104 @@
+/* static/js/budget_rollup.js */
+
+document.addEventListener('DOMContentLoaded', () => {
+    const body = document.getElementById('rollup-body');
+    const programSelect = document.getElementById('rollup-program');
+    const excelButton = document.getElementById('btn-rollup-excel');
+    const excelUrl = excelButton.getAttribute('href');
+    const STATUS_KEYS = ['libre', 'concurso', 'litigio', 'inactiva'];
+    const money = new Intl.NumberFormat('es-EC', {minimumFractionDigits: 2, maximumFractionDigits: 2});
+
+    function cell(text, className) {
+        const td = document.createElement('td');
+        td.textContent = text;
+        if (className) td.className = className;
+        return td;
+    }
+
+    // Filas en preorden; los hijos quedan ocultos hasta expandir su padre
+    function appendNodes(nodes, depth, parentKey) {
+        nodes.forEach(node => {
+            const key = `${parentKey}/${node.level}-${node.id}`;
+            const row = document.createElement('tr');
+            row.dataset.key = key;
+            row.dataset.parent = parentKey;
+            if (depth > 0) row.classList.add('hidden');
+
+            const name = cell('', depth === 0 ? 'fw-bold' : '');
+            name.style.paddingLeft = `${12 + depth * 22}px`;
+            const hasChildren = node.children && node.children.length;
+            const icon = document.createElement('i');
+            icon.className = hasChildren ? 'fas fa-chevron-right' : 'fas fa-circle';
+            icon.style.cssText = hasChildren ? 'width:14px; cursor:pointer;' : 'width:14px; font-size:5px;';
+            name.append(icon, ` ${node.code} - ${node.name}`);
+            row.appendChild(name);
+
+            row.append(
+                cell(node.lines, 'text-right'),
+                cell(node.headcount, 'text-right'),
+                ...STATUS_KEYS.map(status => cell(node[status], 'text-right')),
+                cell(money.format(Number(node.total_rmu)), 'text-right'),
+                cell(money.format(Number(node.occupied_rmu)), 'text-right'),
+                cell(money.format(Number(node.avg_rmu)), 'text-right'),
+            );
+            if (hasChildren) {
+                row.style.cursor = 'pointer';
+                row.addEventListener('click', () => toggle(row, icon));
+            }
+            body.appendChild(row);
+            if (hasChildren) appendNodes(node.children, depth + 1, key);
+        });
+    }
+
+    function toggle(row, icon) {
+        const expand = icon.classList.contains('fa-chevron-right');
+        icon.classList.toggle('fa-chevron-right', !expand);
+        icon.classList.toggle('fa-chevron-down', expand);
+        if (expand) {
+            body.querySelectorAll(`tr[data-parent="${row.dataset.key}"]`).forEach(child => child.classList.remove('hidden'));
+        } else {
+            // Al contraer se ocultan todos los descendientes
+            body.querySelectorAll('tr').forEach(child => {
+                const parent = child.dataset.parent;
+                if (parent === row.dataset.key || (parent && parent.startsWith(`${row.dataset.key}/`))) {
+                    child.classList.add('hidden');
+                    const childIcon = child.querySelector('.fa-chevron-down');
+                    if (childIcon) childIcon.classList.replace('fa-chevron-down', 'fa-chevron-right');
+                }
+            });
+        }
+    }
+
+    function updateTotals(totals) {
+        document.getElementById('rollup-lines').textContent = totals.lines;
+        document.getElementById('rollup-headcount').textContent = totals.headcount;
+        document.getElementById('rollup-vacancies').textContent = totals.vacancies;
+        document.getElementById('rollup-total-rmu').textContent = money.format(Number(totals.total_rmu));
+    }
+
+    function fetchRollup() {
+        const params = new URLSearchParams();
+        if (programSelect.value) params.set('program', programSelect.value);
+        excelButton.setAttribute('href', params.toString() ? `${excelUrl}?${params}` : excelUrl);
+
+        fetch(`${body.dataset.url}?${params}`, {headers: {'X-Requested-With': 'XMLHttpRequest'}})
+            .then(res => res.json())
+            .then(tree => {
+                body.innerHTML = '';
+                updateTotals(tree.totals);
+                if (!tree.children.length) {
+                    const row = document.createElement('tr');
+                    const empty = cell('No hay partidas registradas.', 'text-center');
+                    empty.colSpan = 10;
+                    row.appendChild(empty);
+                    body.appendChild(row);
+                    return;
+                }
+                appendNodes(tree.children, 0, '');
+            })
+            .catch(() => Swal.fire('Error', 'No se pudo cargar el consolidado.', 'error'));
+    }
+
+    programSelect.addEventListener('change', fetchRollup);
+    fetchRollup();
+});
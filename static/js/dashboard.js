@@ -44,6 +44,59 @@ if (typeof Swal !== 'undefined') {
     });
 }
 
+// Trabajos en segundo plano (core.jobs): consulta el estado hasta que termine
+window.waitForJob = async function (job, onProgress = null, interval = 2000) {
+    while (!['SUCCESS', 'FAILED'].includes(job.status)) {
+        if (onProgress) onProgress(job);
+        await new Promise(resolve => setTimeout(resolve, interval));
+        const response = await fetch(job.status_url, {headers: {'X-Requested-With': 'XMLHttpRequest'}});
+        if (!response.ok) throw new Error('No se pudo consultar el estado del trabajo.');
+        job = (await response.json()).job;
+    }
+    return job;
+};
+
+// Exportación de listados: los enlaces [data-export] descargan el listado con
+// los filtros que la página registró en window.listExportParams en su último fetch.
+// CSV se descarga en streaming; XLSX se genera como trabajo en segundo plano.
+window.setListExportParams = function (params) {
+    window.listExportParams = new URLSearchParams(params);
+};
+
+document.addEventListener('click', async (e) => {
+    const link = e.target.closest('[data-export]');
+    if (!link) return;
+    e.preventDefault();
+    const params = new URLSearchParams(window.listExportParams || '');
+    ['page', 'cursor', 'advanced'].forEach(key => params.delete(key));
+    params.set('export', link.dataset.export);
+    if (link.dataset.export !== 'xlsx') {
+        window.location.href = `${link.getAttribute('href')}?${params}`;
+        return;
+    }
+
+    params.set('background', '1');
+    Swal.fire({
+        title: 'Generando Excel...',
+        text: 'En cola',
+        allowOutsideClick: false,
+        showConfirmButton: false,
+        didOpen: () => Swal.showLoading()
+    });
+    try {
+        const response = await fetch(`${link.getAttribute('href')}?${params}`, {headers: {'X-Requested-With': 'XMLHttpRequest'}});
+        if (!response.ok) throw new Error('No se pudo iniciar la exportación.');
+        const job = await window.waitForJob((await response.json()).job, (job) => {
+            Swal.update({text: `${job.status_display} ${job.progress}%`});
+        });
+        if (job.status !== 'SUCCESS') throw new Error(job.error || 'La exportación falló.');
+        Swal.close();
+        window.location.href = job.download_url;
+    } catch (err) {
+        Swal.fire({icon: 'error', title: 'Error', text: err.message});
+    }
+});
+
 // ==========================================
 // 2. LÓGICA DEL LAYOUT (Vanilla JS)
 // ==========================================
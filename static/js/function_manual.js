@@ -4,6 +4,17 @@ const {createApp} = Vue;
 
 const getCsrfToken = () => document.querySelector('[name=csrfmiddlewaretoken]')?.value || '';
 
+// Catálogos del manual: se descargan de una URL versionada (cacheada por el navegador)
+const loadCatalogs = async () => {
+    const tag = document.getElementById('catalogs-data');
+    if (!tag) return null;
+    if (tag.dataset.url) {
+        const res = await fetch(tag.dataset.url, {credentials: 'same-origin'});
+        if (res.ok) return res.json();
+    }
+    return tag.textContent.trim() ? JSON.parse(tag.textContent) : null;
+};
+
 document.addEventListener('DOMContentLoaded', () => {
         const matrixElement = document.getElementById('matrixApp');
         if (matrixElement) {
@@ -35,9 +46,9 @@ document.addEventListener('DOMContentLoaded', () => {
                         currentUnitDeliverables: [],
                     }
                 },
-                mounted() {
-                    const tag = document.getElementById('catalogs-data');
-                    if (tag) this.catalogs = JSON.parse(tag.textContent);
+                async mounted() {
+                    const catalogs = await loadCatalogs();
+                    if (catalogs) this.catalogs = catalogs;
                 },
                 methods: {
                     openCreateModal() {
@@ -142,7 +153,8 @@ document.addEventListener('DOMContentLoaded', () => {
                         urlDetailBase: valuationElement.dataset.urlDetail.replace('/0/', '/'),
                         workingType: '',
                         showModal: false, isEdit: false, loading: false,
-                        catalogs: {instruction: [], decisions: [], impact: [], roles: [], matrix: [], complexity: []},
+                        catalogs: {instruction: [], decisions: [], impact: [], roles: [], complexity: []},
+                        matrixOptions: JSON.parse(document.getElementById('matrix-options')?.textContent || '[]'),
                         formData: {id: null, catalog_item_id: '', name_extra: '', occupational_classification_id: ''}
                     }
                 },
@@ -171,16 +183,14 @@ document.addEventListener('DOMContentLoaded', () => {
                         return (this.catalogs && this.catalogs[key]) ? this.catalogs[key] : [];
                     }
                 },
-                mounted() {
-                    const tag = document.getElementById('catalogs-data');
-                    if (tag) {
-                        try {
-                            this.catalogs = JSON.parse(tag.textContent);
-                        } catch (e) {
-                            console.error("Error catálogos:", e);
-                        }
-                    }
+                async mounted() {
                     this.workingType = this.nextType;
+                    try {
+                        const catalogs = await loadCatalogs();
+                        if (catalogs) this.catalogs = catalogs;
+                    } catch (e) {
+                        console.error("Error catálogos:", e);
+                    }
                 },
                 methods: {
                     openCreateModal() {
@@ -275,6 +285,7 @@ document.addEventListener('DOMContentLoaded', () => {
                         unitLevels: [],
                         selectedUnits: [],
                         valuationLevels: [],
+                        valuationChildren: null,
                         selectedNodes: [],
                         matchResult: null,
                         filteredMatrix: [],
@@ -314,16 +325,19 @@ document.addEventListener('DOMContentLoaded', () => {
                         units: wizEl.dataset.urlUnits,
                         nextCode: wizEl.dataset.urlNextCode,
                         valuationNodes: wizEl.dataset.urlValuationNodes,
+                        valuationTree: wizEl.dataset.urlValuationTree,
+                        classify: wizEl.dataset.urlClassify,
                         matrix: wizEl.dataset.urlMatrix,
                         cancel: wizEl.dataset.urlCancel
                     };
-                    const tag = document.getElementById('catalogs-data');
-                    if (tag) {
-                        this.catalogs = JSON.parse(tag.textContent);
+                    const catalogs = await loadCatalogs();
+                    if (catalogs) {
+                        this.catalogs = catalogs;
                         if (this.catalogs.competencies) this.allCompetencies = this.catalogs.competencies;
                     }
 
                     await this.fetchUnits(null, 0);
+                    await this.loadValuationTree();
                     await this.fetchValuationLevel(null);
 
                     // --- LOGICA DE EDICIÓN ---
@@ -750,10 +764,33 @@ document.addEventListener('DOMContentLoaded', () => {
                         }
                     },
                     // --- VALORACIÓN PASO 2 ---
+                    async loadValuationTree() {
+                        // Todo el árbol en una sola petición; los niveles se navegan en memoria
+                        this.valuationChildren = null;
+                        if (!this.urls.valuationTree) return;
+                        try {
+                            const res = await fetch(this.urls.valuationTree);
+                            if (!res.ok) return;
+                            const children = {};
+                            const index = (nodes, parentId) => {
+                                children[parentId] = nodes;
+                                nodes.forEach(n => index(n.children, n.id));
+                            };
+                            index(await res.json(), '');
+                            this.valuationChildren = children;
+                        } catch (e) {
+                            console.error("Error cargando el árbol de valoración:", e);
+                        }
+                    },
                     async fetchValuationLevel(parentId) {
-                        const url = parentId ? `${this.urls.valuationNodes}?parent=${parentId}` : this.urls.valuationNodes;
-                        const res = await fetch(url);
-                        const data = await res.json();
+                        let data;
+                        if (this.valuationChildren) {
+                            data = this.valuationChildren[parentId || ''] || [];
+                        } else {
+                            const url = parentId ? `${this.urls.valuationNodes}?parent=${parentId}` : this.urls.valuationNodes;
+                            const res = await fetch(url);
+                            data = await res.json();
+                        }
                         if (data.length > 0) {
                             this.valuationLevels.push({type: data[0].type, options: data});
                             this.selectedNodes.push('');
@@ -814,44 +851,19 @@ document.addEventListener('DOMContentLoaded', () => {
                             }
                         }
 
-                        console.log('Filtros aplicados (convertidos a números):', {
-                            roleId,
-                            instructionId,
-                            experienceMonths,
-                            decisionId,
-                            impactId,
-                            complexityId
-                        });
-
-                        // Filtrar la matriz - TODOS los campos deben coincidir exactamente (comparación numérica)
-                        this.filteredMatrix = this.catalogs.matrix.filter(m => {
-                            const matchRole = parseInt(m.required_role_id) === roleId;
-                            const matchInstruction = parseInt(m.minimum_instruction_id) === instructionId;
-                            const matchExperience = parseInt(m.minimum_experience_months) === experienceMonths;
-                            const matchDecision = parseInt(m.required_decision_id) === decisionId;
-                            const matchImpact = parseInt(m.required_impact_id) === impactId;
-                            const matchComplexity = parseInt(m.complexity_level_id) === complexityId;
-
-                            const passAll = matchRole && matchInstruction && matchExperience &&
-                                matchDecision && matchImpact && matchComplexity;
-
-                            if (matchComplexity) {
-                                console.log(`Registro ${m.occupational_group}-G${m.grade}:`, {
-                                    'Rol': matchRole ? '✓' : `✗ (esperado: ${roleId}, tiene: ${m.required_role_id})`,
-                                    'Instrucción': matchInstruction ? '✓' : `✗ (esperado: ${instructionId}, tiene: ${m.minimum_instruction_id})`,
-                                    'Experiencia': matchExperience ? '✓' : `✗ (esperado: ${experienceMonths}, tiene: ${m.minimum_experience_months})`,
-                                    'Decisión': matchDecision ? '✓' : `✗ (esperado: ${decisionId}, tiene: ${m.required_decision_id})`,
-                                    'Impacto': matchImpact ? '✓' : `✗ (esperado: ${impactId}, tiene: ${m.required_impact_id})`,
-                                    'Complejidad': matchComplexity ? '✓' : '✗',
-                                    'PASA': passAll ? 'SÍ ✓' : 'NO ✗'
-                                });
-                            }
-
-                            return passAll;
+                        // La clasificación se resuelve en el servidor contra el índice de la matriz
+                        const params = new URLSearchParams({
+                            role: roleId || '', instruction: instructionId || '', experience: experienceMonths,
+                            decision: decisionId || '', impact: impactId || '', complexity: complexityId
                         });
-
-                        console.log('Matriz filtrada:', this.filteredMatrix);
-                        console.log('Total resultados:', this.filteredMatrix.length);
+                        try {
+                            const res = await fetch(`${this.urls.classify}?${params}`);
+                            const data = await res.json();
+                            this.filteredMatrix = data.match ? [data.match] : [];
+                        } catch (e) {
+                            console.error("Error clasificando el perfil:", e);
+                            this.filteredMatrix = [];
+                        }
 
                         if (this.filteredMatrix.length === 0) {
                             console.warn('No se encontraron registros que coincidan con todos los criterios');
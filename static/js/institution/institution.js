@@ -28,6 +28,7 @@ document.addEventListener('DOMContentLoaded', () => {
         Object.keys(currentFilters).forEach(key => {
             if (currentFilters[key]) url.searchParams.set(key, currentFilters[key]);
         });
+        window.setListExportParams(url.searchParams);
 
         fetch(url, {headers: {'X-Requested-With': 'XMLHttpRequest'}})
             .then(res => res.text())
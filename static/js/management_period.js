@@ -404,6 +404,7 @@ const periodApp = createApp({
                 status: this.filters.status,
                 ...this.advancedFilters // Esto expande el resto (unit, dates, etc.)
             }).toString();
+            window.setListExportParams(params);
 
             try {
                 const response = await fetch(`/contract/periods/partial-table/?${params}`);
@@ -41,6 +41,7 @@ document.addEventListener('DOMContentLoaded', () => {
             onMounted(() => {
                 initTableListeners();
                 initSearch();
+                initPagination();
                 initLocationCascading();
             });
 
@@ -145,12 +146,44 @@ document.addEventListener('DOMContentLoaded', () => {
                 }
             };
 
+            // Paginación por cursor: el servidor devuelve los cursores en #pagination-metadata
+            const initPagination = () => {
+                updatePaginationUI();
+                const goTo = (key) => {
+                    const meta = document.getElementById('pagination-metadata');
+                    const cursor = meta?.dataset[key];
+                    if (cursor) fetchPeople(document.getElementById('searchInput')?.value || '', cursor);
+                };
+                document.getElementById('btn-prev')?.addEventListener('click', () => goTo('prevCursor'));
+                document.getElementById('btn-next')?.addEventListener('click', () => goTo('nextCursor'));
+            };
+
+            const updatePaginationUI = () => {
+                const meta = document.getElementById('pagination-metadata');
+                if (!meta) return;
+                const pageInfo = document.getElementById('page-info');
+                if (pageInfo) {
+                    pageInfo.textContent = meta.dataset.total === '0'
+                        ? "Sin resultados"
+                        : `Mostrando ${meta.dataset.start}-${meta.dataset.end} de ${meta.dataset.total}`;
+                }
+                const display = document.getElementById('current-page-display');
+                if (display) display.textContent = meta.dataset.page;
+                const btnPrev = document.getElementById('btn-prev');
+                const btnNext = document.getElementById('btn-next');
+                if (btnPrev) btnPrev.disabled = meta.dataset.hasPrev !== 'true';
+                if (btnNext) btnNext.disabled = meta.dataset.hasNext !== 'true';
+            };
+
             // --- API ACTIONS ---
-            const fetchPeople = (query) => {
-                fetch(`${urls.list}?q=${query}`, {headers: {'X-Requested-With': 'XMLHttpRequest'}})
+            const fetchPeople = (query, cursor = '') => {
+                const params = new URLSearchParams({q: query, cursor: cursor});
+                window.setListExportParams(params);
+                fetch(`${urls.list}?${params}`, {headers: {'X-Requested-With': 'XMLHttpRequest'}})
                     .then(res => res.text())
                     .then(html => {
                         document.getElementById('tableContainer').innerHTML = html;
+                        updatePaginationUI();
                     });
             };
 
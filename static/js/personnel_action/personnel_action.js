@@ -27,7 +27,9 @@ createApp({
                 numPages: 1,
                 hasNext: false,
                 hasPrev: false,
-                totalRecords: 0
+                totalRecords: 0,
+                nextCursor: '',
+                prevCursor: ''
             }
         }
     },
@@ -126,20 +128,24 @@ createApp({
 
         changePage(newPage) {
             if (newPage < 1) return;
+            // Páginas contiguas por cursor (keyset); sin cursor se pide por número
+            const cursor = newPage > this.pagination.page ? this.pagination.nextCursor : this.pagination.prevCursor;
             this.pagination.page = newPage;
-            this.fetchTableData();
+            this.fetchTableData(cursor);
         },
 
-        async fetchTableData() {
+        async fetchTableData(cursor = '') {
             // 1. Activamos "Cargando".
             this.isLoading = true;
 
             const params = new URLSearchParams();
-            params.append('page', this.pagination.page);
+            if (cursor) params.append('cursor', cursor);
+            else params.append('page', this.pagination.page);
             if (this.currentStatus !== 'all') params.append('status', this.currentStatus);
             if (this.filters.q) params.append('q', this.filters.q);
             if (this.filters.date_start) params.append('date_start', this.filters.date_start);
             if (this.filters.date_end) params.append('date_end', this.filters.date_end);
+            window.setListExportParams(params);
 
             try {
                 const response = await fetch(`?${params.toString()}`, {
@@ -157,7 +163,9 @@ createApp({
                         numPages: data.num_pages,
                         hasNext: data.has_next,
                         hasPrev: data.has_previous,
-                        totalRecords: data.total_records
+                        totalRecords: data.total_records,
+                        nextCursor: data.next_cursor || '',
+                        prevCursor: data.previous_cursor || ''
                     };
 
                     this.$nextTick(() => { this.localSearch(); });
@@ -18,6 +18,7 @@ document.addEventListener('DOMContentLoaded', () => {
     let currentFilters = {
         q: '',
         page: 1,
+        cursor: '',
         status: '',
         cedula: '',
         first_name: '',
@@ -35,12 +36,12 @@ document.addEventListener('DOMContentLoaded', () => {
         // 1. Si es reset, limpiar todo
         if (newParams.reset) {
             currentFilters = {
-                q: '', page: 1, status: '', cedula: '', first_name: '', last_name: '', role: ''
+                q: '', page: 1, cursor: '', status: '', cedula: '', first_name: '', last_name: '', role: ''
             };
             if (quickSearchInput) quickSearchInput.value = '';
         } else {
-            // 2. Mezclar nuevos parámetros con los actuales
-            Object.assign(currentFilters, newParams);
+            // 2. Mezclar nuevos parámetros con los actuales (sin cursor explícito se vuelve al inicio)
+            Object.assign(currentFilters, {cursor: ''}, newParams);
         }
 
         // 3. Construir URL con todos los filtros actuales
@@ -112,7 +113,8 @@ document.addEventListener('DOMContentLoaded', () => {
     if (btnPrev) {
         btnPrev.addEventListener('click', () => {
             if (!btnPrev.disabled) {
-                window.fetchUsers({page: currentFilters.page - 1});
+                const meta = document.getElementById('pagination-metadata');
+                window.fetchUsers({cursor: meta?.dataset.prevCursor || '', page: currentFilters.page - 1});
             }
         });
     }
@@ -120,7 +122,8 @@ document.addEventListener('DOMContentLoaded', () => {
     if (btnNext) {
         btnNext.addEventListener('click', () => {
             if (!btnNext.disabled) {
-                window.fetchUsers({page: currentFilters.page + 1});
+                const meta = document.getElementById('pagination-metadata');
+                window.fetchUsers({cursor: meta?.dataset.nextCursor || '', page: currentFilters.page + 1});
             }
         });
     }
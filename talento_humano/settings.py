@@ -9,6 +9,9 @@ sys.path.insert(0, os.path.join(BASE_DIR, 'apps'))
 # Configuración de Media (Archivos subidos por usuario)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Caché de documentos oficiales renderizados (core.documents); no se publica
+DOCUMENT_CACHE_DIR = os.path.join(BASE_DIR, 'document_cache')
+DOCUMENT_CACHE_MAX_BYTES = config('DOCUMENT_CACHE_MAX_BYTES', default=512 * 1024 * 1024, cast=int)
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = config('SECRET_KEY')
 
@@ -84,6 +87,15 @@ DATABASES = {
     }
 }
 
+# Caché compartida entre workers (contador de versión de catálogos, etc.).
+# La tabla se crea con la migración core.0004 (equivale a `manage.py createcachetable`).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'sigeth_cache',
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 